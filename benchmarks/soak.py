@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Soak test: plays a whole synthetic match (see synthetic.py) headless with
+every analytics overlay on, and records over the run:
+  - artists: children of each axes of the match figure
+  - rss_mb: resident memory of the process
+  - frame_ms: mean update + blit time of the frames since the last sample
+
+Every --cycle frames the overlay lifecycle is exercised as in the live app:
+the quality level steps (which rebuilds the heatmap meshes), the heatmap
+window and the analytics are toggled, and playback seeks. After a warm-up,
+the run fails (exit status 1) if any artist count changes, if RSS grows by
+more than --rss-growth MB or if frame time grows by more than --slowdown
+between the first and the last quarter of the samples:
+
+    python benchmarks/soak.py --scale match --json soak.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import SCALES, generate_match
+from benchmarks.suite import LAYERS, MatchView, environment
+from utils.config import QUALITY_LABELS
+
+WARMUP = 0.1 # Share of the samples left out of the growth checks
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Play a whole synthetic match and check for growth")
+    parser.add_argument('--scale', choices=SCALES, default='match')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--step', type=float, default=1.0, help="Match seconds between rendered frames")
+    parser.add_argument('--sample', type=int, default=100, help="Frames between samples")
+    parser.add_argument('--cycle', type=int, default=500, help="Frames between lifecycle changes")
+    parser.add_argument('--rss-growth', type=float, default=64.0, help="Allowed RSS growth, MB")
+    parser.add_argument('--slowdown', type=float, default=1.5, help="Allowed frame time ratio")
+    parser.add_argument('--json', help="Write the samples and the verdict to this file")
+    return parser.parse_args()
+
+def rss_mb():
+    """Current resident memory (peak where /proc is not available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def artist_counts(fig):
+    return [len(ax.get_children()) for ax in fig.axes]
+
+def lifecycle(view, cycle):
+    """One step of the overlay changes the live app goes through."""
+    scene, analytics = view.scene, view.scene.analytics
+    scene.set_quality(cycle % len(QUALITY_LABELS))
+    analytics.toggle_heatmap_window()
+    if cycle % 2:
+        # 't' twice: overlays hidden, then shown again
+        analytics.toggle()
+        analytics.toggle()
+    analytics.reset_heatmap()
+
+def soak(view, step, sample_every, cycle_every):
+    playback = view.playback
+    samples = []
+    frame_times = []
+    frames = 0
+    view.blit_manager.update(view.update(0))
+    t = 0.0
+    while t <= playback.duration:
+        start = time.perf_counter()
+        view.blit_manager.update(view.update(playback.frame_at(t)))
+        frame_times.append(time.perf_counter() - start)
+        frames += 1
+        if frames % cycle_every == 0:
+            lifecycle(view, frames // cycle_every)
+        if frames % sample_every == 0:
+            samples.append({'frame': frames, 'match_s': t, 'frame_ms': float(np.mean(frame_times)) * 1000,
+                            'rss_mb': rss_mb(), 'artists': artist_counts(view.fig)})
+            frame_times = []
+        t += step
+    return samples
+
+def check(samples, rss_growth, slowdown):
+    """Failures of the growth checks (empty if the run is stable)."""
+    steady = samples[int(len(samples) * WARMUP):]
+    if len(steady) < 4:
+        return [f"Too few samples ({len(samples)}) to check growth"]
+    quarter = max(len(steady) // 4, 1)
+    first, last = steady[:quarter], steady[-quarter:]
+    failures = []
+
+    counts = np.array([s['artists'] for s in steady])
+    for axes in np.flatnonzero((counts != counts[0]).any(axis=0)):
+        failures.append(f"Artists on axes {axes} changed: {counts[0, axes]} -> {counts[:, axes].max()} max")
+
+    grown = np.median([s['rss_mb'] for s in last]) - np.median([s['rss_mb'] for s in first])
+    if grown > rss_growth:
+        failures.append(f"RSS grew by {grown:.0f} MB (allowed {rss_growth:.0f})")
+
+    ratio = np.median([s['frame_ms'] for s in last]) / np.median([s['frame_ms'] for s in first])
+    if ratio > slowdown:
+        failures.append(f"Frame time grew x{ratio:.2f} (allowed x{slowdown:.2f})")
+    return failures
+
+def main():
+    args = parse_args()
+    from data.preprocessor import DataPreprocessor
+    from data.geometry import TacticalTimeline
+
+    events_df, frames_df = generate_match(seed=args.seed, **SCALES[args.scale])
+    store = DataPreprocessor.process_360_frames(frames_df)
+    table = DataPreprocessor.build_event_table(DataPreprocessor.process_events(events_df))
+    del events_df, frames_df
+    view = MatchView(store, table, TacticalTimeline.build(store), LAYERS)
+    print(f"Soaking {view.playback.duration / 60:.0f} match minutes, a frame every {args.step}s...")
+
+    start = time.perf_counter()
+    samples = soak(view, args.step, args.sample, args.cycle)
+    elapsed = time.perf_counter() - start
+    for s in samples[::max(len(samples) // 10, 1)]:
+        print(f"frame {s['frame']:6d}  {s['match_s'] / 60:5.1f}'  {s['frame_ms']:6.2f} ms  "
+              f"{s['rss_mb']:7.1f} MB  artists {s['artists']}")
+
+    failures = check(samples, args.rss_growth, args.slowdown)
+    print(f"{samples[-1]['frame'] if samples else 0} frames in {elapsed:.0f}s")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: artist counts, memory and frame time stayed flat")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'soak', 'scale': args.scale, 'step': args.step,
+                       'environment': environment(), 'failures': failures, 'samples': samples}, f, indent=2)
+    view.close()
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: runs main.py in fresh headless (Agg) interpreters and
+measures, from process launch:
+  - import: time until `import main` returns
+  - first_paint: first full draw of the window (default screen)
+  - first_frame: first rendered match frame (only with a match file; the
+    app is started on the match screen)
+
+Every run uses an empty cache directory and --offline, so nothing touches
+the network. Reports the median and best of --runs runs.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py ~/.cache/pitch-replay/matches/3869685.prm --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ('import', 'first_paint', 'first_frame')
+TIMEOUT = 60
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure main.py cold start")
+    parser.add_argument('match_file', nargs='?', help="Match file to open (adds first_frame)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--child', type=float, help=argparse.SUPPRESS) # Launch time, set by the parent
+    return parser.parse_args()
+
+def child(launched, match_file):
+    """Runs main.py in this process and prints the milestone times as JSON."""
+    marks = {}
+
+    def mark(name):
+        marks.setdefault(name, time.time() - launched)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.backend_bases import FigureCanvasBase
+
+    # Agg timers never fire: keep the app's timer and call it by hand
+    timers = []
+    new_timer = FigureCanvasBase.new_timer
+    def capture_timer(self, *args, **kwargs):
+        timer = new_timer(self, *args, **kwargs)
+        timers.append(timer)
+        return timer
+    FigureCanvasBase.new_timer = capture_timer
+
+    def show(*args, **kwargs):
+        fig = plt.gcf()
+        fig.canvas.draw()
+        mark('first_paint')
+        if not match_file:
+            return
+        deadline = time.time() + TIMEOUT
+        while app.current_positions is None and time.time() < deadline:
+            for func, func_args, func_kwargs in timers[0].callbacks:
+                func(*func_args, **func_kwargs)
+        if app.current_positions is not None:
+            mark('first_frame')
+    plt.show = show
+
+    sys.path.insert(0, ROOT)
+    import main as app
+    mark('import')
+    sys.argv = ['main.py', '--offline']
+    if match_file:
+        sys.argv += [match_file, '--screen', 'match']
+    app.main()
+    print(json.dumps(marks))
+
+def run_once(match_file):
+    env = dict(os.environ, MPLBACKEND='Agg')
+    with tempfile.TemporaryDirectory(prefix='startup-') as cache:
+        env['PITCH_REPLAY_CACHE'] = cache
+        launched = time.time()
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', repr(launched)]
+        if match_file:
+            cmd.append(os.path.abspath(match_file))
+        out = subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, text=True, timeout=TIMEOUT * 2)
+    if out.returncode != 0:
+        raise SystemExit(f"Startup run failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    args = parse_args()
+    if args.child is not None:
+        child(args.child, args.match_file)
+        return
+
+    runs = [run_once(args.match_file) for _ in range(args.runs)]
+    results = {}
+    for name in METRICS:
+        values = [r[name] for r in runs if name in r]
+        if values:
+            results[name] = {'median_s': statistics.median(values), 'best_s': min(values), 'runs': values}
+            print(f"{name:12s} median {statistics.median(values) * 1000:7.0f} ms   best {min(values) * 1000:7.0f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'startup', 'match_file': args.match_file, 'results': results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite on a synthetic match (see synthetic.py), headless
+(Agg) and without the network. Times, per operation, the median, p95 and
+best of all samples:
+  - process_events / build_event_table / group_frames: the preprocessing
+    of a fresh DataLoader result (group_frames = process_360_frames)
+  - playback_build / scene_build: PlaybackTimeline + SeekIndex, MatchScene
+  - frame_update[.<layers>] / frame_render[.<layers>]: main.update for one
+    playback frame (players, event, analytics, timeline bar) and its blit,
+    with analytics off ('off'), on ('all') and one layer at a time
+  - players_update / events_update: PlayerVisualizer.update and
+    EventVisualizer.show_event alone
+  - switch_first / switch_cached / switch_changed: showing the dashboard
+    and tactics screens the first time, unchanged, and after a key press
+
+Agg has no window, so renders and switches leave out the copy to screen.
+Results go to --json; --compare prints the ratios to an earlier run and
+exits with status 1 if an operation got slower than --threshold:
+
+    python benchmarks/suite.py --scale match --json base.json
+    python benchmarks/suite.py --scale match --compare base.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from benchmarks.synthetic import SCALES, generate_match
+
+# Analytics variants of the per-frame path: name -> AnalyticsVisualizer layers drawn
+LAYERS = ('draw_defensive_line', 'draw_heatmap', 'draw_pass_network')
+VARIANTS = {
+    'off': (),
+    'all': LAYERS,
+    'defensive_line': ('draw_defensive_line',),
+    'heatmap': ('draw_heatmap',),
+    'pass_network': ('draw_pass_network',),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the match pipeline on synthetic data")
+    parser.add_argument('--scale', choices=SCALES, default='match')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs of each operation")
+    parser.add_argument('--frames', type=int, default=200, help="Playback frames per per-frame run")
+    parser.add_argument('--only', help="Comma-separated operation name prefixes to run")
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--compare', help="Results file of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Median ratio above which --compare reports a regression")
+    return parser.parse_args()
+
+class Timings:
+    """Samples (seconds) per operation name."""
+
+    def __init__(self, only=None):
+        self.samples = {}
+        self.only = only
+
+    def wanted(self, name):
+        return not self.only or any(name.startswith(prefix) for prefix in self.only)
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def time(self, name, func, *args):
+        """Calls func(*args) once, records its duration and returns its result."""
+        start = time.perf_counter()
+        result = func(*args)
+        self.add(name, time.perf_counter() - start)
+        return result
+
+    def results(self):
+        out = {}
+        for name, values in self.samples.items():
+            ms = np.array(values) * 1000
+            out[name] = {'median_ms': float(np.median(ms)), 'p95_ms': float(np.percentile(ms, 95)),
+                         'min_ms': float(ms.min()), 'samples': len(ms)}
+        return out
+
+# --- Stages ---
+def bench_preprocessing(timings, events_df, frames_df, repeat):
+    from data.preprocessor import DataPreprocessor
+    for _ in range(repeat):
+        events = timings.time('process_events', DataPreprocessor.process_events, events_df)
+        table = timings.time('build_event_table', DataPreprocessor.build_event_table, events)
+        store = timings.time('group_frames', DataPreprocessor.process_360_frames, frames_df)
+    return store, table
+
+def new_figure():
+    fig = plt.figure(figsize=(16, 9))
+    ax = fig.add_axes([0.1, 0.05, 0.85, 0.9])
+    ax.set_xlim(0, 120)
+    ax.set_ylim(0, 80)
+    return fig, ax
+
+class MatchView:
+    """The live match view of main.py on an Agg figure, with one analytics variant."""
+
+    def __init__(self, store, table, timeline, layers, timings=None):
+        from visualization.scene import MatchScene
+        from visualization.renderer import BlitManager
+        from visualization.timeline_bar import TimelineBar
+        from visualization.pitch import draw_pitch
+        from data.playback import PlaybackTimeline
+        from data.seek_index import SeekIndex
+        from utils.theme import Colors
+
+        self.fig, ax = new_figure()
+        draw_pitch(ax, line_color=Colors.LINE_COLOR, pitch_color=Colors.PITCH_COLOR)
+        self.timeline_bar = TimelineBar(self.fig, [0.15, 0.012, 0.62, 0.03])
+        self.blit_manager = BlitManager(ax, *self.timeline_bar.axes)
+
+        def build_playback():
+            playback = PlaybackTimeline(store, table)
+            return playback, SeekIndex.build(playback, table)
+
+        build_scene = lambda: MatchScene(ax, store, table, timeline=timeline, analytics=bool(layers))
+        if timings is not None:
+            self.playback, self.seek_index = timings.time('playback_build', build_playback)
+            self.scene = timings.time('scene_build', build_scene)
+        else:
+            self.playback, self.seek_index = build_playback()
+            self.scene = build_scene()
+        self.timeline_bar.set_match(self.playback.duration, self.seek_index)
+
+        analytics = self.scene.analytics
+        if analytics is not None:
+            analytics.show_analytics = True
+            # Layers outside the variant draw nothing
+            for name in LAYERS:
+                if name not in layers:
+                    setattr(analytics, name, lambda *args, **kwargs: None)
+
+    def update(self, playback_frame):
+        """main.update: returns the dynamic artists of a playback frame."""
+        frame_idx, home_xy, away_xy = self.playback.positions(playback_frame)
+        artists = self.scene.update(frame_idx, (home_xy, away_xy), self.playback.blend(playback_frame))
+        play_time = playback_frame / self.playback.rate
+        return artists + self.timeline_bar.update(play_time, self.seek_index.match_clock_at(play_time))
+
+    def close(self):
+        plt.close(self.fig)
+
+def playback_starts(playback, frames, repeat):
+    """First playback frame of each per-frame run, spread over the match."""
+    last = max(len(playback) - frames, 0)
+    return [int(last * (k + 1) / (repeat + 1)) for k in range(repeat)]
+
+def bench_frames(timings, store, table, timeline, frames, repeat):
+    for variant, layers in VARIANTS.items():
+        update_name, render_name = f"frame_update.{variant}", f"frame_render.{variant}"
+        if not (timings.wanted(update_name) or timings.wanted(render_name)):
+            continue
+        view = MatchView(store, table, timeline, layers, timings if variant == 'off' else None)
+        # First frame: full draw, capturing the blit background
+        view.blit_manager.update(view.update(0))
+        for start in playback_starts(view.playback, frames, repeat):
+            for playback_frame in range(start, min(start + frames, len(view.playback))):
+                artists = timings.time(update_name, view.update, playback_frame)
+                timings.time(render_name, view.blit_manager.update, artists)
+        view.close()
+
+def bench_visualizers(timings, store, table, timeline, frames, repeat):
+    view = MatchView(store, table, timeline, ())
+    players, overlay = view.scene.players, view.scene.event_overlay
+    for start in playback_starts(view.playback, frames, repeat):
+        for playback_frame in range(start, min(start + frames, len(view.playback))):
+            frame_idx, home_xy, away_xy = view.playback.positions(playback_frame)
+            blend = view.playback.blend(playback_frame)
+            timings.time('players_update', players.update, home_xy, away_xy, None, blend)
+            row = view.scene.frame_events[frame_idx]
+            if row >= 0:
+                timings.time('events_update', overlay.show_event, row)
+    view.close()
+
+def bench_screens(timings, store, table, formations, repeat):
+    """Screen switches as main.update_screen_visibility does them, on a fresh figure per run."""
+    from data.stats import StatsEngine
+    from screens.manager import ScreenManager
+    from screens.dashboard import DashboardScreen
+    from screens.tactics import TacticsScreen
+
+    for _ in range(repeat):
+        fig, ax_match = new_figure()
+        manager = ScreenManager(fig)
+        manager.setup_sidebar()
+        stats = StatsEngine()
+        stats.add_match('synthetic', table)
+        screens = manager.screens
+        screens['DASHBOARD'] = DashboardScreen(fig, stats)
+        screens['TACTICS'] = TacticsScreen(fig)
+
+        def switch(key):
+            manager.switch_to(key)
+            ax_match.set_visible(key == 'MATCH')
+            for name, screen in screens.items():
+                if name != key:
+                    screen.hide()
+            if key in screens:
+                screens[key].show()
+            if key == 'DASHBOARD' and screens[key].match is None:
+                screens[key].set_match('synthetic')
+            elif key == 'TACTICS' and screens[key].formations is None:
+                screens[key].set_formations(formations)
+            manager.present()
+
+        switch('MATCH')
+        for key in ('DASHBOARD', 'TACTICS'):
+            timings.time('switch_first', switch, key)
+        for key in ('MATCH', 'DASHBOARD', 'MATCH', 'TACTICS'):
+            timings.time('switch_cached', switch, key)
+        for key in ('DASHBOARD', 'TACTICS'):
+            switch('MATCH')
+            screens[key].handle_key(']')
+            timings.time('switch_changed', switch, key)
+        plt.close(fig)
+
+# --- Output ---
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': np.__version__, 'matplotlib': matplotlib.__version__}
+
+def compare(results, path, threshold):
+    """Prints median ratios against an earlier results file; returns the regressed operations."""
+    with open(path) as f:
+        base = json.load(f)
+    print(f"\nCompared to {path} (commit {base.get('environment', {}).get('commit')}):")
+    regressions = []
+    for name, result in results.items():
+        before = base.get('results', {}).get(name)
+        if before is None or before['median_ms'] <= 0:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = '  SLOWER'
+        print(f"{name:28s} {before['median_ms']:9.3f} -> {result['median_ms']:9.3f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+def main():
+    args = parse_args()
+    timings = Timings(args.only.split(',') if args.only else None)
+
+    start = time.perf_counter()
+    events_df, frames_df = generate_match(seed=args.seed, **SCALES[args.scale])
+    print(f"Synthetic '{args.scale}' match: {len(events_df)} events, {len(frames_df)} player rows "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    store, table = bench_preprocessing(timings, events_df, frames_df, args.repeat)
+    from data.geometry import TacticalTimeline
+    timeline = TacticalTimeline.build(store)
+    bench_frames(timings, store, table, timeline, args.frames, args.repeat)
+    if timings.wanted('players_update') or timings.wanted('events_update'):
+        bench_visualizers(timings, store, table, timeline, args.frames, args.repeat)
+    if timings.wanted('switch'):
+        from data.formations import FormationTimeline
+        bench_screens(timings, store, table, FormationTimeline.build(store, table), args.repeat)
+
+    results = {name: result for name, result in timings.results().items() if timings.wanted(name)}
+    print(f"\n{'operation':28s} {'median':>9s} {'p95':>9s} {'min':>9s}   samples")
+    for name, result in results.items():
+        print(f"{name:28s} {result['median_ms']:9.3f} {result['p95_ms']:9.3f} {result['min_ms']:9.3f} ms"
+              f"  {result['samples']:6d}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'suite', 'scale': args.scale, 'seed': args.seed,
+                       'frames': args.frames, 'repeat': args.repeat, 'environment': environment(),
+                       'results': results}, f, indent=2)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic matches in the schema DataLoader returns: an events
+DataFrame like sb.events and a 360 frames DataFrame like sb.frames (one row
+per visible player, 'location' lists, teammate / actor / keeper flags, all
+relative to the acting team). Every snapshot has its event, so the frame
+ids are event ids as in StatsBomb data.
+
+Scales go from a typical 360 match (a snapshot every ~1.7 s, players near
+the ball visible) to full tracking density (25 Hz, all 22 players):
+
+    python benchmarks/synthetic.py --scale match --out synthetic.prm
+    python main.py synthetic.prm --offline
+
+write_metrica() writes broadband tracking instead (all players and the
+ball, every frame) as a Metrica Sports raw tracking CSV pair, in chunks, so
+any match length is cheap to generate:
+
+    python benchmarks/synthetic.py --metrica tracking/ --minutes 90 --hz 25
+    ./ingest.py --tracking tracking/*_Home_Team.csv tracking/*_Away_Team.csv
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pandas as pd
+from data.formations import FORMATIONS, TEMPLATE_XY
+from utils.config import PITCH_LENGTH, PITCH_WIDTH
+
+# name -> generate_match keyword arguments
+SCALES = {
+    'small': {'minutes': 10, 'hz': 0.6, 'visible_radius': 35.0},
+    'match': {'minutes': 90, 'hz': 0.6, 'visible_radius': 35.0},
+    'tracking': {'minutes': 90, 'hz': 25.0, 'visible_radius': None},
+}
+TEAMS = ('Synthetic Home', 'Synthetic Away')
+TEAM_FORMATIONS = ('4-4-2', '4-3-3')
+METRICA_FILES = ('Synthetic_RawTrackingData_Home_Team.csv', 'Synthetic_RawTrackingData_Away_Team.csv')
+METRICA_SUBSTITUTION = (60, 6) # Minute, home player slot replaced by a substitute
+
+def _team_shape(formation, size):
+    """(size, 2) base positions of a team attacking +x: keeper, then outfield template slots."""
+    outfield = TEMPLATE_XY[FORMATIONS.index(formation)]
+    xy = np.vstack([[[-0.45, 40.0]], outfield])[:size]
+    # Template depth 0..1 -> 30 pitch units behind / ahead of the block centre
+    return np.column_stack([(xy[:, 0] - 0.5) * 60.0, xy[:, 1] - 40.0])
+
+def _timestamps(seconds):
+    """'HH:MM:SS.fff' strings of seconds since the start of the period."""
+    ms = np.round(seconds * 1000).astype(np.int64)
+    h, rest = np.divmod(ms, 3_600_000)
+    m, rest = np.divmod(rest, 60_000)
+    s, ms = np.divmod(rest, 1000)
+    return [f"{a:02d}:{b:02d}:{c:02d}.{d:03d}" for a, b, c, d in zip(h, m, s, ms)]
+
+def _motion_params(rng, per_team):
+    """Random parameters of the ball and player motion (see _motion)."""
+    return {
+        'ball_f': rng.uniform(0.002, 0.03, size=(2, 4)),
+        'ball_p': rng.uniform(0, 2 * np.pi, size=(2, 4)),
+        'wobble_f': rng.uniform(0.01, 0.05, size=(2, per_team, 2)),
+        'wobble_p': rng.uniform(0, 2 * np.pi, size=(2, per_team, 2)),
+        'shapes': [_team_shape(f, per_team) for f in TEAM_FORMATIONS],
+    }
+
+def _motion(params, t):
+    """
+    Ball (n, 2) and players (n, 2 teams, per_team, 2) at times t (seconds),
+    home attacking +x: the ball wanders over the pitch from a few
+    sinusoids and each team block follows it. Any slice of t gives the
+    same positions as the whole match, so long matches can be made in chunks.
+    """
+    wave = np.sin(t[:, None, None] * 2 * np.pi * params['ball_f'] + params['ball_p']).mean(axis=2)
+    ball = np.column_stack([60 + 50 * wave[:, 0], 40 + 32 * wave[:, 1]])
+
+    per_team = params['wobble_f'].shape[1]
+    xy = np.empty((len(t), 2, per_team, 2))
+    for side in (0, 1):
+        direction = 1 if side == 0 else -1
+        block = np.column_stack([ball[:, 0] * 0.6 + (24 if side == 0 else 96) * 0.4,
+                                 40 + (ball[:, 1] - 40) * 0.3])
+        shape = params['shapes'][side] * [direction, direction]
+        wobble = 3 * np.sin(t[:, None, None] * 2 * np.pi * params['wobble_f'][side] + params['wobble_p'][side])
+        xy[:, side] = block[:, None, :] + shape[None] + wobble
+        # Keepers stay in their box
+        xy[:, side, 0, 0] = 4 if side == 0 else PITCH_LENGTH - 4
+    xy[..., 0] = np.clip(xy[..., 0], 0.5, PITCH_LENGTH - 0.5)
+    xy[..., 1] = np.clip(xy[..., 1], 0.5, PITCH_WIDTH - 0.5)
+    return ball, xy
+
+def generate_match(minutes=90, hz=0.6, players=22, visible_radius=35.0, seed=0, match_id=1):
+    """
+    Returns (events_df, frames_df) for a synthetic match of two periods.
+    hz: snapshots (events with a 360 frame) per second; players: total on
+    the pitch (split between the teams, keeper first); visible_radius:
+    players farther than this from the ball are left out of the 360 frame
+    (None = all visible). The same arguments always give the same match.
+    """
+    rng = np.random.default_rng(seed)
+    n = max(int(minutes * 60 * hz), 2)
+    per_team = min(max(players // 2, 1), 11)
+    t = np.arange(n) / hz
+    half = n // 2
+    period = np.where(np.arange(n) < half, 1, 2)
+    period_clock = np.where(period == 1, t, t - t[half])
+    match_clock = period_clock + np.where(period == 1, 0, minutes * 30)
+
+    # 1. Possessions of geometric length, alternating between the teams
+    possession_starts = np.flatnonzero(np.r_[True, rng.random(n - 1) < 1 / max(8 * hz, 1.5)])
+    possession = np.cumsum(np.isin(np.arange(n), possession_starts)) - 1
+    team = (possession + rng.integers(2)) % 2
+
+    # 2. Ball and players (world coordinates, home attacks +x)
+    ball, xy = _motion(_motion_params(rng, per_team), t)
+
+    # 4. Events: the acting team's player nearest to the ball
+    own = xy[np.arange(n), team]
+    actor = np.argmin(((own - ball[:, None, :]) ** 2).sum(axis=-1), axis=1)
+    last = np.r_[possession[1:] != possession[:-1], True]
+    first = np.r_[True, possession[1:] != possession[:-1]]
+    roll = rng.random(n)
+    kinds = np.array(['Pass', 'Ball Receipt*', 'Carry'])
+    event_type = kinds[np.arange(n) % 3].astype(object)
+    event_type[(roll < 0.05) & ~last] = 'Dribble'
+    event_type[first & (roll < 0.5)] = 'Ball Recovery'
+    event_type[first & (roll >= 0.5) & (roll < 0.6)] = 'Interception'
+    event_type[last & (roll < 0.12)] = 'Shot'
+    event_type[last & (roll >= 0.12)] = 'Pass'
+    event_type[(roll > 0.97) & ~first & ~last] = 'Pressure'
+
+    # The acting team's view: away events are rotated so the actor attacks +x
+    flip = team == 1
+    def view(points):
+        return np.where(flip[:, None], [PITCH_LENGTH, PITCH_WIDTH] - points, points)
+    location = view(xy[np.arange(n), team, actor])
+    receiver = np.r_[actor[1:], actor[-1]]
+    end = view(xy[np.arange(n), team, receiver])
+    is_pass = event_type == 'Pass'
+    is_shot = event_type == 'Shot'
+    failed = is_pass & (last | (roll > 0.9))
+
+    ids = [str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(n)]
+    names = [[f"{TEAMS[side].split()[1]} Player {k + 1}" for k in range(per_team)] for side in (0, 1)]
+    player = np.array([names[side][k] for side, k in zip(team, actor)])
+    nan = np.full(n, np.nan)
+    events = pd.DataFrame({
+        'id': ids,
+        'index': np.arange(1, n + 1),
+        'period': period,
+        'timestamp': _timestamps(period_clock),
+        'minute': (match_clock // 60).astype(int),
+        'second': (match_clock % 60).astype(int),
+        'type': event_type,
+        'possession': possession + 1,
+        'possession_team': np.array(TEAMS)[team],
+        'team': np.array(TEAMS)[team],
+        'player': player,
+        'location': location.tolist(),
+        'pass_end_location': pd.Series(end.tolist()).where(is_pass, nan),
+        'pass_recipient': pd.Series(np.array([names[side][k] for side, k in zip(team, receiver)])).where(is_pass & ~failed),
+        'pass_outcome': pd.Series('Incomplete', index=range(n)).where(failed),
+        'shot_statsbomb_xg': np.where(is_shot, rng.beta(1.2, 8, n), np.nan),
+        'shot_outcome': pd.Series(np.where(roll < 0.012, 'Goal', 'Saved')).where(is_shot),
+        'match_id': match_id,
+    })
+
+    # 5. 360 frames: every player in the acting team's view, near the ball
+    world = xy.reshape(n, 2 * per_team, 2)
+    rows_xy = np.where(flip[:, None, None], [PITCH_LENGTH, PITCH_WIDTH] - world, world)
+    side = np.repeat([0, 1], per_team)
+    teammate = side[None, :] == team[:, None]
+    is_actor = teammate & (np.tile(np.arange(per_team), 2)[None, :] == actor[:, None])
+    keeper = np.tile(np.arange(per_team) == 0, 2)[None, :].repeat(n, axis=0)
+    if visible_radius is None:
+        visible = np.ones(teammate.shape, dtype=bool)
+    else:
+        visible = np.hypot(*(world - ball[:, None, :]).transpose(2, 0, 1)) < visible_radius
+        visible |= is_actor
+    f, p = np.nonzero(visible)
+    # Visible area: a band of the pitch around the ball, as a closed polygon
+    bx = np.where(flip, PITCH_LENGTH - ball[:, 0], ball[:, 0])
+    areas = [[x - 40, 0.0, x + 40, 0.0, x + 40, 80.0, x - 40, 80.0, x - 40, 0.0] for x in bx.tolist()]
+    frames = pd.DataFrame({
+        'id': np.array(ids, dtype=object)[f],
+        'visible_area': [areas[i] for i in f],
+        'match_id': match_id,
+        'teammate': teammate[f, p],
+        'actor': is_actor[f, p],
+        'keeper': keeper[f, p],
+        'location': rows_xy[f, p].tolist(),
+    })
+    return events, frames
+
+def write_metrica(directory, minutes=90, hz=25.0, players=22, seed=0, chunk_frames=10_000):
+    """
+    Writes a match as Metrica Sports raw tracking CSVs (METRICA_FILES in
+    directory): three header rows (team, jersey, column names), then per
+    frame the period, frame number, time and each player's x / y as pitch
+    fractions (x from the left, y from the bottom, as Metrica's sample data
+    is read by kloppy), NaN while off the pitch; the ball is the
+    last column pair of both files. Teams change ends at half-time, the
+    ball is out of play (NaN) now and then, and a home substitute comes on
+    at METRICA_SUBSTITUTION. Returns the two paths.
+    """
+    rng = np.random.default_rng(seed)
+    per_team = min(max(players // 2, 1), 11)
+    params = _motion_params(rng, per_team)
+    n = int(minutes * 60 * hz)
+    half = n // 2
+    sub_minute, sub_slot = METRICA_SUBSTITUTION
+    sub_frame = int(sub_minute * 60 * hz)
+
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, name) for name in METRICA_FILES]
+    files = [open(path, 'w') for path in paths]
+    try:
+        for side, f in enumerate(files):
+            team = ('Home', 'Away')[side]
+            jerseys = list(range(1, per_team + 1)) + ([per_team + 1] if side == 0 else [])
+            rows = ([''] * 3 + [team, ''] * len(jerseys) + [''] * 2,
+                    [''] * 3 + [x for j in jerseys for x in (str(j), '')] + [''] * 2,
+                    ['Period', 'Frame', 'Time [s]'] + [x for j in jerseys for x in (f"Player{j}", '')] + ['Ball', ''])
+            f.writelines(",".join(row) + "\n" for row in rows)
+
+        for lo in range(0, n, chunk_frames):
+            frame = np.arange(lo, min(lo + chunk_frames, n))
+            t = frame / hz
+            ball, xy = _motion(params, t)
+            period = np.where(frame < half, 1, 2)
+            # Second half: ends changed, so the world rotates half a turn
+            second = period == 2
+            ball[second] = [PITCH_LENGTH, PITCH_WIDTH] - ball[second]
+            xy[second] = [PITCH_LENGTH, PITCH_WIDTH] - xy[second]
+            ball[np.sin(t * 0.05) > 0.97] = np.nan
+
+            scale = np.array([PITCH_LENGTH, PITCH_WIDTH])
+            # Pitch units from the top left -> Metrica fractions, y from the bottom
+            ball = ball / scale
+            ball[:, 1] = 1 - ball[:, 1]
+            for side, f in enumerate(files):
+                cols = xy[:, side] / scale
+                cols[..., 1] = 1 - cols[..., 1]
+                if side == 0:
+                    # The substitute takes over the slot from sub_frame on
+                    on = (frame >= sub_frame)[:, None]
+                    sub = np.where(on, cols[:, sub_slot], np.nan)
+                    cols[:, sub_slot] = np.where(on, np.nan, cols[:, sub_slot])
+                    cols = np.concatenate([cols, sub[:, None, :]], axis=1)
+                values = np.column_stack([period, frame + 1, (frame + 1) / hz,
+                                          cols.reshape(len(frame), -1), ball])
+                lines = pd.DataFrame(values)
+                lines[0] = lines[0].astype(int)
+                lines[1] = lines[1].astype(int)
+                lines.to_csv(f, header=False, index=False, float_format='%.5f', na_rep='NaN',
+                             lineterminator='\n')
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic match")
+    parser.add_argument('--scale', choices=SCALES, default='match')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write a match file (open it with main.py)")
+    parser.add_argument('--metrica', metavar='DIR', help="Write Metrica tracking CSVs to DIR instead")
+    parser.add_argument('--minutes', type=float, default=90, help="Match length with --metrica")
+    parser.add_argument('--hz', type=float, default=25.0, help="Frame rate with --metrica")
+    args = parser.parse_args()
+
+    if args.metrica:
+        start = time.perf_counter()
+        paths = write_metrica(args.metrica, args.minutes, args.hz, seed=args.seed)
+        print(f"Wrote {', '.join(paths)} in {time.perf_counter() - start:.1f}s")
+        return
+
+    start = time.perf_counter()
+    events, frames = generate_match(seed=args.seed, **SCALES[args.scale])
+    print(f"{len(events)} events, {frames['id'].nunique()} frames, {len(frames)} player rows "
+          f"in {time.perf_counter() - start:.1f}s")
+    if args.out:
+        from data.preprocessor import DataPreprocessor
+        store = DataPreprocessor.process_360_frames(frames)
+        table = DataPreprocessor.build_event_table(DataPreprocessor.process_events(events))
+        DataPreprocessor.save_match(args.out, store, table, {'match_id': 1, 'home_team': TEAMS[0],
+                                                             'away_team': TEAMS[1], 'synthetic': args.scale})
+        print(f"Wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from utils.config import CACHE_DIR, CACHE_MAX_BYTES
+
+class MatchCache:
+    """
+    Content-addressed on-disk cache for DataLoader results.
+
+    Each request (kind, competition, season, match) maps to a blob whose file
+    name is the SHA-1 of its bytes, so a blob can always be checked against its
+    own name. Blobs are pickled DataFrames, which keep pandas' per-column block
+    layout and load without any re-parsing.
+
+    A hit only updates the entry's recency in memory; the index is written
+    by put() (which may also evict) and by close(), so reads never
+    serialise the index.
+
+    A read_only cache never writes: put() is ignored and invalid entries
+    are only dropped from its in-memory index. Processes sharing a cache
+    directory with a writer (e.g. ingest.py workers) use one.
+    """
+
+    INDEX_FILE = 'index.json'
+    FORMAT_VERSION = 1
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, read_only=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._index = None
+        self._dirty = False # Recency updates not written to the index yet
+
+    @staticmethod
+    def make_key(kind, competition_id=None, season_id=None, match_id=None):
+        """Stable request key, e.g. 'events:43:106:3869685'."""
+        parts = [kind] + ['' if p is None else str(p) for p in (competition_id, season_id, match_id)]
+        return ':'.join(parts)
+
+    # --- Index ---
+    def _index_path(self):
+        return os.path.join(self.root, self.INDEX_FILE)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest + '.pkl')
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+
+        index = {}
+        try:
+            with open(self._index_path(), 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.FORMAT_VERSION:
+                index = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+        self._index = index
+        return index
+
+    def _save_index(self):
+        if self.read_only:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': self.FORMAT_VERSION, 'entries': self._index}, f)
+        os.replace(tmp, self._index_path())
+        self._dirty = False
+
+    # --- Public API ---
+    def get(self, key):
+        """
+        Returns the cached object for key, or None on a miss.
+        Entries whose blob is missing or does not match its digest are dropped.
+        """
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+
+            try:
+                with open(self._blob_path(entry['digest']), 'rb') as f:
+                    payload = f.read()
+            except OSError:
+                payload = None
+
+            if payload is None or hashlib.sha1(payload).hexdigest() != entry['digest']:
+                print(f"Cache entry {key} is invalid, dropping it.")
+                if self.read_only:
+                    index.pop(key)
+                    return None
+                self._drop(key)
+                self._save_index()
+                return None
+
+            entry['last_access'] = time.time()
+            self._dirty = True
+
+        return pickle.loads(payload)
+
+    def put(self, key, obj):
+        """Stores obj under key and evicts old entries if over budget."""
+        if self.read_only:
+            return
+        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha1(payload).hexdigest()
+        path = self._blob_path(digest)
+
+        with self._lock:
+            index = self._load_index()
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = path + '.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+
+            old = index.get(key)
+            index[key] = {'digest': digest, 'size': len(payload), 'last_access': time.time()}
+            if old is not None and old['digest'] != digest:
+                self._remove_blob_if_unused(old['digest'])
+
+            self._evict()
+            self._save_index()
+
+    def close(self):
+        """Writes recency updates of cache hits to the index."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._load_index()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._total_bytes(self._load_index())
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._load_index()):
+                self._drop(key)
+            self._save_index()
+
+    # --- Internals (caller holds the lock) ---
+    def _total_bytes(self, index):
+        # Identical payloads share one blob, so count each digest once
+        return sum({e['digest']: e['size'] for e in index.values()}.values())
+
+    def _evict(self):
+        index = self._index
+        by_age = sorted(index, key=lambda k: index[k]['last_access'])
+        while by_age and self._total_bytes(index) > self.max_bytes:
+            key = by_age.pop(0)
+            print(f"Evicting cache entry {key}")
+            self._drop(key)
+
+    def _drop(self, key):
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._remove_blob_if_unused(entry['digest'])
+
+    def _remove_blob_if_unused(self, digest):
+        if any(e['digest'] == digest for e in self._index.values()):
+            return
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+class EventTable:
+    """
+    Typed columnar copy of the processed events table.
+
+    Numeric fields are plain NumPy columns. Repeated strings (type, player,
+    team, outcomes) are stored as int32 codes into a per-column dictionary of
+    UTF-8 bytes, with -1 for missing values. Everything is a fixed-width array,
+    so the table can be written to and memory-mapped from a match file.
+    """
+
+    # Column name -> (source column, dtype)
+    NUMERIC_COLUMNS = {
+        'index': ('index', np.int32),
+        'period': ('period', np.int8),
+        'minute': ('minute', np.int16),
+        'second': ('second', np.int16),
+        'x': ('x', np.float32),
+        'y': ('y', np.float32),
+        'xg': ('shot_statsbomb_xg', np.float32),
+    }
+    STRING_COLUMNS = ('type', 'player', 'team', 'pass_outcome', 'shot_outcome')
+
+    def __init__(self, columns, dictionaries):
+        self.columns = columns            # name -> (n_events,) array
+        self.dictionaries = dictionaries  # name -> (n_values,) bytes array
+        self._row_index = None
+
+    @classmethod
+    def from_dataframe(cls, events):
+        """Builds the table from the output of DataPreprocessor.process_events."""
+        n = len(events)
+        columns = {}
+        dictionaries = {}
+
+        ids = events['id'] if 'id' in events.columns else pd.Series([''] * n)
+        columns['id'] = np.array([str(i).encode() for i in ids], dtype='S36')
+
+        for name, (src, dtype) in cls.NUMERIC_COLUMNS.items():
+            if src in events.columns:
+                values = pd.to_numeric(events[src], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                values = np.full(n, np.nan)
+            if np.issubdtype(dtype, np.integer):
+                values = np.nan_to_num(values, nan=-1)
+            columns[name] = values.astype(dtype)
+
+        # Seconds since the start of the period, parsed from 'HH:MM:SS.fff'
+        if 'timestamp' in events.columns:
+            clock = pd.to_timedelta(events['timestamp'], errors='coerce').dt.total_seconds()
+            columns['clock'] = clock.to_numpy(dtype=np.float64)
+        else:
+            columns['clock'] = np.full(n, np.nan)
+
+        end = events['pass_end_location'] if 'pass_end_location' in events.columns else pd.Series([None] * n)
+        columns['end_x'] = np.array([p[0] if isinstance(p, (list, tuple)) else np.nan for p in end], dtype=np.float32)
+        columns['end_y'] = np.array([p[1] if isinstance(p, (list, tuple)) else np.nan for p in end], dtype=np.float32)
+
+        for name in cls.STRING_COLUMNS:
+            values = events[name] if name in events.columns else pd.Series([None] * n)
+            codes, uniques = pd.factorize(values, sort=False)
+            columns[name] = codes.astype(np.int32)
+            dictionaries[name] = np.array([str(u).encode('utf-8') for u in uniques], dtype=bytes)
+            if len(uniques) == 0:
+                dictionaries[name] = np.zeros(0, dtype='S1')
+
+        return cls(columns, dictionaries)
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def string(self, name, row):
+        """Decoded string value of a dictionary column, or None if missing."""
+        code = self.columns[name][row]
+        if code < 0:
+            return None
+        return self.dictionaries[name][code].decode('utf-8')
+
+    def code(self, name, value):
+        """Dictionary code of value in column name, or -1 if it never occurs."""
+        matches = np.flatnonzero(self.dictionaries[name] == value.encode('utf-8'))
+        return int(matches[0]) if len(matches) else -1
+
+    def event_id(self, row):
+        return self.columns['id'][row].decode()
+
+    def row_for_event(self, event_id):
+        """Row of the event with the given uuid, or None (index built on first use)."""
+        if self._row_index is None:
+            self._row_index = {eid.decode(): i for i, eid in enumerate(self.columns['id'])}
+        return self._row_index.get(event_id)
+
+    def rows_for_events(self, event_ids):
+        """
+        Vectorised row_for_event: (n,) int32 rows for an array of 'S36' ids,
+        -1 where the event is unknown. Used to map every frame to its event once.
+        """
+        event_ids = np.asarray(event_ids, dtype='S36')
+        ids = np.asarray(self.columns['id'], dtype='S36')
+        rows = np.full(len(event_ids), -1, dtype=np.int32)
+        if not len(ids) or not len(event_ids):
+            return rows
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        pos = np.clip(np.searchsorted(sorted_ids, event_ids), 0, len(ids) - 1)
+        found = sorted_ids[pos] == event_ids
+        rows[found] = order[pos[found]]
+        return rows
+
+    def row(self, row):
+        """
+        Rebuilds one event as a dict with the processed events column names
+        (location lists, NaN for missing numbers).
+        """
+        c = self.columns
+        x, y = float(c['x'][row]), float(c['y'][row])
+        end_x, end_y = float(c['end_x'][row]), float(c['end_y'][row])
+        return {
+            'id': self.event_id(row),
+            'index': int(c['index'][row]),
+            'period': int(c['period'][row]),
+            'minute': int(c['minute'][row]),
+            'second': int(c['second'][row]),
+            'type': self.string('type', row),
+            'player': self.string('player', row),
+            'team': self.string('team', row),
+            'location': [x, y] if not np.isnan(x) else np.nan,
+            'pass_end_location': [end_x, end_y] if not np.isnan(end_x) else np.nan,
+            'pass_outcome': self.string('pass_outcome', row),
+            'shot_statsbomb_xg': float(c['xg'][row]),
+            'shot_outcome': self.string('shot_outcome', row),
+            'x': x,
+            'y': y,
+        }
+
+    # --- Serialization ---
+    def to_arrays(self, prefix='events'):
+        arrays = {f'{prefix}.{name}': col for name, col in self.columns.items()}
+        arrays.update({f'{prefix}.dict.{name}': d for name, d in self.dictionaries.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix='events'):
+        columns = {}
+        dictionaries = {}
+        dict_prefix = f'{prefix}.dict.'
+        for key, array in arrays.items():
+            if key.startswith(dict_prefix):
+                dictionaries[key[len(dict_prefix):]] = array
+            elif key.startswith(prefix + '.'):
+                columns[key[len(prefix) + 1:]] = array
+        return cls(columns, dictionaries)
@@ -0,0 +1,328 @@
+import os
+import numpy as np
+from data.match_file import MatchFile, MATCH_FILE_EXT
+from data.geometry import TEAMS
+from utils.config import (PITCH_LENGTH, PITCH_WIDTH, FORMATION_WINDOW, FORMATION_HOP,
+                          FORMATION_MIN_PLAYERS, FORMATION_ITERATIONS, FORMATION_TRACKING_STRIDE)
+
+PHASES = ('In possession', 'Out of possession')
+OUTFIELD = 10
+
+# Outfield templates, lines listed from the back; every team attacks towards +x
+_LINE_Y = {1: (40,), 2: (30, 50), 3: (20, 40, 60), 4: (10, 30, 50, 70), 5: (8, 24, 40, 56, 72)}
+_TEMPLATE_LINES = {
+    '4-4-2': (('LB', 'CB', 'CB', 'RB'), ('LM', 'CM', 'CM', 'RM'), ('ST', 'ST')),
+    '4-3-3': (('LB', 'CB', 'CB', 'RB'), ('CM', 'CM', 'CM'), ('LW', 'ST', 'RW')),
+    '4-2-3-1': (('LB', 'CB', 'CB', 'RB'), ('CDM', 'CDM'), ('LW', 'CAM', 'RW'), ('ST',)),
+    '4-1-4-1': (('LB', 'CB', 'CB', 'RB'), ('CDM',), ('LM', 'CM', 'CM', 'RM'), ('ST',)),
+    '4-5-1': (('LB', 'CB', 'CB', 'RB'), ('LM', 'CM', 'CM', 'CM', 'RM'), ('ST',)),
+    '3-5-2': (('CB', 'CB', 'CB'), ('LWB', 'CM', 'CM', 'CM', 'RWB'), ('ST', 'ST')),
+    '3-4-3': (('CB', 'CB', 'CB'), ('LWB', 'CM', 'CM', 'RWB'), ('LW', 'ST', 'RW')),
+    '5-3-2': (('LWB', 'CB', 'CB', 'CB', 'RWB'), ('CM', 'CM', 'CM'), ('ST', 'ST')),
+}
+
+def _templates():
+    """(names, (n_templates, 10, 2) positions, (n_templates, 10) role names)."""
+    names, positions, roles = [], [], []
+    for name, lines in _TEMPLATE_LINES.items():
+        depth = np.linspace(0.0, 1.0, len(lines))
+        names.append(name)
+        positions.append([(x, y) for x, line in zip(depth, lines) for y in _LINE_Y[len(line)]])
+        roles.append([role for line in lines for role in line])
+    return names, np.array(positions, dtype=np.float64), np.array(roles)
+
+FORMATIONS, TEMPLATE_XY, TEMPLATE_ROLES = _templates()
+
+class FormationTimeline:
+    """
+    Formations and roles of both teams over a match, inferred from the 360
+    freeze frames in one batch pass.
+
+    Each frame's teammate / opponent rows are assigned to the two teams of
+    the event table through the acting team, which also gives the phase:
+    the acting team is in possession. Positions are rotated so every team
+    attacks towards +x and taken relative to the frame's centroid of the
+    team's visible outfield players (keepers are left out). For every team
+    and phase, sliding windows of FORMATION_WINDOW frames are clustered
+    with a k-means that runs on all windows at once; the 10 cluster centres
+    are then matched to formation templates (Hungarian assignment on
+    per-axis standardised positions), which labels the window and the role
+    of each centre.
+
+    Results are keyed (team index, phase index), team index being the code
+    in the event table's 'team' dictionary.
+
+    Broadband tracking has no events: its sides are fixed (Home / Away),
+    the team with the player nearest the ball is taken to be in possession,
+    and one frame in FORMATION_TRACKING_STRIDE is used.
+    """
+
+    VERSION = 1
+    CHUNK_WINDOWS = 64 # Bounds the (windows, templates, points, clusters) distance tensor
+
+    def __init__(self, teams, windows):
+        self.teams = teams      # team names, by team index
+        self.windows = windows  # (team, phase) -> name -> array, one row per window
+
+    # --- Lookup ---
+    def count(self, team, phase):
+        return len(self.windows[team, phase]['first'])
+
+    def window_at(self, team, phase, frame_idx):
+        """Index of the last window starting at or before frame_idx (0 if none yet)."""
+        first = self.windows[team, phase]['first']
+        return max(int(np.searchsorted(first, frame_idx, side='right')) - 1, 0)
+
+    def formation(self, team, phase, window):
+        """
+        Dict with the window's formation label (None if it had too few
+        players), first / last frame and match minute, and the 10 outfield
+        positions (pitch coordinates, attacking +x, averaged over the window)
+        with their roles.
+        """
+        w = self.windows[team, phase]
+        template = int(w['template'][window])
+        return {
+            'team': self.teams[team],
+            'phase': PHASES[phase],
+            'label': FORMATIONS[template] if template >= 0 else None,
+            'first': int(w['first'][window]),
+            'last': int(w['last'][window]),
+            'minutes': (int(w['first_minute'][window]), int(w['last_minute'][window])),
+            'xy': w['xy'][window],
+            'roles': TEMPLATE_ROLES[template][w['roles'][window]] if template >= 0 else None,
+        }
+
+    # --- Batch computation ---
+    @classmethod
+    def build(cls, store, events):
+        if store.is_tracking:
+            teams = list(TEAMS)
+            acting = cls._tracking_possession(store)
+            minute = (np.asarray(store.clock) // 60).astype(np.int64)
+        else:
+            teams = [t.decode('utf-8') for t in events.dictionaries['team'][:2]]
+            rows = events.rows_for_events(store.event_ids)
+            acting = np.where(rows >= 0, events['team'][np.maximum(rows, 0)], -1)
+            acting[(acting < 0) | (acting > 1)] = -1
+            minute = np.where(rows >= 0, events['minute'][np.maximum(rows, 0)], -1)
+
+        windows = {}
+        for team in range(len(teams)):
+            for phase in range(len(PHASES)):
+                frames = np.flatnonzero(acting == (team if phase == 0 else 1 - team))
+                if store.is_tracking:
+                    # A team's rows are always its own side, attacking +x for home
+                    side, flip = TEAMS[team], team == 1
+                else:
+                    # In possession: the team is acting, its rows are the teammates
+                    side, flip = ('Home', False) if phase == 0 else ('Away', True)
+                window = cls._team_windows(store, frames, side, flip=flip)
+                window['first_minute'] = minute[window['first']].astype(np.int16)
+                window['last_minute'] = minute[window['last']].astype(np.int16)
+                windows[team, phase] = window
+        return cls(teams, windows)
+
+    @staticmethod
+    def _tracking_possession(store, stride=FORMATION_TRACKING_STRIDE):
+        """
+        Per frame, the team (0 home, 1 away) of the player nearest the ball,
+        on every stride-th frame with a known ball; -1 elsewhere.
+        """
+        acting = np.full(len(store), -1, dtype=np.int64)
+        sampled = np.arange(0, len(store), stride)
+        ball = np.asarray(store.ball)[sampled]
+        nearest = []
+        for team in TEAMS:
+            pts, _, _ = store.padded_positions(team)
+            dist = np.linalg.norm(pts[sampled] - ball[:, None, :], axis=-1)
+            nearest.append(np.min(np.where(np.isnan(dist), np.inf, dist), axis=1, initial=np.inf))
+        known = ~np.isnan(ball[:, 0]) & np.isfinite(np.minimum(*nearest))
+        acting[sampled[known]] = (nearest[1] < nearest[0])[known]
+        return acting
+
+    @classmethod
+    def _team_windows(cls, store, frames, side, flip):
+        """Clusters the windows of one team and phase; frames are that team's snapshots."""
+        start, end = store.team_bounds(side)
+        start, end = start[frames], end[frames]
+
+        # 1. Outfield rows of each frame, flattened in frame order
+        counts = end - start
+        owner = np.repeat(np.arange(len(frames)), counts)
+        rows = np.arange(counts.sum()) + np.repeat(start - (np.cumsum(counts) - counts), counts)
+        outfield = ~store.keeper[rows]
+        owner, rows = owner[outfield], rows[outfield]
+        xy = store.xy[rows].astype(np.float64)
+        if flip:
+            xy = np.array([PITCH_LENGTH, PITCH_WIDTH]) - xy
+
+        # 2. Frames with enough visible players, positions relative to their centroid
+        n_players = np.bincount(owner, minlength=len(frames))
+        keep = n_players[owner] >= FORMATION_MIN_PLAYERS
+        owner, xy = owner[keep], xy[keep]
+        used = np.flatnonzero(n_players >= FORMATION_MIN_PLAYERS)
+        owner = np.searchsorted(used, owner)
+        frames = frames[used]
+        centroid = np.stack([np.bincount(owner, weights=xy[:, d], minlength=len(frames)) for d in (0, 1)], axis=1)
+        centroid /= np.maximum(np.bincount(owner, minlength=len(frames)), 1)[:, None]
+        rel = xy - centroid[owner]
+
+        # 3. Sliding windows over the team's snapshots
+        n = len(frames)
+        starts = np.arange(0, max(n - FORMATION_WINDOW, 0) + 1, FORMATION_HOP) if n else np.zeros(0, dtype=np.int64)
+        stops = np.minimum(starts + FORMATION_WINDOW, n)
+        frame_rows = np.searchsorted(owner, np.arange(n + 1))
+        lo, hi = frame_rows[starts], frame_rows[stops]
+        # Where the shape sits on the pitch: mean position over the window
+        cumulative = np.concatenate([np.zeros((1, 2)), np.cumsum(xy, axis=0)])
+        anchor = (cumulative[hi] - cumulative[lo]) / np.maximum(hi - lo, 1)[:, None]
+
+        out = {
+            'first': frames[starts],
+            'last': frames[stops - 1],
+            'template': np.full(len(starts), -1, dtype=np.int8),
+            'xy': np.full((len(starts), OUTFIELD, 2), np.nan, dtype=np.float32),
+            'roles': np.zeros((len(starts), OUTFIELD), dtype=np.int8),
+        }
+        for c in range(0, len(starts), cls.CHUNK_WINDOWS):
+            sl = slice(c, c + cls.CHUNK_WINDOWS)
+            # Windows of a chunk as a padded (windows, points, 2) block
+            sizes = hi[sl] - lo[sl]
+            slot = np.arange(sizes.max() if len(sizes) else 0)
+            mask = slot[None, :] < sizes[:, None]
+            pts = np.where(mask[..., None], rel[np.where(mask, lo[sl, None] + slot[None, :], 0)], 0.0)
+            enough = sizes >= 3 * OUTFIELD
+
+            centres = cls._kmeans(pts, mask)
+            template, roles = cls._match_templates(centres)
+            out['template'][sl] = np.where(enough, template, -1)
+            out['xy'][sl] = centres + anchor[sl, None, :]
+            out['roles'][sl] = roles
+        return out
+
+    @staticmethod
+    def _kmeans(pts, mask, k=OUTFIELD, iterations=FORMATION_ITERATIONS):
+        """
+        Lloyd's k-means on every window of a block in lockstep: pts is
+        (windows, points, 2) with padding masked out; returns (windows, k, 2).
+        Each window is started from every template, scaled to its spread,
+        and keeps the run with the lowest inertia.
+        """
+        n_windows = len(pts)
+        weight = mask.astype(np.float64)
+        n = np.maximum(weight.sum(axis=1), 1)[:, None]
+        mean = (pts * weight[..., None]).sum(axis=1) / n
+        std = np.sqrt((((pts - mean[:, None]) ** 2) * weight[..., None]).sum(axis=1) / n) + 1e-6
+        init = (TEMPLATE_XY - TEMPLATE_XY.mean(axis=1, keepdims=True)) / TEMPLATE_XY.std(axis=1, keepdims=True)
+        # (windows, starts, k, 2)
+        centres = mean[:, None, None, :] + init[None] * std[:, None, None, :]
+        runs = centres.shape[1]
+
+        px, py = pts[:, None, :, None, 0], pts[:, None, :, None, 1]
+        cluster = np.arange(n_windows * runs).reshape(n_windows, runs, 1) * k
+        weights = np.broadcast_to(weight[:, None, :], (n_windows, runs, weight.shape[1])).ravel()
+        weighted = [np.broadcast_to((pts[..., d] * weight)[:, None, :], (n_windows, runs, weight.shape[1])).ravel()
+                    for d in (0, 1)]
+        for step in range(iterations + 1):
+            # Squared distances (windows, starts, points, k)
+            dist = (px - centres[:, :, None, :, 0]) ** 2 + (py - centres[:, :, None, :, 1]) ** 2
+            label = dist.argmin(axis=-1)
+            if step == iterations:
+                break
+            idx = (cluster + label).ravel()
+            size = np.bincount(idx, weights=weights, minlength=n_windows * runs * k).reshape(n_windows, runs, k)
+            sums = np.stack([np.bincount(idx, weights=w, minlength=n_windows * runs * k) for w in weighted], axis=-1)
+            sums = sums.reshape(n_windows, runs, k, 2)
+            # Empty clusters keep their previous centre
+            centres = np.where(size[..., None] > 0, sums / np.maximum(size, 1)[..., None], centres)
+
+        inertia = (np.take_along_axis(dist, label[..., None], axis=-1)[..., 0] * weight[:, None, :]).sum(axis=-1)
+        return centres[np.arange(n_windows), inertia.argmin(axis=1)]
+
+    @staticmethod
+    def _match_templates(centres):
+        """
+        Best template of every window and the template role of each centre:
+        both are standardised per axis, then assigned with the Hungarian
+        method. Returns ((windows,) template index, (windows, 10) role index).
+        """
+        from scipy.optimize import linear_sum_assignment
+
+        def standardise(xy):
+            return (xy - xy.mean(axis=-2, keepdims=True)) / (xy.std(axis=-2, keepdims=True) + 1e-6)
+
+        c = standardise(centres)
+        t = standardise(TEMPLATE_XY)
+        # (windows, templates, centres, template slots)
+        cost = ((c[:, None, :, None, :] - t[None, :, None, :, :]) ** 2).sum(axis=-1)
+
+        template = np.zeros(len(centres), dtype=np.int8)
+        roles = np.zeros((len(centres), OUTFIELD), dtype=np.int8)
+        for w in range(len(centres)):
+            best = None
+            for i in range(len(FORMATIONS)):
+                rows, cols = linear_sum_assignment(cost[w, i])
+                total = cost[w, i][rows, cols].sum()
+                if best is None or total < best[0]:
+                    best = (total, i, cols)
+            template[w], roles[w] = best[1], best[2]
+        return template, roles
+
+    # --- Disk cache ---
+    @staticmethod
+    def cache_path(match_path):
+        """Formation cache file stored next to a match file."""
+        base = match_path[:-len(MATCH_FILE_EXT)] if match_path.endswith(MATCH_FILE_EXT) else match_path
+        return base + '.formations' + MATCH_FILE_EXT
+
+    def save(self, path, store, source=None):
+        arrays = {f'{team}.{phase}.{name}': values
+                  for (team, phase), window in self.windows.items() for name, values in window.items()}
+        meta = {'kind': 'formations', 'version': self.VERSION, 'teams': self.teams,
+                'n_frames': len(store), 'n_rows': store.n_rows, 'source': source}
+        MatchFile.write(path, arrays, meta)
+
+    @classmethod
+    def load(cls, path, store, source=None):
+        """
+        Maps cached formations; None if missing or not built for this store
+        and source (MatchFile.identity of the match file they were built from).
+        """
+        try:
+            match_file = MatchFile.open(path)
+        except (OSError, ValueError):
+            return None
+        meta = match_file.meta
+        if (meta.get('kind') != 'formations' or meta.get('version') != cls.VERSION
+                or meta.get('n_frames') != len(store) or meta.get('n_rows') != store.n_rows
+                or meta.get('source') != source):
+            return None
+
+        windows = {}
+        for key, array in match_file.arrays.items():
+            team, phase, name = key.split('.')
+            windows.setdefault((int(team), int(phase)), {})[name] = array
+        return cls(meta['teams'], windows)
+
+    @classmethod
+    def load_or_build(cls, store, events, match_path=None):
+        """
+        Cached formations for the match at match_path, building and saving
+        them on a miss; like TacticalTimeline's, the cache is tied to the
+        match file's size and mtime.
+        """
+        source = MatchFile.identity(match_path) if match_path else None
+        path = cls.cache_path(match_path) if source is not None else None
+        if path and os.path.exists(path):
+            formations = cls.load(path, store, source)
+            if formations is not None:
+                return formations
+
+        formations = cls.build(store, events)
+        if path:
+            try:
+                formations.save(path, store, source)
+            except OSError as e:
+                print(f"Could not cache formations: {e}")
+        return formations
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+class FrameStore:
+    """
+    Columnar (CSR) layout of 360 freeze frames.
+
+    All player rows of a match live in flat arrays. Rows of frame i are
+    xy[offsets[i]:offsets[i+1]], with teammates first, so a frame's home and
+    away positions are two zero-copy slices split at splits[i].
+
+    Broadband tracking (see data/tracking.py) fills the same layout with
+    fixed sides (Home = home team) and adds who each row is, where the ball
+    is and when each frame was taken: player_ids (codes into players),
+    ball, clock (match seconds) and periods. They are None for 360 data.
+    """
+
+    def __init__(self, xy, teammate, actor, keeper, offsets, splits, event_ids,
+                 player_ids=None, players=None, ball=None, clock=None, periods=None):
+        self.xy = xy                # (n_rows, 2) float32
+        self.teammate = teammate    # (n_rows,) bool
+        self.actor = actor          # (n_rows,) bool
+        self.keeper = keeper        # (n_rows,) bool
+        self.offsets = offsets      # (n_frames + 1,) int64
+        self.splits = splits        # (n_frames,) int64, first away row of each frame
+        self.event_ids = event_ids  # (n_frames,) bytes, StatsBomb event uuid per frame
+        self.player_ids = player_ids # (n_rows,) int32 codes into players, or None
+        self.players = players      # (n_players,) bytes, player names
+        self.ball = ball            # (n_frames, 2) float32, NaN when unknown
+        self.clock = clock          # (n_frames,) float64 match seconds
+        self.periods = periods      # (n_frames,) int8
+        self._event_index = None
+
+    @classmethod
+    def from_dataframe(cls, frames_df):
+        """
+        Builds the store from the one-row-per-player DataFrame returned by
+        sb.frames (positions in 'location', or as 'x' / 'y' columns).
+        Frames keep the order in which their event id first appears.
+        """
+        codes, uniques = pd.factorize(frames_df['id'], sort=False)
+        n_frames = len(uniques)
+
+        def flag(col):
+            if col not in frames_df.columns:
+                return np.zeros(len(frames_df), dtype=bool)
+            return frames_df[col].fillna(False).to_numpy(dtype=bool)
+
+        teammate = flag('teammate')
+        actor = flag('actor')
+        keeper = flag('keeper')
+
+        # Group rows by frame, teammates first within each frame (lexsort is stable)
+        order = np.lexsort((~teammate, codes))
+        if 'x' in frames_df.columns and 'y' in frames_df.columns:
+            xy = np.column_stack([frames_df['x'].to_numpy(dtype=np.float32),
+                                  frames_df['y'].to_numpy(dtype=np.float32)])[order]
+        else:
+            xy = np.array(frames_df['location'].tolist(), dtype=np.float32).reshape(-1, 2)[order]
+
+        counts = np.bincount(codes, minlength=n_frames)
+        offsets = np.zeros(n_frames + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        home_counts = np.bincount(codes, weights=teammate, minlength=n_frames).astype(np.int64)
+        splits = offsets[:-1] + home_counts
+
+        event_ids = np.array([str(u).encode() for u in uniques], dtype='S36')
+
+        return cls(np.ascontiguousarray(xy), teammate[order], actor[order], keeper[order],
+                   offsets, splits, event_ids)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def n_rows(self):
+        return len(self.xy)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.to_arrays().values())
+
+    @property
+    def is_tracking(self):
+        """True for broadband tracking: frames carry their own time, player ids and ball."""
+        return self.clock is not None
+
+    def ball_at(self, frame_idx):
+        """Ball position of a frame, None if unknown."""
+        if self.ball is None or np.isnan(self.ball[frame_idx, 0]):
+            return None
+        return self.ball[frame_idx]
+
+    def frame_bounds(self, frame_idx):
+        """Returns (start, split, end) row positions of a frame."""
+        return (int(self.offsets[frame_idx]), int(self.splits[frame_idx]),
+                int(self.offsets[frame_idx + 1]))
+
+    def get_frame(self, frame_idx):
+        """Returns (home_xy, away_xy) as views into the position array."""
+        start, split, end = self.frame_bounds(frame_idx)
+        return self.xy[start:split], self.xy[split:end]
+
+    def team_bounds(self, team):
+        """Per-frame (start, end) row arrays of 'Home' (teammates) or 'Away' rows."""
+        if team == 'Home':
+            return self.offsets[:-1], self.splits
+        return self.splits, self.offsets[1:]
+
+    def padded_positions(self, team, lo=0, hi=None):
+        """
+        Positions of one team for frames lo..hi as a dense (frames, k, 2) block,
+        k being the largest team size in the range; missing slots are NaN.
+        Returns (positions, valid mask, team sizes).
+        """
+        rows, valid, counts = self._padded_rows(team, lo, hi)
+        pts = self.xy[rows].astype(np.float32) if self.n_rows else np.zeros(rows.shape + (2,), dtype=np.float32)
+        pts[~valid] = np.nan
+        return pts, valid, counts
+
+    def padded_player_ids(self, team, lo=0, hi=None):
+        """Player codes laid out like padded_positions, -1 in empty slots (None without ids)."""
+        if self.player_ids is None:
+            return None
+        rows, valid, _ = self._padded_rows(team, lo, hi)
+        ids = self.player_ids[rows] if self.n_rows else np.zeros(rows.shape, dtype=np.int32)
+        return np.where(valid, ids, -1)
+
+    def _padded_rows(self, team, lo, hi):
+        start, end = self.team_bounds(team)
+        start, end = start[lo:hi], end[lo:hi]
+        counts = end - start
+        k = int(counts.max()) if len(counts) else 0
+
+        slot = np.arange(k)
+        valid = slot[None, :] < counts[:, None]
+        rows = np.where(valid, start[:, None] + slot[None, :], 0)
+        return rows, valid, counts
+
+    def event_id(self, frame_idx):
+        return self.event_ids[frame_idx].decode()
+
+    @property
+    def event_index(self):
+        """Maps event uuid -> frame index (built on first use)."""
+        if self._event_index is None:
+            self._event_index = {eid.decode(): i for i, eid in enumerate(self.event_ids)}
+        return self._event_index
+
+    def frame_for_event(self, event_id):
+        return self.event_index.get(event_id)
+
+    # --- Serialization ---
+    ARRAY_NAMES = ('xy', 'teammate', 'actor', 'keeper', 'offsets', 'splits', 'event_ids')
+    TRACKING_ARRAY_NAMES = ('player_ids', 'players', 'ball', 'clock', 'periods')
+
+    def to_arrays(self, prefix='frames'):
+        names = self.ARRAY_NAMES + tuple(n for n in self.TRACKING_ARRAY_NAMES if getattr(self, n) is not None)
+        return {f'{prefix}.{name}': getattr(self, name) for name in names}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix='frames'):
+        tracking = {name: arrays.get(f'{prefix}.{name}') for name in cls.TRACKING_ARRAY_NAMES}
+        return cls(*(arrays[f'{prefix}.{name}'] for name in cls.ARRAY_NAMES), **tracking)
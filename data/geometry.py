@@ -0,0 +1,284 @@
+import os
+import numpy as np
+from data.match_file import MatchFile, MATCH_FILE_EXT
+
+TEAMS = ('Home', 'Away')
+
+class TacticalTimeline:
+    """
+    Team shape geometry for every frame of a match, computed in one batch pass.
+
+    Per frame and team: defensive-line x (deepest home / highest away player,
+    as drawn by the analytics overlay), centroid, width (y spread), depth
+    (x spread), convex hull vertices and hull area. Hulls are stored CSR-style:
+    hull_xy[team][hull_offsets[team][f]:hull_offsets[team][f+1]].
+    """
+
+    VERSION = 1
+    METRICS = ('def_line_x', 'centroid_x', 'centroid_y', 'width', 'depth', 'area')
+    CHUNK_FRAMES = 8192 # Bounds the (frames, k, k) hull tensors
+
+    def __init__(self, metrics, hull_xy, hull_offsets):
+        self.metrics = metrics            # team -> name -> (n_frames,) float32
+        self.hull_xy = hull_xy            # team -> (n_vertices, 2) float32
+        self.hull_offsets = hull_offsets  # team -> (n_frames + 1,) int64
+
+    def __len__(self):
+        return len(self.hull_offsets[TEAMS[0]]) - 1
+
+    # --- Lookup ---
+    def hull(self, frame_idx, team):
+        """Hull vertices (counter-clockwise) of a team in a frame; empty if none."""
+        lo, hi = self.hull_offsets[team][frame_idx], self.hull_offsets[team][frame_idx + 1]
+        return self.hull_xy[team][lo:hi]
+
+    def value(self, name, team, frame_idx):
+        return float(self.metrics[team][name][frame_idx])
+
+    # --- Between snapshots (PlaybackTimeline.blend) ---
+    @staticmethod
+    def _blend_teams(team, blend):
+        """
+        Teams at snapshots a and b of the players drawn as `team`: a's team
+        up to half-way and b's after it, with the other team on the far
+        side when Home / Away swap between the two.
+        """
+        _, _, w, flip = blend
+        other = TEAMS[1 - TEAMS.index(team)] if flip else team
+        return (other, team) if w >= 0.5 else (team, other)
+
+    @staticmethod
+    def _lerp(va, vb, w):
+        """va -> vb at weight w; a missing (NaN) end takes the other's value."""
+        if np.isnan(va):
+            return vb
+        if np.isnan(vb):
+            return va
+        return va + w * (vb - va)
+
+    def edge_x(self, team, frame_idx, deepest):
+        """Lowest (deepest) or highest x of a team's players in a frame, from its line and depth."""
+        line = self.value('def_line_x', team, frame_idx)
+        if deepest == (team == 'Home'):
+            return line
+        depth = self.value('depth', team, frame_idx)
+        return line + depth if team == 'Home' else line - depth
+
+    def line_between(self, team, blend):
+        """
+        Defensive-line x of the players drawn as `team` at a
+        PlaybackTimeline.blend (a, b, w, flip), interpolated between the two
+        snapshots. Across a Home / Away swap the far side's line is taken on
+        the same edge (deepest for Home), as the drawn players move there.
+        """
+        a, b, w, _ = blend
+        team_a, team_b = self._blend_teams(team, blend)
+        deepest = team == 'Home'
+        return self._lerp(self.edge_x(team_a, a, deepest), self.edge_x(team_b, b, deepest), w)
+
+    def hull_between(self, team, blend):
+        """
+        Hull of the players drawn as `team` at a PlaybackTimeline.blend
+        (a, b, w, flip): the nearest snapshot's hull, moved with the team's
+        interpolated centroid.
+        """
+        a, b, w, _ = blend
+        team_a, team_b = self._blend_teams(team, blend)
+        nearest = b if w >= 0.5 else a
+        vertices = self.hull(nearest, team)
+        shift = np.array([self._lerp(self.value(name, team_a, a), self.value(name, team_b, b), w)
+                          - self.value(name, team, nearest) for name in ('centroid_x', 'centroid_y')],
+                         dtype=np.float32)
+        return vertices + shift if len(vertices) and not np.isnan(shift).any() else vertices
+
+    def to_dataframe(self, store=None):
+        """Per-frame metrics table (e.g. home_width, away_area), one row per frame."""
+        import pandas as pd
+        table = {'frame': np.arange(len(self))}
+        if store is not None:
+            table['event_id'] = [eid.decode() for eid in store.event_ids]
+        for team in TEAMS:
+            for name in self.METRICS:
+                table[f'{team.lower()}_{name}'] = self.metrics[team][name]
+        return pd.DataFrame(table)
+
+    # --- Batch computation ---
+    @classmethod
+    def build(cls, store):
+        metrics = {}
+        hull_xy = {}
+        hull_offsets = {}
+        for team in TEAMS:
+            parts = {name: [] for name in cls.METRICS if name != 'area'}
+            hulls, counts = [], []
+            for lo in range(0, len(store), cls.CHUNK_FRAMES):
+                pts, valid, n = store.padded_positions(team, lo, lo + cls.CHUNK_FRAMES)
+                for name, values in cls._shape_metrics(pts, valid, n, deepest=(team == 'Home')).items():
+                    parts[name].append(values)
+                order, n_vertices = cls._convex_hulls(pts, valid)
+                hulls.append(cls._gather_hulls(pts, order, n_vertices))
+                counts.append(n_vertices)
+
+            metrics[team] = {name: (np.concatenate(v) if v else np.zeros(0, dtype=np.float32))
+                             for name, v in parts.items()}
+            counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+            hull_offsets[team] = np.zeros(len(store) + 1, dtype=np.int64)
+            np.cumsum(counts, out=hull_offsets[team][1:])
+            hull_xy[team] = np.concatenate(hulls) if hulls else np.zeros((0, 2), dtype=np.float32)
+            metrics[team]['area'] = cls._polygon_areas(hull_xy[team], hull_offsets[team])
+        return cls(metrics, hull_xy, hull_offsets)
+
+    @staticmethod
+    def _shape_metrics(pts, valid, counts, deepest):
+        """Line, centroid and spread of every frame at once; NaN where a team has no players."""
+        x = np.where(valid, pts[..., 0], np.nan)
+        y = np.where(valid, pts[..., 1], np.nan)
+        has = counts > 0
+        # Frames without players are filled with zeros to keep the nan-reductions quiet
+        x[~has] = 0.0
+        y[~has] = 0.0
+
+        out = {}
+        if x.shape[1] == 0:
+            nan = np.full(len(x), np.nan, dtype=np.float32)
+            return {name: nan.copy() for name in ('def_line_x', 'centroid_x', 'centroid_y', 'width', 'depth')}
+
+        min_x, max_x = np.nanmin(x, axis=1), np.nanmax(x, axis=1)
+        out['def_line_x'] = min_x if deepest else max_x
+        out['centroid_x'] = np.nanmean(x, axis=1)
+        out['centroid_y'] = np.nanmean(y, axis=1)
+        out['width'] = np.nanmax(y, axis=1) - np.nanmin(y, axis=1)
+        out['depth'] = max_x - min_x
+        return {name: np.where(has, v, np.nan).astype(np.float32) for name, v in out.items()}
+
+    @staticmethod
+    def _convex_hulls(pts, valid):
+        """
+        Gift wrapping run on all frames of a block in lockstep.
+        Returns (order, n_vertices): order[f, :n_vertices[f]] are the hull's
+        player slots counter-clockwise. Degenerate hulls get 0 vertices.
+        """
+        n_frames, k = valid.shape
+        order = np.full((n_frames, k), -1, dtype=np.int64)
+        n_vertices = np.zeros(n_frames, dtype=np.int64)
+        if k < 3:
+            return order, n_vertices
+
+        p = np.where(valid[..., None], pts, 0.0).astype(np.float64)
+        # Leftmost (then lowest) player is always on the hull
+        key = np.where(valid, p[..., 0] * 1024 + p[..., 1], np.inf)
+        current = np.argmin(key, axis=1)
+        start_xy = p[np.arange(n_frames), current]
+        active = valid.sum(axis=1) >= 3
+
+        for step in range(k):
+            idx = np.flatnonzero(active)
+            if not len(idx):
+                break
+            order[idx, step] = current[idx]
+            n_vertices[idx] += 1
+
+            rel = p[idx] - p[idx, current[idx]][:, None, :]
+            # cross[a, j, r] > 0 when r lies left of the edge current -> j
+            cross = rel[:, :, None, 0] * rel[:, None, :, 1] - rel[:, :, None, 1] * rel[:, None, :, 0]
+            v = valid[idx]
+            right = (cross < -1e-9) & v[:, None, :]
+            candidate = ~right.any(axis=2) & v
+            # Among collinear candidates take the farthest, skipping edge midpoints
+            dist = np.where(candidate, (rel**2).sum(axis=-1), -1.0)
+            nxt = np.argmax(dist, axis=1)
+            reach = dist[np.arange(len(idx)), nxt]
+
+            # Closed once we are back on the start position (also covers duplicates)
+            closed = np.all(p[idx, nxt] == start_xy[idx], axis=1) | (reach <= 0)
+            current[idx] = nxt
+            active[idx[closed]] = False
+
+        n_vertices[n_vertices < 3] = 0
+        return order, n_vertices
+
+    @staticmethod
+    def _gather_hulls(pts, order, n_vertices):
+        """Flattens per-frame hull slots into one (n_vertices_total, 2) array."""
+        if order.shape[1] == 0:
+            return np.zeros((0, 2), dtype=np.float32)
+        used = np.arange(order.shape[1])[None, :] < n_vertices[:, None]
+        f, slot = np.nonzero(used)
+        return pts[f, order[f, slot]].astype(np.float32)
+
+    @staticmethod
+    def _polygon_areas(xy, offsets):
+        """Shoelace area of every CSR polygon, via one cumulative sum."""
+        n = len(xy)
+        if n == 0:
+            return np.zeros(len(offsets) - 1, dtype=np.float32)
+        nxt = np.arange(1, n + 1)
+        sizes = np.diff(offsets)
+        ends = offsets[1:][sizes > 0]
+        nxt[ends - 1] = offsets[:-1][sizes > 0] # Last vertex wraps to the first
+        x, y = xy[:, 0].astype(np.float64), xy[:, 1].astype(np.float64)
+        terms = x * y[nxt] - x[nxt] * y
+        cs = np.concatenate([[0.0], np.cumsum(terms)])
+        return (0.5 * np.abs(cs[offsets[1:]] - cs[offsets[:-1]])).astype(np.float32)
+
+    # --- Disk cache ---
+    @staticmethod
+    def cache_path(match_path):
+        """Geometry cache file stored next to a match file."""
+        base = match_path[:-len(MATCH_FILE_EXT)] if match_path.endswith(MATCH_FILE_EXT) else match_path
+        return base + '.geometry' + MATCH_FILE_EXT
+
+    def save(self, path, store, source=None):
+        arrays = {}
+        for team in TEAMS:
+            for name in self.METRICS:
+                arrays[f'{team}.{name}'] = self.metrics[team][name]
+            arrays[f'{team}.hull_xy'] = self.hull_xy[team]
+            arrays[f'{team}.hull_offsets'] = self.hull_offsets[team]
+        meta = {'kind': 'geometry', 'version': self.VERSION,
+                'n_frames': len(store), 'n_rows': store.n_rows, 'source': source}
+        MatchFile.write(path, arrays, meta)
+
+    @classmethod
+    def load(cls, path, store, source=None):
+        """
+        Maps a cached timeline; None if missing or not built for this store
+        and source (MatchFile.identity of the match file it was built from).
+        """
+        try:
+            match_file = MatchFile.open(path)
+        except (OSError, ValueError):
+            return None
+        meta = match_file.meta
+        if (meta.get('kind') != 'geometry' or meta.get('version') != cls.VERSION
+                or meta.get('n_frames') != len(store) or meta.get('n_rows') != store.n_rows
+                or meta.get('source') != source):
+            return None
+
+        a = match_file.arrays
+        metrics = {team: {name: a[f'{team}.{name}'] for name in cls.METRICS} for team in TEAMS}
+        hull_xy = {team: a[f'{team}.hull_xy'] for team in TEAMS}
+        hull_offsets = {team: a[f'{team}.hull_offsets'] for team in TEAMS}
+        return cls(metrics, hull_xy, hull_offsets)
+
+    @classmethod
+    def load_or_build(cls, store, match_path=None):
+        """
+        Cached timeline for the match at match_path, building and saving it
+        on a miss. The cache is tied to the match file's size and mtime, so
+        rebuilding the match file rebuilds it too.
+        """
+        source = MatchFile.identity(match_path) if match_path else None
+        path = cls.cache_path(match_path) if source is not None else None
+        if path and os.path.exists(path):
+            timeline = cls.load(path, store, source)
+            if timeline is not None:
+                return timeline
+
+        timeline = cls.build(store)
+        if path:
+            try:
+                timeline.save(path, store, source)
+            except OSError as e:
+                print(f"Could not cache tactical geometry: {e}")
+        return timeline
@@ -1,43 +1,155 @@
-from statsbombpy import sb
-import pandas as pd
+import atexit
+import threading
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from data.cache import MatchCache
+from utils.config import COMPETITION_ID, SEASON_ID, OFFLINE_MODE, LOADER_WORKERS, OPEN_DATA_DIR, DATA_BACKEND
 
 # Suppress pandas warnings that sb might trigger
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
+def _statsbomb():
+    """
+    statsbombpy pulls in pandas and requests, which take a good part of a
+    second to import; only pay for it on the first API request, normally on
+    a loader thread while the window is already up.
+    """
+    from statsbombpy import sb
+    return sb
+
 class DataLoader:
     """
-    Handles loading match data from StatsBomb API.
+    Handles loading match data from StatsBomb API, or from a local clone of
+    the open-data repository with the 'open-data' backend.
+    Results are kept in a local MatchCache so repeat launches skip the network.
+    Requests are thread-safe: concurrent calls for the same key share one fetch,
+    and submit() runs any getter on a shared I/O thread pool.
     """
-    
-    @staticmethod
-    def get_public_matches(competition_id=43, season_id=106):
+
+    cache = MatchCache()
+    offline = OFFLINE_MODE
+    local = None # OpenDataDirectory of the 'open-data' backend
+    executor = None
+    _inflight = {} # key -> Future of the fetch in progress
+    _lock = threading.Lock()
+
+    @classmethod
+    def set_offline(cls, offline=True):
+        """In offline mode only the local cache is consulted."""
+        cls.offline = offline
+
+    @classmethod
+    def set_backend(cls, backend, data_dir=None):
+        """'statsbombpy' or 'open-data' (reads the local clone at data_dir)."""
+        if backend == 'statsbombpy':
+            cls.local = None
+        elif backend == 'open-data':
+            if not data_dir:
+                raise ValueError("The open-data backend needs a data directory (PITCH_REPLAY_OPEN_DATA)")
+            from data.open_data import OpenDataDirectory
+            cls.local = OpenDataDirectory(data_dir)
+        else:
+            raise ValueError(f"Unknown data backend: {backend}")
+
+    @classmethod
+    def set_data_dir(cls, path):
+        """Reads matches from a local open-data directory (None = StatsBomb API)."""
+        cls.set_backend('open-data' if path else 'statsbombpy', path)
+
+    @classmethod
+    def submit(cls, getter, *args, **kwargs):
+        """Runs getter(*args, **kwargs) on the loader thread pool; returns a Future."""
+        with cls._lock:
+            if cls.executor is None:
+                cls.executor = ThreadPoolExecutor(max_workers=LOADER_WORKERS, thread_name_prefix='loader')
+        return cls.executor.submit(getter, *args, **kwargs)
+
+    @classmethod
+    def close(cls):
+        """Persists the cache index (see MatchCache.close); registered to run at exit."""
+        if cls.cache is not None:
+            cls.cache.close()
+
+    @classmethod
+    def _cached(cls, key, fetch):
+        """
+        Returns the cached value for key, or calls fetch() and caches it.
+        If another thread is already fetching key, waits for its result instead.
+        """
+        if cls.cache is not None:
+            cached = cls.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if cls.offline:
+            print(f"Offline mode: {key} is not in the local cache.")
+            return None
+
+        with cls._lock:
+            pending = cls._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = cls._inflight[key] = Future()
+        if not owner:
+            return pending.result()
+
+        try:
+            result = fetch()
+            if result is not None and cls.cache is not None:
+                cls.cache.put(key, result)
+            pending.set_result(result)
+            return result
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with cls._lock:
+                del cls._inflight[key]
+
+    @classmethod
+    def get_public_matches(cls, competition_id=COMPETITION_ID, season_id=SEASON_ID):
         """
-        Get list of available matches. 
+        Get list of available matches.
         Default: World Cup 2022 (Comp ID 43, Season ID 106)
         """
-        matches = sb.matches(competition_id=competition_id, season_id=season_id)
+        if cls.local is not None:
+            return cls.local.matches(competition_id, season_id)
+        key = MatchCache.make_key('matches', competition_id, season_id)
+        matches = cls._cached(key, lambda: _statsbomb().matches(competition_id=competition_id, season_id=season_id))
+        if matches is None:
+            import pandas as pd
+            return pd.DataFrame()
         return matches
 
-    @staticmethod
-    def get_match_events(match_id):
+    @classmethod
+    def get_match_events(cls, match_id, competition_id=COMPETITION_ID, season_id=SEASON_ID):
         """
         Fetch all events for a specific match.
         """
         print(f"Loading events for match {match_id}...")
-        events = sb.events(match_id=match_id)
-        return events
+        if cls.local is not None:
+            return cls.local.events(match_id)
+        key = MatchCache.make_key('events', competition_id, season_id, match_id)
+        return cls._cached(key, lambda: _statsbomb().events(match_id=match_id))
 
-    @staticmethod
-    def get_match_360_frames(match_id):
+    @classmethod
+    def get_match_360_frames(cls, match_id, competition_id=COMPETITION_ID, season_id=SEASON_ID):
         """
         Fetch 360 frames (tracking data) for a match if available.
         Note: Only selected matches have 360 data.
         """
-        try:
-            # StatsBombPy uses sb.frames for 360 data
-            frames = sb.frames(match_id=match_id, fmt="dataframe")
-            return frames
-        except Exception as e:
-            print(f"360 data not available or error loading: {e}")
-            return None
+        def fetch():
+            try:
+                # StatsBombPy uses sb.frames for 360 data
+                return _statsbomb().frames(match_id=match_id, fmt="dataframe")
+            except Exception as e:
+                print(f"360 data not available or error loading: {e}")
+                return None
+
+        if cls.local is not None:
+            return cls.local.frames(match_id) if cls.local.has_360(match_id) else None
+        key = MatchCache.make_key('frames', competition_id, season_id, match_id)
+        return cls._cached(key, fetch)
+
+DataLoader.set_backend(DATA_BACKEND, OPEN_DATA_DIR)
+atexit.register(DataLoader.close)
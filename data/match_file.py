@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import struct
+import numpy as np
+
+MAGIC = b'PRMATCH\x00'
+VERSION = 1
+ALIGNMENT = 64
+MATCH_FILE_EXT = '.prm'
+SPOOL_COPY_BYTES = 1 << 24 # Copy buffer when MatchFileWriter assembles the file
+
+# magic, version, reserved, header length
+_PREAMBLE = struct.Struct('<8sHHI')
+
+class MatchFile:
+    """
+    Single-file binary match format.
+
+    Layout: a fixed preamble (magic, version, header length), a JSON header
+    listing every array's dtype, shape and byte offset plus free-form match
+    metadata, then the raw arrays, each aligned to 64 bytes. Opening a file
+    maps it once with np.memmap and hands out views, so nothing is parsed or
+    copied and processes opening the same match share its pages.
+    """
+
+    def __init__(self, path, meta, arrays):
+        self.path = path
+        self.meta = meta
+        self.arrays = arrays
+
+    @staticmethod
+    def write(path, arrays, meta=None):
+        """Writes a dict of name -> ndarray to path (atomically, via a temp file)."""
+        table = {}
+        offset = 0
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            table[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += array.nbytes
+
+        header = json.dumps({'meta': meta or {}, 'arrays': table}).encode('utf-8')
+        data_start = -(-(_PREAMBLE.size + len(header)) // ALIGNMENT) * ALIGNMENT
+
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, 0, len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + table[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def identity(path):
+        """
+        [size, mtime in ns] of a file, stored by caches derived from it so a
+        rebuilt file invalidates them; None if the file does not exist.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    @classmethod
+    def read_header(cls, path):
+        """Returns (meta, array table, data offset), validating magic and version."""
+        with open(path, 'rb') as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise ValueError(f"{path} is not a match file (truncated header)")
+            magic, version, _, header_len = _PREAMBLE.unpack(preamble)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a match file")
+            if version != VERSION:
+                raise ValueError(f"{path} has match file version {version}, expected {VERSION}")
+            header = json.loads(f.read(header_len).decode('utf-8'))
+
+        data_start = -(-(_PREAMBLE.size + header_len) // ALIGNMENT) * ALIGNMENT
+        return header['meta'], header['arrays'], data_start
+
+    @classmethod
+    def open(cls, path):
+        """Memory-maps a match file read-only."""
+        meta, table, data_start = cls.read_header(path)
+        size = os.path.getsize(path)
+
+        mm = np.memmap(path, dtype=np.uint8, mode='r') if size > data_start else None
+        arrays = {}
+        for name, spec in table.items():
+            dtype = np.dtype(spec['dtype'])
+            shape = tuple(spec['shape'])
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            start = data_start + spec['offset']
+            if nbytes == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            if start + nbytes > size:
+                raise ValueError(f"{path} is truncated (array '{name}' runs past end of file)")
+            arrays[name] = mm[start:start + nbytes].view(dtype).reshape(shape)
+
+        return cls(path, meta, arrays)
+
+class MatchFileWriter:
+    """
+    Writes a match file whose arrays arrive in chunks, e.g. from a streaming
+    ingest: append() adds rows to the end of an array (all chunks of an array
+    share the trailing dimensions and dtype), and close() lays the arrays
+    out like MatchFile.write. Chunks go straight to a spool file per array,
+    so memory does not grow with the number of rows.
+
+        with MatchFileWriter(path, meta) as writer:
+            for chunk in chunks:
+                writer.append('frames.xy', chunk)
+    """
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = meta or {}
+        self._spools = {} # name -> (file, dtype, trailing shape, rows)
+
+    def append(self, name, chunk):
+        chunk = np.ascontiguousarray(chunk)
+        spool = self._spools.get(name)
+        if spool is None:
+            spool = self._spools[name] = [open(f"{self.path}.{len(self._spools)}.spool", 'w+b'),
+                                          chunk.dtype, chunk.shape[1:], 0]
+        f, dtype, trailing, rows = spool
+        if chunk.dtype != dtype or chunk.shape[1:] != trailing:
+            raise ValueError(f"Chunk of '{name}' is {chunk.dtype} {chunk.shape}, "
+                             f"expected {dtype} (n, {', '.join(map(str, trailing))})")
+        f.write(chunk.tobytes())
+        spool[3] = rows + len(chunk)
+
+    def add(self, name, array):
+        """A whole array at once (e.g. a small dictionary)."""
+        self.append(name, np.asarray(array))
+
+    def close(self):
+        """Writes the match file (atomically, via a temp file) and drops the spools."""
+        table = {}
+        offset = 0
+        for name, (_, dtype, trailing, rows) in self._spools.items():
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            table[name] = {'dtype': dtype.str, 'shape': [rows, *trailing], 'offset': offset}
+            offset += rows * int(np.prod(trailing, dtype=np.int64)) * dtype.itemsize
+
+        header = json.dumps({'meta': self.meta, 'arrays': table}).encode('utf-8')
+        data_start = -(-(_PREAMBLE.size + len(header)) // ALIGNMENT) * ALIGNMENT
+
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'wb') as out:
+                out.write(_PREAMBLE.pack(MAGIC, VERSION, 0, len(header)))
+                out.write(header)
+                for name, (f, _, _, _) in self._spools.items():
+                    out.seek(data_start + table[name]['offset'])
+                    f.seek(0)
+                    shutil.copyfileobj(f, out, SPOOL_COPY_BYTES)
+                out.truncate(data_start + offset)
+            os.replace(tmp, self.path)
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Deletes the spool files without writing the match file."""
+        for f, _, _, _ in self._spools.values():
+            f.close()
+            os.remove(f.name)
+        self._spools = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
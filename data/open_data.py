@@ -0,0 +1,179 @@
+import json
+import os
+from array import array
+import numpy as np
+import pandas as pd
+
+CHUNK_CHARS = 1 << 20 # Text read per step while streaming a JSON file
+
+def iter_json_array(path, chunk_chars=CHUNK_CHARS):
+    """
+    Yields the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks and each element is decoded with the C
+    scanner (JSONDecoder.raw_decode) straight from the chunk buffer, so only
+    one element is alive at a time instead of the whole parsed document.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_chars)
+        pos = 0
+        started = False
+        while True:
+            # Skip whitespace / separators, refilling the buffer as needed
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buf):
+                    break
+                buf, pos = f.read(chunk_chars), 0
+                if not buf:
+                    raise ValueError(f"{path}: unexpected end of JSON array")
+
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError(f"{path}: expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element runs past the buffer: keep its start and read more
+                more = f.read(chunk_chars)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield element
+            pos = end
+            if pos > chunk_chars:
+                buf, pos = buf[pos:], 0
+
+def _name(value):
+    """'name' of a StatsBomb {id, name} object, NaN if absent."""
+    return value['name'] if isinstance(value, dict) else np.nan
+
+class OpenDataDirectory:
+    """
+    Reads a local clone of the StatsBomb open-data repository
+    (data/matches/<competition>/<season>.json, data/events/<match>.json,
+    data/three-sixty/<match>.json) without any network access.
+
+    Events and 360 frames are streamed element by element into typed column
+    buffers, keeping only the fields the app uses, instead of flattening every
+    attribute of every event into a wide pandas frame like statsbombpy does.
+    """
+
+    def __init__(self, root):
+        # Accept either the repository root or its data/ folder
+        data = os.path.join(root, 'data')
+        self.root = data if os.path.isdir(os.path.join(data, 'matches')) else root
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def has_360(self, match_id):
+        return os.path.exists(self.path('three-sixty', f'{match_id}.json'))
+
+    def matches(self, competition_id, season_id):
+        """Flat matches table (home_team / away_team names, ids, date, 360 status)."""
+        with open(self.path('matches', str(competition_id), f'{season_id}.json'), 'rb') as f:
+            matches = json.load(f)
+        rows = []
+        for m in matches:
+            rows.append({
+                'match_id': m['match_id'],
+                'match_date': m.get('match_date'),
+                'kick_off': m.get('kick_off'),
+                'competition': m.get('competition', {}).get('competition_name'),
+                'season': m.get('season', {}).get('season_name'),
+                'home_team': m['home_team']['home_team_name'],
+                'away_team': m['away_team']['away_team_name'],
+                'home_score': m.get('home_score'),
+                'away_score': m.get('away_score'),
+                'match_status': m.get('match_status'),
+                'match_status_360': m.get('match_status_360'),
+            })
+        return pd.DataFrame(rows)
+
+    def events(self, match_id):
+        """
+        Events with the columns kept by DataPreprocessor.process_events
+        (same names and values as sb.events).
+        """
+        strings = {name: [] for name in ('id', 'timestamp', 'type', 'player', 'team',
+                                         'pass_outcome', 'shot_outcome')}
+        locations, end_locations = [], []
+        index, period = array('i'), array('b')
+        minute, second = array('h'), array('h')
+        xg = array('f')
+
+        for ev in iter_json_array(self.path('events', f'{match_id}.json')):
+            pass_ = ev.get('pass') or {}
+            shot = ev.get('shot') or {}
+            strings['id'].append(ev['id'])
+            strings['timestamp'].append(ev.get('timestamp'))
+            strings['type'].append(_name(ev.get('type')))
+            strings['player'].append(_name(ev.get('player')))
+            strings['team'].append(_name(ev.get('team')))
+            strings['pass_outcome'].append(_name(pass_.get('outcome')))
+            strings['shot_outcome'].append(_name(shot.get('outcome')))
+            locations.append(ev.get('location', np.nan))
+            end_locations.append(pass_.get('end_location', np.nan))
+            index.append(ev.get('index', -1))
+            period.append(ev.get('period', -1))
+            minute.append(ev.get('minute', -1))
+            second.append(ev.get('second', -1))
+            xg.append(shot.get('statsbomb_xg', np.nan))
+
+        return pd.DataFrame({
+            'id': strings['id'],
+            'index': np.frombuffer(index, dtype=np.int32),
+            'period': np.frombuffer(period, dtype=np.int8),
+            'timestamp': strings['timestamp'],
+            'minute': np.frombuffer(minute, dtype=np.int16),
+            'second': np.frombuffer(second, dtype=np.int16),
+            'type': strings['type'],
+            'player': strings['player'],
+            'team': strings['team'],
+            'location': locations,
+            'pass_end_location': end_locations,
+            'pass_outcome': strings['pass_outcome'],
+            'shot_statsbomb_xg': np.frombuffer(xg, dtype=np.float32),
+            'shot_outcome': strings['shot_outcome'],
+        })
+
+    def frames(self, match_id):
+        """
+        One row per visible player like sb.frames, with positions as float32
+        'x' / 'y' columns (read directly by FrameStore.from_dataframe).
+        """
+        ids = []
+        counts = array('q')
+        teammate, actor, keeper = array('b'), array('b'), array('b')
+        xy = array('f')
+
+        for frame in iter_json_array(self.path('three-sixty', f'{match_id}.json')):
+            players = frame['freeze_frame']
+            ids.append(frame['event_uuid'])
+            counts.append(len(players))
+            for p in players:
+                teammate.append(p.get('teammate', False))
+                actor.append(p.get('actor', False))
+                keeper.append(p.get('keeper', False))
+                xy.extend(p['location'][:2])
+
+        xy = np.frombuffer(xy, dtype=np.float32).reshape(-1, 2)
+        return pd.DataFrame({
+            'id': np.repeat(np.array(ids, dtype=object), np.frombuffer(counts, dtype=np.int64)),
+            'match_id': match_id,
+            'teammate': np.frombuffer(teammate, dtype=np.int8).astype(bool),
+            'actor': np.frombuffer(actor, dtype=np.int8).astype(bool),
+            'keeper': np.frombuffer(keeper, dtype=np.int8).astype(bool),
+            'x': xy[:, 0],
+            'y': xy[:, 1],
+        })
@@ -0,0 +1,220 @@
+from collections import OrderedDict
+import numpy as np
+from data.geometry import TEAMS
+from utils.config import (FPS, PLAYBACK_CHUNK_FRAMES, PLAYBACK_CACHE_CHUNKS, PLAYBACK_MAX_STEP,
+                          PERIOD_BREAK_SECONDS)
+
+class PlaybackTimeline:
+    """
+    Time-based playback of the sparse 360 snapshots of a match.
+
+    Every snapshot is placed on a continuous match clock from its event's
+    period and timestamp. Playback samples that clock at `rate` frames per
+    match second; between two snapshots the players of each team are matched
+    by minimum total displacement (linear_sum_assignment) and moved linearly.
+    Broadband tracking frames carry their own clock and player ids, so they
+    are placed by that clock and players are matched by id instead.
+    Samples are computed a chunk at a time as (chunk, k, 2) position tensors
+    and kept in a small LRU cache, so memory does not grow with match length.
+    """
+
+    def __init__(self, frames, events, rate=FPS, chunk_frames=PLAYBACK_CHUNK_FRAMES,
+                 cache_chunks=PLAYBACK_CACHE_CHUNKS, max_step=PLAYBACK_MAX_STEP):
+        self.frames = frames
+        self.rate = rate
+        self.chunk_frames = chunk_frames
+        self.cache_chunks = cache_chunks
+        self.max_step = max_step
+
+        rows = events.rows_for_events(frames.event_ids)
+        self.event_rows = rows
+        if frames.is_tracking:
+            # Sides are fixed to the home / away team
+            self.times = self.layout_periods(frames.clock, frames.periods)
+            self.flips = np.zeros(max(len(rows) - 1, 0), dtype=bool)
+        else:
+            self.times = self.snapshot_times(events, rows)
+            # 'teammate' is relative to the event's actor, so Home / Away swap
+            # between snapshots whose events belong to different teams
+            team = np.where(rows >= 0, events['team'][rows], -1) if len(events) else np.full(len(rows), -1)
+            self.flips = (team[:-1] >= 0) & (team[1:] >= 0) & (team[:-1] != team[1:])
+
+        self.duration = float(self.times[-1]) if len(self.times) else 0.0
+        self._chunks = OrderedDict()
+
+    @staticmethod
+    def snapshot_times(events, rows):
+        """
+        Match clock (seconds) of each snapshot, from its event's period and
+        timestamp (see layout_periods).
+        """
+        n = len(rows)
+        known = rows >= 0
+        clock = np.full(n, np.nan)
+        period = np.full(n, -1)
+        if len(events):
+            clock[known] = events['clock'][rows[known]]
+            period[known] = events['period'][rows[known]]
+        return PlaybackTimeline.layout_periods(clock, period)
+
+    @staticmethod
+    def layout_periods(clock, period):
+        """
+        Playback times of frames given their clock (NaN if unknown) and
+        period (-1 if unknown). Periods are laid end to end with a short
+        break; frames without a time keep the time of the previous one, so
+        the clock never runs backwards.
+        """
+        n = len(clock)
+        if not n:
+            return np.zeros(0)
+
+        times = np.full(n, np.nan)
+        offset = 0.0
+        for p in np.unique(period[period >= 0]):
+            in_period = (period == p) & ~np.isnan(clock)
+            if not in_period.any():
+                continue
+            start = clock[in_period].min()
+            times[in_period] = offset + clock[in_period] - start
+            offset = times[in_period].max() + PERIOD_BREAK_SECONDS
+
+        # Forward-fill unknown times, then make the clock monotonic
+        times[0] = 0.0 if np.isnan(times[0]) else times[0]
+        filled = np.where(np.isnan(times), -np.inf, times)
+        times = np.maximum.accumulate(filled)
+        return times - times[0]
+
+    def __len__(self):
+        """Number of playback frames."""
+        return int(self.duration * self.rate) + 1 if len(self.times) else 0
+
+    def frame_at(self, seconds):
+        """Playback frame shown at a match-clock time."""
+        return min(max(int(round(seconds * self.rate)), 0), len(self) - 1)
+
+    def positions(self, frame):
+        """
+        Returns (snapshot index, home_xy, away_xy) of a playback frame. The
+        snapshot is the nearest one in time and drives events / analytics.
+        """
+        chunk, i = divmod(frame, self.chunk_frames)
+        snapshot, xy, counts = self._chunk(chunk)[:3]
+        return int(snapshot[i]), xy[0, i, :counts[0, i]], xy[1, i, :counts[1, i]]
+
+    def blend(self, frame):
+        """
+        (a, b, w, flip) of a playback frame: the snapshots it lies between,
+        the weight moving players from a to b and whether Home / Away swap
+        between them. Lets per-snapshot values (e.g. TacticalTimeline) follow
+        the interpolated players.
+        """
+        chunk, i = divmod(frame, self.chunk_frames)
+        a, b, w = (v[i] for v in self._chunk(chunk)[3:])
+        a, b = int(a), int(b)
+        return a, b, float(w), b > a and bool(self.flips[a])
+
+    # --- Chunks ---
+    def _chunk(self, chunk):
+        if chunk in self._chunks:
+            self._chunks.move_to_end(chunk)
+            return self._chunks[chunk]
+        data = self._build_chunk(chunk)
+        self._chunks[chunk] = data
+        if len(self._chunks) > self.cache_chunks:
+            self._chunks.popitem(last=False)
+        return data
+
+    def _build_chunk(self, chunk):
+        """
+        Interpolated positions of playback frames [chunk * size, (chunk + 1) * size),
+        plus the snapshot pair and weight of each (see blend).
+        """
+        # 1. Snapshot pair and blend weight per playback frame
+        t = np.arange(chunk * self.chunk_frames, min((chunk + 1) * self.chunk_frames, len(self))) / self.rate
+        n = len(self.times)
+        a = np.clip(np.searchsorted(self.times, t, side='right') - 1, 0, n - 1)
+        b = np.minimum(a + 1, n - 1)
+        span = self.times[b] - self.times[a]
+        w = np.clip((t - self.times[a]) / np.where(span > 0, span, 1), 0, 1).astype(np.float32)
+        w[span <= 0] = 0
+        # The second half of a step shows the next snapshot's players
+        late = w >= 0.5
+        snapshot = np.where(late, b, a)
+
+        # 2. Start / end of every player track between the snapshots involved
+        lo, hi = int(a.min()), int(b.max())
+        pts, counts, end_a, start_b = self._tracks(lo, hi)
+        j = (a - lo)[None, :]
+        team = np.arange(2)[:, None]
+        late_xy = late[None, :, None, None]
+        start = np.where(late_xy, start_b[team, j], pts[team, j])
+        end = np.where(late_xy, pts[team, j + 1], end_a[team, j])
+        xy = start + w[None, :, None, None] * (end - start)
+        counts = np.where(late[None, :], counts[team, j + 1], counts[team, j])
+        return snapshot, xy, counts, a, b, w
+
+    def _tracks(self, lo, hi):
+        """
+        Matches the players of consecutive snapshots lo..hi. Returns padded
+        (team, snapshot, k, 2) positions and team sizes, plus for every step
+        s -> s + 1 where each player of s ends up (end_a) and where each
+        player of s + 1 came from (start_b). Unmatched players stay put.
+        """
+        # 1. Both teams padded to a common k, plus a copy of the last snapshot
+        # so the final step of the match is a no-op
+        f = hi - lo + 1
+        blocks = [self.frames.padded_positions(team, lo, hi + 1) for team in TEAMS]
+        k = max(max(pts.shape[1] for pts, _, _ in blocks), 1)
+        pts = np.full((2, f + 1, k, 2), np.nan, dtype=np.float32)
+        counts = np.zeros((2, f + 1), dtype=np.int64)
+        for t, (team_pts, _, team_counts) in enumerate(blocks):
+            pts[t, :f, :team_pts.shape[1]] = team_pts
+            counts[t, :f] = team_counts
+        pts[:, f] = pts[:, f - 1]
+        counts[:, f] = counts[:, f - 1]
+        if self.frames.player_ids is not None:
+            return self._tracks_by_id(lo, hi, pts, counts)
+
+        # 2. Displacement costs of every step at once; a team's partner is the
+        # other side when the acting team changed between the two events
+        flips = np.zeros(f, dtype=np.int64)
+        flips[:f - 1] = self.flips[lo:hi]
+        partner = np.arange(2)[:, None] ^ flips[None, :]
+        nxt = pts[partner, np.arange(1, f + 1)[None, :]]
+        cost = np.linalg.norm(pts[:, :f, :, None] - nxt[:, :, None, :], axis=-1)
+
+        # 3. Minimum-displacement assignment per step and team
+        from scipy.optimize import linear_sum_assignment
+        end_a = pts[:, :f].copy()
+        start_b = pts[:, 1:].copy()
+        for s in range(f - 1):
+            for t in range(2):
+                p = partner[t, s]
+                na, nb = counts[t, s], counts[p, s + 1]
+                if not na or not nb:
+                    continue
+                rows, cols = linear_sum_assignment(cost[t, s, :na, :nb])
+                keep = cost[t, s, rows, cols] <= self.max_step
+                rows, cols = rows[keep], cols[keep]
+                end_a[t, s, rows] = nxt[t, s, cols]
+                start_b[p, s, cols] = pts[t, s, rows]
+        return pts, counts, end_a, start_b
+
+    def _tracks_by_id(self, lo, hi, pts, counts):
+        """_tracks for frames with player ids: a player moves to the slot with their id."""
+        f = hi - lo + 1
+        ids = np.full(pts.shape[:3], -1, dtype=np.int64)
+        for t, team in enumerate(TEAMS):
+            team_ids = self.frames.padded_player_ids(team, lo, hi + 1)
+            ids[t, :f, :team_ids.shape[1]] = team_ids
+        ids[:, f] = ids[:, f - 1]
+
+        # (team, step, slot in s, slot in s + 1) of every player present on both sides of a step
+        same = (ids[:, :f, :, None] == ids[:, 1:, None, :]) & (ids[:, :f, :, None] >= 0)
+        t, s, i, j = np.nonzero(same)
+        end_a = pts[:, :f].copy()
+        start_b = pts[:, 1:].copy()
+        end_a[t, s, i] = pts[t, s + 1, j]
+        start_b[t, s, j] = pts[t, s, i]
+        return pts, counts, end_a, start_b
@@ -0,0 +1,146 @@
+import os
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from data.loader import DataLoader
+from data.match_file import MATCH_FILE_EXT
+from utils.config import COMPETITION_ID, SEASON_ID, MATCH_DIR, PREFETCH_MATCHES
+
+class MatchLoad:
+    """
+    Handle for one match being loaded in the background.
+    result() returns (FrameStore, EventTable, match file path), or
+    (None, None, None) when the match has no 360 data.
+    """
+
+    def __init__(self, match_id):
+        self.match_id = match_id
+        self.future = None
+        self.fetches = [] # Futures of the raw events / frames requests
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """
+        Stops the load: queued work never starts and a running load is
+        abandoned at its next step (a request already on the wire still
+        completes and lands in the cache).
+        """
+        self._cancelled.set()
+        for fetch in self.fetches:
+            fetch.cancel()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def check(self):
+        if self.cancelled:
+            raise CancelledError(f"Load of match {self.match_id} was cancelled")
+
+class MatchPrefetcher:
+    """
+    Loads matches off the UI thread.
+
+    Events and 360 frames of a match are requested in parallel on the
+    DataLoader pool, then packed into a FrameStore / EventTable and saved as
+    a match file. Each match has at most one live MatchLoad: asking again for
+    a match that is loading or loaded returns the same handle.
+    """
+
+    def __init__(self, competition_id=COMPETITION_ID, season_id=SEASON_ID, match_dir=MATCH_DIR, max_workers=2):
+        self.competition_id = competition_id
+        self.season_id = season_id
+        self.match_dir = match_dir
+        # Separate from the DataLoader pool so a load waiting on its fetches never starves them
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='match-load')
+        self._loads = {}
+        self._lock = threading.Lock()
+
+    def match_path(self, match_id):
+        return os.path.join(self.match_dir, f"{match_id}{MATCH_FILE_EXT}")
+
+    def load(self, match_id, meta=None):
+        """Starts (or joins) the load of match_id and returns its MatchLoad."""
+        with self._lock:
+            handle = self._loads.get(match_id)
+            if handle is not None and not handle.cancelled:
+                return handle
+            handle = MatchLoad(match_id)
+            handle.future = self._executor.submit(self._load, handle, meta)
+            self._loads[match_id] = handle
+            return handle
+
+    def prefetch(self, matches, current_id, count=PREFETCH_MATCHES):
+        """Loads the count matches listed after current_id in the background."""
+        ids = list(matches['match_id']) if 'match_id' in matches else []
+        if current_id not in ids:
+            return []
+        start = ids.index(current_id) + 1
+        handles = []
+        for _, match in matches.iloc[start:start + count].iterrows():
+            handles.append(self.load(match['match_id'], self.match_meta(match)))
+        return handles
+
+    def cancel(self, match_id):
+        with self._lock:
+            handle = self._loads.pop(match_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    def shutdown(self):
+        """Cancels every pending load (e.g. when the window closes)."""
+        with self._lock:
+            handles = list(self._loads.values())
+            self._loads.clear()
+        for handle in handles:
+            handle.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def match_meta(self, match):
+        """Match file meta for a row of the matches table."""
+        return {'match_id': int(match['match_id']), 'competition_id': self.competition_id,
+                'season_id': self.season_id, 'home_team': match.get('home_team'),
+                'away_team': match.get('away_team')}
+
+    def _load(self, handle, meta):
+        # Imported here, on a loader thread, so pandas never delays the first paint
+        from data.preprocessor import DataPreprocessor
+        match_id = handle.match_id
+        path = self.match_path(match_id)
+
+        # 1. Preprocessed match file from an earlier run
+        if os.path.exists(path):
+            try:
+                frames, events, _ = DataPreprocessor.load_match(path)
+                return frames, events, path
+            except ValueError as e:
+                print(f"Ignoring unreadable match file: {e}")
+
+        # 2. Raw events and 360 frames, fetched in parallel
+        handle.check()
+        frames_future = DataLoader.submit(DataLoader.get_match_360_frames, match_id, self.competition_id, self.season_id)
+        events_future = DataLoader.submit(DataLoader.get_match_events, match_id, self.competition_id, self.season_id)
+        handle.fetches = [frames_future, events_future]
+        if handle.cancelled:
+            handle.cancel()
+        frames = frames_future.result()
+        events = events_future.result()
+
+        # 3. Pack and save
+        handle.check()
+        frames = DataPreprocessor.process_360_frames(frames)
+        if frames is None:
+            return None, None, None
+        events = DataPreprocessor.build_event_table(DataPreprocessor.process_events(events))
+
+        handle.check()
+        os.makedirs(self.match_dir, exist_ok=True)
+        DataPreprocessor.save_match(path, frames, events, meta or {'match_id': int(match_id)})
+        return frames, events, path
@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+from data.frame_store import FrameStore
+from data.event_table import EventTable
+from data.match_file import MatchFile
 from utils.config import PITCH_LENGTH, PITCH_WIDTH
 
 class DataPreprocessor:
@@ -9,6 +12,11 @@ class DataPreprocessor:
     Origin is top-left (0,0) -> (120, 80).
     """
 
+    # Event columns kept by process_events (sb.events names)
+    EVENT_COLUMNS = ['id', 'index', 'period', 'timestamp', 'minute', 'second',
+                     'type', 'player', 'team', 'location', 'pass_end_location',
+                     'pass_outcome', 'shot_statsbomb_xg', 'shot_outcome']
+
     @staticmethod
     def process_events(events_df):
         """
@@ -17,13 +25,8 @@ class DataPreprocessor:
         if events_df is None or events_df.empty:
             return pd.DataFrame()
 
-        # Filter for relevant columns
-        cols = ['id', 'index', 'period', 'timestamp', 'minute', 'second', 
-                'type', 'player', 'team', 'location', 'pass_end_location',
-                'pass_outcome', 'shot_statsbomb_xg', 'shot_outcome']
-        
-        # Keep only existing columns
-        events = events_df[[c for c in cols if c in events_df.columns]].copy()
+        # Keep only the relevant columns that exist
+        events = events_df[[c for c in DataPreprocessor.EVENT_COLUMNS if c in events_df.columns]].copy()
         
         # Separate X, Y coordinates
         # Location is usually a list [x, y]
@@ -36,12 +39,39 @@ class DataPreprocessor:
     def process_360_frames(frames_df):
         """
         Process 360 tracking frame data.
-        Frames contain a list of 'freeze_frame' objects with player positions.
+        sb.frames already yields one row per player per frame; we pack those
+        rows into a FrameStore so the animation loop only slices arrays.
         """
         if frames_df is None or frames_df.empty:
             return None
-            
-        # 360 data needs to be flattened: one row per player per frame
-        # This can be expensive, so we might return it raw or optimized later
-        # For now, let's keep it as is and parse during animation loop for performance
-        return frames_df
+
+        return FrameStore.from_dataframe(frames_df)
+
+    @staticmethod
+    def build_event_table(events_df):
+        """Converts processed events into typed columns (see EventTable)."""
+        if events_df is None or events_df.empty:
+            return EventTable.from_dataframe(pd.DataFrame(columns=['id']))
+        return EventTable.from_dataframe(events_df)
+
+    @staticmethod
+    def save_match(path, frames, events, meta=None):
+        """
+        Writes a processed match (FrameStore + EventTable) to a single
+        memory-mappable match file.
+        """
+        arrays = {}
+        arrays.update(frames.to_arrays())
+        arrays.update(events.to_arrays())
+        MatchFile.write(path, arrays, meta)
+
+    @staticmethod
+    def load_match(path):
+        """
+        Opens a match file written by save_match.
+        Returns (FrameStore, EventTable, meta) backed by the mapped file.
+        """
+        match_file = MatchFile.open(path)
+        frames = FrameStore.from_arrays(match_file.arrays)
+        events = EventTable.from_arrays(match_file.arrays)
+        return frames, events, match_file.meta
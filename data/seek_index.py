@@ -0,0 +1,79 @@
+import numpy as np
+
+class SeekIndex:
+    """
+    Sorted lookups for seeking a PlaybackTimeline, built once per match from
+    the typed event columns.
+
+    Per snapshot it keeps the playback time and the match clock printed in
+    the event data (minute * 60 + second, running on across periods; the
+    frames' own clock for broadband tracking), and per event type the playback times of the snapshots showing such an event.
+    Every query is a binary search (np.searchsorted) over these arrays.
+    """
+
+    def __init__(self, times, match_clock, type_times):
+        self.times = times              # (n,) playback seconds per snapshot, sorted
+        self.match_clock = match_clock  # (n,) match clock seconds per snapshot, sorted
+        self.type_times = type_times    # event type -> sorted playback seconds
+
+    @classmethod
+    def build(cls, playback, events):
+        rows = playback.event_rows
+        n = len(rows)
+        known = rows >= 0
+        clock = np.full(n, np.nan)
+        type_times = {}
+        if playback.frames.is_tracking:
+            clock = np.asarray(playback.frames.clock, dtype=np.float64)
+        elif len(events) and n:
+            minute = events['minute'][rows[known]].astype(np.float64)
+            second = events['second'][rows[known]].astype(np.float64)
+            clock[known] = np.where((minute >= 0) & (second >= 0), minute * 60 + second, np.nan)
+
+            # Snapshots grouped by event type; the stable sort keeps each group in time order
+            codes = np.where(known, events['type'][rows], -1)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(events.dictionaries['type']) + 1))
+            for code, name in enumerate(events.dictionaries['type']):
+                type_times[name.decode('utf-8')] = playback.times[order[bounds[code]:bounds[code + 1]]]
+
+        # Like the playback clock: unknown values repeat the previous one, never decreasing
+        clock = np.maximum.accumulate(np.where(np.isnan(clock), -np.inf, clock))
+        clock[np.isinf(clock)] = 0
+        return cls(playback.times, clock, type_times)
+
+    @staticmethod
+    def _lookup(keys, values, key):
+        """Linear interpolation of values at key, with keys sorted."""
+        if not len(keys):
+            return 0.0
+        i = int(np.searchsorted(keys, key, side='right'))
+        if i == 0:
+            return float(values[0])
+        if i == len(keys):
+            return float(values[-1])
+        k0, k1 = keys[i - 1], keys[i]
+        w = (key - k0) / (k1 - k0) if k1 > k0 else 0.0
+        return float(values[i - 1] + w * (values[i] - values[i - 1]))
+
+    def time_at_match_clock(self, seconds):
+        """Playback time at a match clock time, e.g. 79 * 60 for minute 79."""
+        return self._lookup(self.match_clock, self.times, seconds)
+
+    def match_clock_at(self, time):
+        """Match clock seconds shown at a playback time."""
+        return self._lookup(self.times, self.match_clock, time)
+
+    def step_event(self, event_type, time, direction=1, tolerance=0.05):
+        """
+        Playback time of the next (direction > 0) or previous event of a type
+        strictly after / before time (by more than tolerance), or None.
+        """
+        times = self.type_times.get(event_type)
+        if times is None or not len(times):
+            return None
+        if direction > 0:
+            i = int(np.searchsorted(times, time + tolerance, side='right'))
+            return float(times[i]) if i < len(times) else None
+        i = int(np.searchsorted(times, time - tolerance, side='left')) - 1
+        return float(times[i]) if i >= 0 else None
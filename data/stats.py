@@ -0,0 +1,190 @@
+import numpy as np
+
+class StatsEngine:
+    """
+    Player statistics for the dashboard, computed from the EventTable of
+    each loaded match.
+
+    Every statistic is a vectorised group-by over the event columns
+    (np.bincount keyed on player codes) that yields the values of all
+    players at once. The per-player tables are memoised per (match, period)
+    and the dashboard summaries per (match, player, period), so changing
+    the selected player or period filter only computes anything once.
+    invalidate() drops the results of one match or of all of them.
+    """
+
+    HEATMAP_BINS = 30
+    HEATMAP_RANGE = ((0, 120), (0, 80))
+    PASS_DIRECTIONS = ('Forward', 'Lateral', 'Backward')
+    # Performance matrix: label -> event type counted ('Pass %' and 'xG' are derived)
+    MATRIX_METRICS = (('Passes', 'Pass'), ('Pass %', None), ('Fwd Pass', None),
+                      ('Carries', 'Carry'), ('Dribbles', 'Dribble'), ('Shots', 'Shot'),
+                      ('xG', None), ('Pressures', 'Pressure'), ('Recoveries', 'Ball Recovery'),
+                      ('Intercept.', 'Interception'))
+
+    def __init__(self):
+        self.matches = {} # match key -> EventTable
+        self._memo = {}   # (kind, match, ...) -> result
+
+    def add_match(self, match, events):
+        """Registers a match's events under a key (e.g. its match file path)."""
+        if self.matches.get(match) is not events:
+            self.invalidate(match)
+        self.matches[match] = events
+
+    def invalidate(self, match=None):
+        """Drops memoised results of one match (all matches if None)."""
+        if match is None:
+            self._memo.clear()
+        else:
+            self._memo = {k: v for k, v in self._memo.items() if k[1] != match}
+
+    def _memoised(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    # --- Queries ---
+    def players(self, match):
+        """Player names of a match, most involved first."""
+        return self._memoised(('players', match), lambda: self._players(self.matches[match]))
+
+    def periods(self, match):
+        """Period filters of a match: None (whole match), then each period played."""
+        def compute():
+            periods = np.unique(self.matches[match]['period'])
+            return [None] + [int(p) for p in periods if p > 0]
+        return self._memoised(('periods', match), compute)
+
+    def summary(self, match, player, period=None):
+        """
+        Dashboard values of one player: team, pass direction shares, event
+        heatmap counts (HEATMAP_BINS squared, x first), pass network
+        centrality and the performance matrix, raw and scaled to the best
+        player of the match.
+        """
+        return self._memoised(('summary', match, player, period),
+                              lambda: self._summary(match, player, period))
+
+    def _summary(self, match, player, period):
+        events = self.matches[match]
+        tables = self._memoised(('tables', match, period), lambda: self._tables(events, period))
+        code = events.code('player', player)
+        team = tables['team'][code] if code >= 0 else -1
+        passes = tables['directions'][code] if code >= 0 else np.zeros(len(self.PASS_DIRECTIONS))
+        matrix = tables['matrix']
+        best = matrix.max(axis=0) if len(matrix) else np.zeros(len(self.MATRIX_METRICS))
+        values = matrix[code] if code >= 0 else np.zeros(len(self.MATRIX_METRICS))
+        return {
+            'player': player,
+            'team': events.dictionaries['team'][team].decode('utf-8') if team >= 0 else None,
+            'passes': int(passes.sum()),
+            'pass_directions': passes / max(passes.sum(), 1),
+            'heatmap': tables['heatmaps'][code] if code >= 0 else None,
+            'centrality': float(tables['centrality'][code]) if code >= 0 else 0.0,
+            'matrix': values,
+            'matrix_scaled': np.divide(values, best, out=np.zeros_like(values), where=best > 0),
+        }
+
+    # --- Group-bys ---
+    @staticmethod
+    def _players(events):
+        player = events['player']
+        counts = np.bincount(player[player >= 0], minlength=len(events.dictionaries['player']))
+        order = np.argsort(-counts, kind='stable')
+        return [events.dictionaries['player'][c].decode('utf-8') for c in order if counts[c] > 0]
+
+    @classmethod
+    def _tables(cls, events, period):
+        """Per-player arrays (indexed by player code) for one period filter."""
+        n_players = len(events.dictionaries['player'])
+        n_teams = max(len(events.dictionaries['team']), 1)
+        player, team, event_type = events['player'], events['team'], events['type']
+        rows = player >= 0
+        if period is not None:
+            rows &= events['period'] == period
+
+        def count(mask):
+            return np.bincount(player[rows & mask], minlength=n_players).astype(np.float64)
+
+        def is_type(name):
+            return event_type == events.code('type', name)
+
+        # 1. Team of each player: the one most of their events are for
+        team_counts = np.zeros((n_players, n_teams))
+        known = rows & (team >= 0)
+        np.add.at(team_counts, (player[known], team[known]), 1)
+        teams = np.where(team_counts.any(axis=1), team_counts.argmax(axis=1), -1)
+
+        # 2. Passes by direction: within 45 degrees of the goal being attacked is forward
+        is_pass = is_type('Pass')
+        dx = events['end_x'] - events['x']
+        dy = events['end_y'] - events['y']
+        valid = is_pass & ~np.isnan(dx) & ~np.isnan(dy)
+        forward = valid & (dx > np.abs(dy))
+        backward = valid & (-dx > np.abs(dy))
+        lateral = valid & ~forward & ~backward
+        directions = np.stack([count(forward), count(lateral), count(backward)], axis=1)
+
+        # 3. Event heatmaps of all players in one bincount
+        bins = cls.HEATMAP_BINS
+        (x0, x1), (y0, y1) = cls.HEATMAP_RANGE
+        located = rows & ~np.isnan(events['x']) & ~np.isnan(events['y'])
+        ix = np.clip(((events['x'][located] - x0) / (x1 - x0) * bins).astype(np.int64), 0, bins - 1)
+        iy = np.clip(((events['y'][located] - y0) / (y1 - y0) * bins).astype(np.int64), 0, bins - 1)
+        cells = (player[located].astype(np.int64) * bins + ix) * bins + iy
+        heatmaps = np.bincount(cells, minlength=n_players * bins * bins).reshape(n_players, bins, bins)
+
+        # 4. Completed passes and the pass network
+        completed = is_pass & (events['pass_outcome'] < 0)
+        centrality = cls._centrality(events, rows & completed, teams, n_players)
+
+        # 5. Performance matrix, one column per MATRIX_METRICS entry
+        passes = count(is_pass)
+        xg = np.bincount(player[rows], weights=np.nan_to_num(events['xg'][rows]), minlength=n_players)
+        derived = {
+            'Pass %': np.divide(count(completed) * 100, passes, out=np.zeros(n_players), where=passes > 0),
+            'Fwd Pass': directions[:, 0],
+            'xG': xg,
+        }
+        matrix = np.stack([derived[label] if name is None else count(is_type(name))
+                           for label, name in cls.MATRIX_METRICS], axis=1)
+
+        return {'team': teams, 'directions': directions, 'heatmaps': heatmaps,
+                'centrality': centrality, 'matrix': matrix}
+
+    @staticmethod
+    def _centrality(events, completed, teams, n_players):
+        """
+        Eigenvector centrality of each team's pass network, scaled so the
+        best connected player of a team is 1. Links are completed passes
+        from the passer to the player of the team's next event, which in
+        StatsBomb data is the receiver's Ball Receipt.
+        """
+        player, team = events['player'], events['team']
+        # Next event of the same team after each event (-1 if none)
+        n = len(player)
+        nxt = np.full(n, -1, dtype=np.int64)
+        for code in range(len(events.dictionaries['team'])):
+            rows = np.flatnonzero((team == code) & (player >= 0))
+            nxt[rows[:-1]] = rows[1:]
+
+        passes = np.flatnonzero(completed & (nxt >= 0))
+        passer, receiver = player[passes], player[nxt[passes]]
+        other = passer != receiver
+
+        links = np.zeros((n_players, n_players))
+        np.add.at(links, (passer[other], receiver[other]), 1)
+        links += links.T
+
+        centrality = np.zeros(n_players)
+        for code in np.unique(teams[teams >= 0]):
+            members = np.flatnonzero(teams == code)
+            sub = links[np.ix_(members, members)]
+            if not sub.any():
+                continue
+            # Principal eigenvector of the symmetric link matrix
+            _, vectors = np.linalg.eigh(sub)
+            vector = np.abs(vectors[:, -1])
+            centrality[members] = vector / vector.max()
+        return centrality
@@ -0,0 +1,226 @@
+import csv
+from collections import namedtuple
+from itertools import islice, zip_longest
+import numpy as np
+import pandas as pd
+from data.match_file import MatchFileWriter
+from data.preprocessor import DataPreprocessor
+from utils.config import PITCH_LENGTH, PITCH_WIDTH, TRACKING_CHUNK_FRAMES, PERIOD_START_MINUTES
+
+# A run of consecutive tracking frames: period (f,), time (f,) seconds,
+# xy (f, n_players, 2) and ball (f, 2) in pitch units, NaN when unknown
+TrackingChunk = namedtuple('TrackingChunk', ['period', 'time', 'xy', 'ball'])
+
+_SCALE = np.array([PITCH_LENGTH, PITCH_WIDTH])
+
+class MetricaSource:
+    """
+    Metrica Sports raw tracking data: one CSV per team, read in lockstep a
+    chunk of frames at a time. Each file has three header rows (team,
+    jersey, column names) and then per frame the period, frame number, time
+    and each player's x / y as pitch fractions, with the ball as the last
+    column pair. x runs from the left; y runs from the bottom, so it is
+    flipped to the top-left origin used here, as kloppy's Metrica reader
+    does (KloppySource gives the same positions).
+    """
+
+    def __init__(self, home_path, away_path):
+        self.paths = (home_path, away_path)
+        self.players = []   # 'Home 11' (team and jersey, as KloppySource names them), ...
+        self.sides = []     # 0 = home, 1 = away, per player
+        self._columns = []  # per file: (x columns of its players, ball x column)
+        for side, path in enumerate(self.paths):
+            with open(path, newline='') as f:
+                teams, jerseys, names = islice(csv.reader(f), 3)
+            cols = [i for i, name in enumerate(names) if name.startswith('Player')]
+            if 'Ball' not in names:
+                raise ValueError(f"{path} is not a Metrica tracking file (no Ball column)")
+            self.players += [f"{teams[i] or ('Home', 'Away')[side]} {jerseys[i] or names[i]}" for i in cols]
+            self.sides += [side] * len(cols)
+            self._columns.append((cols, names.index('Ball')))
+
+    def chunks(self, chunk_frames=TRACKING_CHUNK_FRAMES):
+        readers = [pd.read_csv(path, skiprows=3, header=None, chunksize=chunk_frames, dtype=np.float64)
+                   for path in self.paths]
+        try:
+            for home, away in zip_longest(*readers):
+                if (home is None or away is None or len(home) != len(away)
+                        or (home[1].to_numpy() != away[1].to_numpy()).any()):
+                    raise ValueError("Home and away tracking files have different frames")
+                xy = []
+                for df, (cols, _) in zip((home, away), self._columns):
+                    values = df.to_numpy()
+                    xy.append(np.stack([values[:, cols], values[:, [c + 1 for c in cols]]], axis=-1))
+                ball_col = self._columns[0][1]
+                values = home.to_numpy()
+                yield TrackingChunk(values[:, 0].astype(np.int8), values[:, 2],
+                                    self._to_pitch(np.concatenate(xy, axis=1)),
+                                    self._to_pitch(values[:, ball_col:ball_col + 2]))
+        finally:
+            for reader in readers:
+                reader.close()
+
+    @staticmethod
+    def _to_pitch(fractions):
+        """Metrica (x from the left, y from the bottom) -> pitch units from the top left."""
+        return np.stack([fractions[..., 0], 1 - fractions[..., 1]], axis=-1) * _SCALE
+
+class KloppySource:
+    """
+    Any tracking dataset kloppy loads (Metrica, Tracab, SkillCorner,
+    Second Spectrum, ...), in kloppy's default coordinates (pitch fractions
+    from the top left, y pointing down like StatsBomb's), converted a chunk
+    of frames at a time:
+
+        from kloppy import metrica
+        source = KloppySource(metrica.load_tracking_csv(home_data=..., away_data=...))
+
+    kloppy loaders build the whole dataset in memory; only the conversion
+    here is chunked. MetricaSource streams Metrica files from disk instead.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        teams = dataset.metadata.teams
+        self._players = [player for team in teams for player in team.players]
+        self.players = [f"{team.name} {player.jersey_no or player.player_id}"
+                        for team in teams for player in team.players]
+        self.sides = [side for side, team in enumerate(teams) for _ in team.players]
+
+    @staticmethod
+    def _seconds(timestamp):
+        # timedelta since kloppy 3.15, float seconds before
+        return timestamp.total_seconds() if hasattr(timestamp, 'total_seconds') else float(timestamp)
+
+    def chunks(self, chunk_frames=TRACKING_CHUNK_FRAMES):
+        index = {player: i for i, player in enumerate(self._players)}
+        records = iter(self.dataset.records)
+        while True:
+            batch = list(islice(records, chunk_frames))
+            if not batch:
+                return
+            f = len(batch)
+            period = np.empty(f, dtype=np.int8)
+            time = np.empty(f)
+            xy = np.full((f, len(index), 2), np.nan)
+            ball = np.full((f, 2), np.nan)
+            for r, frame in enumerate(batch):
+                period[r] = frame.period.id
+                time[r] = self._seconds(frame.timestamp)
+                if frame.ball_coordinates is not None:
+                    ball[r] = frame.ball_coordinates.x, frame.ball_coordinates.y
+                for player, point in frame.players_coordinates.items():
+                    if player in index and point is not None:
+                        xy[r, index[player]] = point.x, point.y
+            yield TrackingChunk(period, time, xy * _SCALE, ball * _SCALE)
+
+def split_periods(chunks):
+    """Splits chunks at period changes, so every chunk lies within one period."""
+    for chunk in chunks:
+        cuts = np.flatnonzero(np.diff(chunk.period)) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(chunk.period)]):
+            yield TrackingChunk(*(a[lo:hi] for a in chunk))
+
+def normalise_direction(chunks, sides):
+    """
+    Rotates periods in which the home team attacks -x (judged from the
+    period's first chunk: home players deeper than away ones) half a turn,
+    so home always attacks +x like the actor's team in 360 frames.
+    """
+    home = np.asarray(sides) == 0
+    period, flip = None, False
+    for chunk in chunks:
+        if chunk.period[0] != period:
+            period = chunk.period[0]
+            x = chunk.xy[..., 0]
+            flip = bool(np.nanmean(x[:, home]) > np.nanmean(x[:, ~home]))
+        if flip:
+            chunk = chunk._replace(xy=_SCALE - chunk.xy, ball=_SCALE - chunk.ball)
+        yield chunk
+
+def match_clock(chunks):
+    """
+    Yields (chunk, match seconds per frame). Each period's clock starts at
+    its PERIOD_START_MINUTES from the period's first frame, as the event
+    data's minute / second do.
+    """
+    period, first = None, 0.0
+    for chunk in chunks:
+        if chunk.period[0] != period:
+            period, first = chunk.period[0], chunk.time[0]
+        start = PERIOD_START_MINUTES[min(max(period - 1, 0), len(PERIOD_START_MINUTES) - 1)] * 60
+        yield chunk, start + chunk.time - first
+
+class TrackingIngestor:
+    """
+    Streams broadband tracking (every player and the ball at e.g. 25 Hz)
+    into a match file, a chunk of frames at a time:
+
+        source chunks -> split_periods -> normalise_direction -> match_clock
+        -> FrameStore rows -> MatchFileWriter spools
+
+    Frames keep the FrameStore layout of 360 data, with Home fixed to the
+    home team, plus each row's player code, the ball and the match clock
+    (see FrameStore). Only one chunk is in memory at a time, so a full match
+    at 25 Hz (135k frames) ingests in bounded memory. The match file has an
+    empty event table and opens like any other.
+    """
+
+    @staticmethod
+    def ingest(source, path, meta=None, chunk_frames=TRACKING_CHUNK_FRAMES):
+        """Writes source (MetricaSource / KloppySource) to path. Returns (frames, rows)."""
+        # 1. Column order: home players first, so each frame's rows are home then away
+        sides = np.asarray(source.sides)
+        order = np.argsort(sides, kind='stable')
+        n_home = int((sides == 0).sum())
+        players = np.array([source.players[i].encode('utf-8') for i in order])
+        if not len(players):
+            raise ValueError("Tracking data has no players")
+        is_home = np.arange(len(order)) < n_home
+
+        n_frames, n_rows = 0, 0
+        meta = dict(meta or {}, tracking=True)
+        with MatchFileWriter(path, meta) as writer:
+            stream = match_clock(normalise_direction(split_periods(source.chunks(chunk_frames)), sides))
+            for chunk, clock in stream:
+                xy = chunk.xy[:, order]
+                f = len(xy)
+                # 2. Rows of players on the pitch, frame by frame, home then away
+                valid = ~np.isnan(xy).any(axis=-1)
+                frame, col = np.nonzero(valid)
+                counts = valid.sum(axis=1)
+                starts = n_rows + np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+                writer.append('frames.xy', xy[frame, col].astype(np.float32))
+                writer.append('frames.teammate', is_home[col])
+                writer.append('frames.actor', np.zeros(len(col), dtype=bool))
+                writer.append('frames.keeper', np.isin(col, TrackingIngestor._keepers(xy, valid, is_home)))
+                writer.append('frames.offsets', starts.astype(np.int64))
+                writer.append('frames.splits', (starts + valid[:, :n_home].sum(axis=1)).astype(np.int64))
+                writer.append('frames.event_ids', np.zeros(f, dtype='S1'))
+                writer.append('frames.player_ids', col.astype(np.int32))
+                writer.append('frames.ball', chunk.ball.astype(np.float32))
+                writer.append('frames.clock', clock.astype(np.float64))
+                writer.append('frames.periods', chunk.period.astype(np.int8))
+                n_frames += f
+                n_rows += len(col)
+
+            if not n_frames:
+                raise ValueError("Tracking data has no frames")
+            # 3. Closing offset, player names and an empty event table
+            writer.append('frames.offsets', np.array([n_rows], dtype=np.int64))
+            writer.add('frames.players', players)
+            for name, array in DataPreprocessor.build_event_table(None).to_arrays().items():
+                writer.add(name, array)
+        return n_frames, n_rows
+
+    @staticmethod
+    def _keepers(xy, valid, is_home):
+        """Columns of each team's deepest player over a chunk (home attacks +x)."""
+        mean_x = np.where(valid, xy[..., 0], 0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+        keepers = []
+        for team, pick in ((is_home, np.argmin), (~is_home, np.argmax)):
+            cols = np.flatnonzero(team & valid.any(axis=0))
+            if len(cols):
+                keepers.append(cols[pick(mean_x[cols])])
+        return keepers
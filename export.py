@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Headless export: renders a frame range of a match file to a PNG sequence or
+a video, without opening a window.
+
+The range is split into chunks rendered by a process pool. Each worker maps
+the match file, rebuilds the pitch and visualizers on an Agg canvas and
+blits every frame over a cached pitch background. Video chunks are piped
+straight into their own ffmpeg encoder and concatenated in order at the end,
+so no frame is ever held in memory beyond the one being encoded.
+
+    ./export.py match.prm --out clip.mp4 --start 0 --end 2500 --workers 4
+    ./export.py match.prm --out frames/ --analytics
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+from visualization.pitch import draw_pitch
+from visualization.scene import MatchScene
+from visualization.raster import RasterCanvas, RasterPlayerVisualizer, RasterEventVisualizer
+from data.preprocessor import DataPreprocessor
+from data.geometry import TacticalTimeline
+from utils.theme import Colors
+from utils.config import FPS, HEATMAP_WINDOW, EXPORT_SIZE, EXPORT_DPI, EXPORT_CHUNK_FRAMES, FFMPEG
+
+VIDEO_CODECS = {
+    '.mp4': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p'],
+    '.mkv': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p'],
+    '.mov': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p'],
+    '.webm': ['-c:v', 'libvpx-vp9', '-b:v', '0', '-crf', '32', '-pix_fmt', 'yuv420p'],
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render a match replay to PNG frames or a video")
+    parser.add_argument('match_file', help="Preprocessed match file (.prm)")
+    parser.add_argument('--out', required=True,
+                        help=f"Video file ({', '.join(VIDEO_CODECS)}) or a directory for PNG frames")
+    parser.add_argument('--start', type=int, default=0, help="First frame")
+    parser.add_argument('--end', type=int, help="Frame after the last one (default: end of match)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-frames', type=int, default=EXPORT_CHUNK_FRAMES)
+    parser.add_argument('--size', type=float, nargs=2, default=EXPORT_SIZE, metavar=('W', 'H'),
+                        help="Frame size in inches")
+    parser.add_argument('--dpi', type=int, default=EXPORT_DPI)
+    parser.add_argument('--renderer', choices=('agg', 'raster'), default='agg',
+                        help="agg: matplotlib artists; raster: NumPy compositor (faster, no analytics)")
+    parser.add_argument('--analytics', action='store_true', help="Draw the analytics overlays (agg only)")
+    parser.add_argument('--heatmap-window', action='store_true',
+                        help="Rolling-window heatmap (implies --analytics)")
+    return parser.parse_args()
+
+class FrameRenderer:
+    """
+    Match view on an off-screen Agg canvas, blitted over a cached pitch.
+    With renderer='raster' the overlays are composited by RasterCanvas instead.
+    """
+
+    def __init__(self, match_path, size=EXPORT_SIZE, dpi=EXPORT_DPI, analytics=False, heatmap_window=0,
+                 renderer='agg'):
+        frames, events, _ = DataPreprocessor.load_match(match_path)
+        self.fig = Figure(figsize=size, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.fig.patch.set_facecolor(Colors.BACKGROUND)
+        self.ax = self.fig.add_axes([0, 0, 1, 1])
+        draw_pitch(ax=self.ax, line_color=Colors.LINE_COLOR, pitch_color=Colors.PITCH_COLOR)
+
+        self.raster = None
+        if renderer == 'raster':
+            self.raster = RasterCanvas.from_axes(self.ax)
+            self.scene = MatchScene(self.ax, frames, events, match_path,
+                                    players=RasterPlayerVisualizer(self.raster),
+                                    event_overlay=RasterEventVisualizer(self.raster), analytics=False)
+        else:
+            self.scene = MatchScene(self.ax, frames, events, match_path)
+            self.scene.analytics.show_analytics = analytics or heatmap_window > 0
+            if heatmap_window:
+                self.scene.analytics.set_heatmap_window(heatmap_window)
+
+        # Animated artists are skipped by a full draw, so this is the bare pitch
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.width, self.height = self.canvas.get_width_height()
+
+    def prime(self, frame_idx):
+        """
+        Feeds the rolling heatmap the frames before frame_idx, so a chunk
+        starting mid-match shows the same window as a sequential render.
+        """
+        analytics = self.scene.analytics
+        if analytics is None or not analytics.show_analytics or not analytics.heatmap_window:
+            return
+        for i in range(max(0, frame_idx - analytics.heatmap_window), frame_idx):
+            analytics.draw_heatmap(*self.scene.frames.get_frame(i))
+
+    def render(self, frame_idx):
+        """Draws one frame; returns the canvas RGBA buffer (valid until the next render)."""
+        if self.raster is not None:
+            return self.raster.render(self.scene.update(frame_idx))
+        self.canvas.restore_region(self._background)
+        for artist in sorted(self.scene.update(frame_idx), key=lambda a: a.get_zorder()):
+            self.ax.draw_artist(artist)
+        return self.canvas.buffer_rgba()
+
+# --- Worker process ---
+_renderer = None
+
+def init_worker(match_path, size, dpi, analytics, heatmap_window, renderer):
+    global _renderer
+    _renderer = FrameRenderer(match_path, size, dpi, analytics, heatmap_window, renderer)
+
+def encoder_command(path, width, height):
+    ext = os.path.splitext(path)[1].lower()
+    return [FFMPEG, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}', '-r', str(FPS), '-i', '-',
+            '-an', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'] + VIDEO_CODECS[ext] + [path]
+
+def render_chunk(lo, hi, out, video):
+    """Renders frames [lo, hi) to PNG files in out, or to the video file out."""
+    start = time.perf_counter()
+    _renderer.prime(lo)
+
+    if video:
+        encoder = subprocess.Popen(encoder_command(out, _renderer.width, _renderer.height),
+                                   stdin=subprocess.PIPE)
+        try:
+            for i in range(lo, hi):
+                encoder.stdin.write(_renderer.render(i))
+        finally:
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed on frames {lo}-{hi}")
+    else:
+        for i in range(lo, hi):
+            rgba = _renderer.render(i)
+            image = Image.frombuffer('RGBA', (_renderer.width, _renderer.height), rgba, 'raw', 'RGBA', 0, 1)
+            image.convert('RGB').save(os.path.join(out, f"frame_{i:06d}.png"), compress_level=1)
+
+    return lo, hi, time.perf_counter() - start
+
+def concat_videos(parts, out):
+    """Joins the chunk videos in order without re-encoding."""
+    list_path = out + '.parts.txt'
+    with open(list_path, 'w') as f:
+        for part in parts:
+            f.write(f"file '{os.path.abspath(part)}'\n")
+    try:
+        subprocess.run([FFMPEG, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                        '-i', list_path, '-c', 'copy', out], check=True)
+    finally:
+        os.remove(list_path)
+
+def main():
+    args = parse_args()
+    video = os.path.splitext(args.out)[1].lower() in VIDEO_CODECS
+    if video and shutil.which(FFMPEG) is None:
+        raise SystemExit(f"Video export needs ffmpeg ({FFMPEG} not found); export PNG frames to a directory instead.")
+
+    frames, _, _ = DataPreprocessor.load_match(args.match_file)
+    end = len(frames) if args.end is None else min(args.end, len(frames))
+    if args.start >= end:
+        raise SystemExit(f"Empty frame range {args.start}-{end} (match has {len(frames)} frames)")
+    # Build the geometry cache once so workers only map it
+    TacticalTimeline.load_or_build(frames, args.match_file)
+
+    # 1. Split the range
+    chunks = [(lo, min(lo + args.chunk_frames, end)) for lo in range(args.start, end, args.chunk_frames)]
+    if video:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        part_dir = tempfile.mkdtemp(prefix='export-', dir=os.path.dirname(os.path.abspath(args.out)))
+        ext = os.path.splitext(args.out)[1]
+        targets = [os.path.join(part_dir, f"part_{k:05d}{ext}") for k in range(len(chunks))]
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        targets = [args.out] * len(chunks)
+
+    print(f"Rendering frames {args.start}-{end} in {len(chunks)} chunks on {args.workers} workers...")
+    heatmap_window = HEATMAP_WINDOW if args.heatmap_window else 0
+    if args.renderer == 'raster' and (args.analytics or heatmap_window):
+        print("Analytics overlays are only drawn by the agg renderer; ignoring them.")
+    start = time.perf_counter()
+
+    # 2. Render chunks in parallel
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                 initargs=(args.match_file, tuple(args.size), args.dpi,
+                                           args.analytics, heatmap_window, args.renderer)) as pool:
+            futures = [pool.submit(render_chunk, lo, hi, target, video)
+                       for (lo, hi), target in zip(chunks, targets)]
+            rendered = 0
+            for future in as_completed(futures):
+                lo, hi, seconds = future.result()
+                rendered += hi - lo
+                print(f"  frames {lo}-{hi}: {(hi - lo) / seconds:.1f} fps "
+                      f"({rendered}/{end - args.start} done)")
+
+        # 3. Reassemble in order
+        if video:
+            concat_videos(targets, args.out)
+    finally:
+        if video:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"Exported {end - args.start} frames to {args.out} in {elapsed:.1f}s "
+          f"({(end - args.start) / elapsed:.1f} frames/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Batch ingestion: converts every match with 360 data in a competition season
+into match files (plus their tactical geometry and formation caches), one
+match per worker process. Matches that already have a valid match file are
+skipped, so an interrupted run resumes where it stopped.
+
+    ./ingest.py --competition 43 --season 106 --workers 4
+    ./ingest.py --data-dir ~/open-data --out ./matches   # no network
+
+--tracking converts one match of broadband tracking data (Metrica Sports
+raw CSVs, home then away) instead, streamed in chunks (see data/tracking.py):
+
+    ./ingest.py --tracking Sample_Game_1_RawTrackingData_Home_Team.csv \
+                Sample_Game_1_RawTrackingData_Away_Team.csv --match-id sample1
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from data.loader import DataLoader
+from data.cache import MatchCache
+from data.preprocessor import DataPreprocessor
+from data.match_file import MatchFile, MATCH_FILE_EXT
+from data.geometry import TacticalTimeline
+from data.formations import FormationTimeline
+from data.tracking import MetricaSource, KloppySource, TrackingIngestor
+from utils.config import COMPETITION_ID, SEASON_ID, MATCH_DIR, INGEST_WORKERS, INGEST_MAX_MEMORY_MB
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Preprocess all 360 matches of a competition season")
+    parser.add_argument('--competition', type=int, default=COMPETITION_ID)
+    parser.add_argument('--season', type=int, default=SEASON_ID)
+    parser.add_argument('--data-dir', help="Local StatsBomb open-data clone to read instead of the API "
+                             "(default: the configured DATA_BACKEND)")
+    parser.add_argument('--out', default=MATCH_DIR, help="Directory for the match files")
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS)
+    parser.add_argument('--max-memory', type=int, default=INGEST_MAX_MEMORY_MB,
+                        help="Memory ceiling per worker in MB (0 = unlimited)")
+    parser.add_argument('--offline', action='store_true', help="Only use the local match cache")
+    parser.add_argument('--force', action='store_true', help="Rebuild match files that already exist")
+    parser.add_argument('--limit', type=int, help="Only ingest the first N matches")
+    parser.add_argument('--tracking', nargs=2, metavar=('HOME', 'AWAY'),
+                        help="Ingest a Metrica tracking CSV pair instead of a competition")
+    parser.add_argument('--match-id', help="Match file name for --tracking (default: from the home file)")
+    parser.add_argument('--kloppy', action='store_true',
+                        help="Load --tracking with kloppy (whole file in memory) instead of streaming it")
+    return parser.parse_args()
+
+def limit_memory(max_mb):
+    """Caps this process's heap; an allocation past it raises MemoryError."""
+    if not max_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        print("Memory ceiling not supported on this platform.")
+        return
+    # RLIMIT_DATA covers malloc'd and anonymous mmap memory on Linux, but not
+    # the read-only mapped match files; fall back to the address space limit
+    limit = getattr(resource, 'RLIMIT_DATA', resource.RLIMIT_AS)
+    max_bytes = max_mb * 1024**2
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        max_bytes = min(max_bytes, hard)
+    resource.setrlimit(limit, (max_bytes, hard))
+
+def init_worker(data_dir, offline, max_mb):
+    if data_dir:
+        DataLoader.set_data_dir(data_dir)
+    DataLoader.set_offline(offline)
+    # Writing the shared cache index is not safe across processes: workers
+    # only read it (which --offline relies on); match files are the output anyway
+    DataLoader.cache = MatchCache(read_only=True)
+    limit_memory(max_mb)
+
+def is_ingested(path):
+    """
+    Match file written and both sidecar caches built from it, so a match
+    whose cache build failed or was interrupted is redone on resume.
+    """
+    try:
+        MatchFile.read_header(path)
+        source = MatchFile.identity(path)
+        for cache in (TacticalTimeline, FormationTimeline):
+            meta = MatchFile.read_header(cache.cache_path(path))[0]
+            if meta.get('version') != cache.VERSION or meta.get('source') != source:
+                return False
+        return True
+    except (OSError, ValueError):
+        return False
+
+def ingest_match(match_id, competition_id, season_id, path, meta):
+    """Worker: fetch, convert and save one match. Returns a result dict."""
+    start = time.perf_counter()
+    result = {'match_id': match_id, 'status': 'ok', 'frames': 0, 'rows': 0, 'events': 0, 'bytes': 0}
+    try:
+        # 1. Fetch
+        raw_frames = DataLoader.get_match_360_frames(match_id, competition_id, season_id)
+        frames = DataPreprocessor.process_360_frames(raw_frames)
+        del raw_frames
+        if frames is None:
+            result['status'] = 'no 360 data'
+            return result
+        raw_events = DataLoader.get_match_events(match_id, competition_id, season_id)
+        events = DataPreprocessor.build_event_table(DataPreprocessor.process_events(raw_events))
+        del raw_events
+
+        # 2. Convert + save
+        DataPreprocessor.save_match(path, frames, events, meta)
+        TacticalTimeline.load_or_build(frames, path)
+        FormationTimeline.load_or_build(frames, events, path)
+
+        result.update(frames=len(frames), rows=frames.n_rows, events=len(events),
+                      bytes=os.path.getsize(path))
+    except MemoryError:
+        result['status'] = 'out of memory'
+    except Exception as e:
+        result['status'] = f'failed: {e}'
+    finally:
+        result['seconds'] = time.perf_counter() - start
+    return result
+
+def ingest_tracking(home, away, out, match_id=None, use_kloppy=False):
+    """Streams one Metrica tracking match into a match file plus its caches."""
+    match_id = match_id or os.path.basename(home).split('_RawTrackingData')[0].split('.')[0]
+    path = os.path.join(out, f"{match_id}{MATCH_FILE_EXT}")
+    start = time.perf_counter()
+    if use_kloppy:
+        from kloppy import metrica
+        source = KloppySource(metrica.load_tracking_csv(home_data=home, away_data=away))
+    else:
+        source = MetricaSource(home, away)
+    n_frames, n_rows = TrackingIngestor.ingest(source, path, {'match_id': match_id, 'source': 'metrica'})
+    print(f"Wrote {n_frames} frames ({n_rows} player rows, {len(source.players)} players) to {path} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    frames, events, _ = DataPreprocessor.load_match(path)
+    TacticalTimeline.load_or_build(frames, path)
+    FormationTimeline.load_or_build(frames, events, path)
+    print(f"Built the geometry and formation caches in {time.perf_counter() - start:.1f}s total")
+
+def select_matches(matches):
+    """Matches of the season that have 360 data."""
+    if matches.empty:
+        return matches
+    if DataLoader.local is not None:
+        return matches[[DataLoader.local.has_360(m) for m in matches['match_id']]]
+    if 'match_status_360' in matches.columns:
+        return matches[matches['match_status_360'] == 'available']
+    return matches
+
+def main():
+    args = parse_args()
+    if args.tracking:
+        os.makedirs(args.out, exist_ok=True)
+        ingest_tracking(*args.tracking, args.out, args.match_id, args.kloppy)
+        return
+    if args.data_dir:
+        DataLoader.set_data_dir(args.data_dir)
+    DataLoader.set_offline(args.offline)
+
+    matches = select_matches(DataLoader.get_public_matches(args.competition, args.season))
+    if args.limit:
+        matches = matches.iloc[:args.limit]
+    os.makedirs(args.out, exist_ok=True)
+
+    # 1. Resume: skip matches with a complete match file (writes are atomic)
+    jobs = []
+    skipped = 0
+    for _, match in matches.iterrows():
+        match_id = int(match['match_id'])
+        path = os.path.join(args.out, f"{match_id}{MATCH_FILE_EXT}")
+        if not args.force and is_ingested(path):
+            skipped += 1
+            continue
+        meta = {'match_id': match_id, 'competition_id': args.competition, 'season_id': args.season,
+                'home_team': match.get('home_team'), 'away_team': match.get('away_team')}
+        jobs.append((match_id, path, meta))
+
+    print(f"{len(matches)} matches with 360 data, {skipped} already ingested, {len(jobs)} to go "
+          f"({args.workers} workers)")
+    if not jobs:
+        return
+
+    # 2. Fan out
+    start = time.perf_counter()
+    done = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.data_dir, args.offline, args.max_memory)) as pool:
+        futures = {pool.submit(ingest_match, match_id, args.competition, args.season, path, meta): match_id
+                   for match_id, path, meta in jobs}
+        for future in as_completed(futures):
+            try:
+                r = future.result()
+            except BrokenProcessPool:
+                r = {'match_id': futures[future], 'status': 'worker died', 'seconds': 0.0,
+                     'frames': 0, 'rows': 0, 'events': 0, 'bytes': 0}
+            done.append(r)
+            print(f"[{len(done)}/{len(jobs)}] {r['match_id']}: {r['status']}  {r['seconds']:.2f}s  "
+                  f"{r['frames']} frames  {r['events']} events  {r['bytes'] / 1024**2:.1f} MB")
+
+    # 3. Summary
+    elapsed = time.perf_counter() - start
+    ok = [r for r in done if r['status'] == 'ok']
+    frames = sum(r['frames'] for r in ok)
+    size = sum(r['bytes'] for r in ok)
+    print(f"Ingested {len(ok)}/{len(jobs)} matches in {elapsed:.1f}s: "
+          f"{len(ok) / elapsed * 60:.1f} matches/min, {frames / elapsed:,.0f} frames/s, "
+          f"{size / 1024**2 / elapsed:.1f} MB/s written")
+    failed = [r for r in done if r['status'] != 'ok']
+    for r in failed:
+        print(f"  {r['match_id']}: {r['status']}")
+
+if __name__ == "__main__":
+    main()
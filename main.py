@@ -1,52 +1,100 @@
 #!/usr/bin/env python3
+import argparse
+import os
+import time
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import pandas as pd
 import numpy as np
 
 # Original Viz
+# Only what the first paint needs is imported here. Screens, match
+# visualizers (scipy) and data processing (pandas, statsbombpy) are imported
+# where they are first used; see benchmarks/startup.py.
 from visualization.pitch import draw_pitch
-from visualization.players import PlayerVisualizer
-from visualization.events import EventVisualizer
-from visualization.analytics import AnalyticsVisualizer
+from visualization.renderer import BlitManager
+from visualization.timeline_bar import TimelineBar, MinuteBox
+from visualization.profiler import FrameProfiler, ProfilerHUD
 from data.loader import DataLoader
-from data.preprocessor import DataPreprocessor
+from data.prefetch import MatchPrefetcher
+from data.match_file import MATCH_FILE_EXT
+from data.stats import StatsEngine
+from data.formations import FormationTimeline
 from utils.theme import Colors
-from utils.config import FPS
+from utils.config import (FPS, COMPETITION_ID, SEASON_ID, SEEK_STEP_SECONDS, SEEK_JUMP_SECONDS,
+                          PROFILER_TRACE_FILE)
 
 # New Screens
 from screens.manager import ScreenManager
-from screens.dashboard import DashboardScreen
-from screens.tactics import TacticsScreen
 
 # Global State
 is_paused = False
+at_end = False # Paused because playback reached the end of the match
 current_frame = 0
+current_positions = None
+
+# Seek keys: arrows move the match clock, the others step between events of a type
+SEEK_KEYS = {'left': -SEEK_STEP_SECONDS, 'right': SEEK_STEP_SECONDS,
+             'down': -SEEK_JUMP_SECONDS, 'up': SEEK_JUMP_SECONDS}
+EVENT_KEYS = {'n': ('Shot', 1), 'b': ('Shot', -1), '.': ('Pass', 1), ',': ('Pass', -1)}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stratos Analytics Pro - football match replay")
+    parser.add_argument('match_file', nargs='?',
+                        help=f"Open a preprocessed {MATCH_FILE_EXT} match file directly")
+    parser.add_argument('--offline', action='store_true',
+                        help="Only use the local match cache, never the network")
+    parser.add_argument('--screen', choices=('dashboard', 'match', 'tactics'), default='dashboard',
+                        help="Screen shown at startup")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Time the frame stages from the start and write the trace to PATH on exit")
+    parser.add_argument('--profile-format', choices=('chrome', 'json'), default='chrome',
+                        help="Trace format: Chrome trace events or stage percentiles + events")
+    return parser.parse_args()
+
+def select_match(matches):
+    """Default match of the competition: Argentina's first home game."""
+    if matches.empty: return None
+    home = matches[matches['home_team'] == 'Argentina']
+    return home.iloc[0] if not home.empty else None
 
 def main():
+    args = parse_args()
     print("Initializing Stratos Analytics Pro...")
-    
-    # [Data Loading - Keep existing]
-    matches = DataLoader.get_public_matches()
-    match = matches[matches['home_team'] == 'Argentina'].iloc[0] if not matches.empty else None
-    if match is None: return
-    match_id = match['match_id']
-    frames = DataLoader.get_match_360_frames(match_id)
-    if frames is None: return
-    events = DataLoader.get_match_events(match_id)
-    events = DataPreprocessor.process_events(events)
+    if args.offline:
+        DataLoader.set_offline(True)
+
+    # Arrow keys seek and 'p' switches the dashboard period / tactics phase;
+    # drop matplotlib's default back / forward / pan bindings for them
+    for keymap in ('keymap.back', 'keymap.forward', 'keymap.pan'):
+        plt.rcParams[keymap] = [k for k in plt.rcParams[keymap] if k not in (*SEEK_KEYS, 'p')]
 
     # Setup Figure
     fig = plt.figure(figsize=(16, 9))
     fig.patch.set_facecolor(Colors.BACKGROUND)
+    # Stage timings: off (near free) unless tracing or the HUD ('d') is shown
+    profiler = FrameProfiler(enabled=bool(args.profile))
+    profiler.attach(fig.canvas)
     
     # 1. Initialize Screen Manager & Sidebar
     screen_manager = ScreenManager(fig)
     screen_manager.setup_sidebar()
+    if args.screen != 'dashboard':
+        screen_manager.switch_to({'match': 'MATCH', 'tactics': 'TACTICS'}[args.screen])
     
-    # 2. Initialize Screens
-    dashboard_screen = DashboardScreen(fig)
-    tactics_screen = TacticsScreen(fig)
+    # 2. Screens are built on their first visit, then kept (see RetainedScreen)
+    screens = screen_manager.screens
+    stats_engine = StatsEngine()
+
+    def get_screen(key):
+        if key not in screens:
+            if key == 'DASHBOARD':
+                from screens.dashboard import DashboardScreen
+                screens[key] = DashboardScreen(fig, stats_engine)
+                show_match_stats()
+            else:
+                from screens.tactics import TacticsScreen
+                screens[key] = TacticsScreen(fig)
+                show_formations()
+        return screens[key]
     
     # 3. Initialize Match View (The "Live" canvas)
     # This was the old "main ax". We create it but manage its visibility manually via hiding/showing
@@ -57,46 +105,206 @@ def main():
     ax_match = fig.add_axes([0.1, 0.05, 0.85, 0.9])
     ax_match.set_facecolor(Colors.PITCH_COLOR)
     draw_pitch(ax=ax_match, line_color=Colors.LINE_COLOR, pitch_color=Colors.PITCH_COLOR)
+    # Shown until the match data arrives; the window opens before any download
+    loading_text = ax_match.text(60, 40, "Loading match...", color='white', fontsize=16,
+                                 ha='center', va='center', zorder=10)
     
-    # Visualizers for Match
-    player_viz = PlayerVisualizer(ax_match)
-    player_viz.init_players()
-    event_viz = EventVisualizer(ax_match)
-    analytics_viz = AnalyticsVisualizer(ax_match)
-    
-    # Group Frames
-    grouped_frames = [group for _, group in frames.groupby('id', sort=False)]
-    total_frames = len(grouped_frames)
-    events_lookup = events.set_index('id')
+    # Scrub bar and "go to minute" box under the pitch
+    timeline_bar = TimelineBar(fig, [0.15, 0.012, 0.62, 0.03])
+    ax_minute = fig.add_axes([0.86, 0.012, 0.05, 0.03])
+    minute_box = MinuteBox(ax_minute, "Minute ", color=Colors.CHART_BG, hovercolor=Colors.BORDER)
+    minute_box.label.set_color(Colors.TEXT_COLOR)
+    minute_box.text_disp.set_color(Colors.TEXT_COLOR)
+
+    # Blitting: pitch + sidebar are cached as a background, only overlays are redrawn
+    blit_manager = BlitManager(ax_match, *timeline_bar.axes)
+    hud = ProfilerHUD(ax_match, profiler)
+
+    # Match data (start_match) and visualizers (build_match_view)
+    frames = match_data = None
+    formation_load = formations = None
+    scene = analytics_viz = playback = scheduler = seek_index = None
+    # Set by a seek so a paused view still redraws once
+    redraw = False
+
+    def start_match(match_frames, match_events, match_path):
+        """Match data is ready; the visualizers follow on the first visit of the match screen."""
+        nonlocal frames, match_data, formation_load
+        frames = match_frames
+        match_data = (match_frames, match_events, match_path)
+        stats_engine.add_match(match_path, match_events)
+        show_match_stats()
+        if screen_manager.current_screen == 'DASHBOARD':
+            screen_manager.present()
+        # Formations take a second or two: inferred (or read from their cache) on the loader pool
+        formation_load = DataLoader.submit(FormationTimeline.load_or_build, match_frames, match_events, match_path)
+
+    def show_match_stats():
+        """Points the dashboard, once built, at the loaded match."""
+        if match_data is not None and 'DASHBOARD' in screens:
+            screens['DASHBOARD'].set_match(match_data[2])
+
+    def poll_formations():
+        nonlocal formation_load, formations
+        if formation_load is None or not formation_load.done():
+            return
+        try:
+            formations = formation_load.result()
+        except Exception as e:
+            print(f"Could not infer formations: {e}")
+        formation_load = None
+        show_formations()
+        if screen_manager.current_screen == 'TACTICS':
+            screen_manager.present()
+
+    def show_formations():
+        """Hands the formations, once inferred, to the tactics screen once built."""
+        if formations is not None and 'TACTICS' in screens:
+            screens['TACTICS'].set_formations(formations, current_frame)
+
+    def build_match_view():
+        nonlocal scene, analytics_viz, playback, scheduler, seek_index
+        from visualization.scene import MatchScene
+        from visualization.scheduler import PlaybackScheduler
+        from data.playback import PlaybackTimeline
+        from data.seek_index import SeekIndex
+
+        match_frames, match_events, match_path = match_data
+        # Real-time playback between the 360 snapshots
+        playback = PlaybackTimeline(match_frames, match_events)
+        seek_index = SeekIndex.build(playback, match_events)
+        timeline_bar.set_match(playback.duration, seek_index)
+
+        # Visualizers for Match
+        scene = MatchScene(ax_match, match_frames, match_events, match_path, profiler=profiler)
+        analytics_viz = scene.analytics
+        scheduler = PlaybackScheduler(playback, on_quality=scene.set_quality)
+
+        loading_text.set_visible(False)
+        blit_manager.invalidate()
+        fig.canvas.draw_idle()
+
+    def show_loading_error(message):
+        print(message)
+        loading_text.set_text(message)
+        blit_manager.invalidate()
+        screen_manager.invalidate('MATCH')
+        fig.canvas.draw_idle()
+
+    # --- Background Loading ---
+    # The match list, then the match (events + 360 frames in parallel), then
+    # the next matches of the competition are fetched off the UI thread.
+    prefetcher = MatchPrefetcher(COMPETITION_ID, SEASON_ID)
+    loading = {'matches': None, 'match': None}
+    fig.canvas.mpl_connect('close_event', lambda event: prefetcher.shutdown())
+    if args.profile:
+        fig.canvas.mpl_connect('close_event', lambda event: profiler.export(args.profile, args.profile_format))
+
+    if args.match_file:
+        from data.preprocessor import DataPreprocessor
+        match_frames, match_events, _ = DataPreprocessor.load_match(args.match_file)
+        start_match(match_frames, match_events, args.match_file)
+    else:
+        loading['matches'] = DataLoader.submit(DataLoader.get_public_matches, COMPETITION_ID, SEASON_ID)
+
+    def poll_loading():
+        """Advances the background load; returns True once the match is ready."""
+        if frames is not None:
+            return True
+
+        matches_future, match_load = loading['matches'], loading['match']
+        if matches_future is None:
+            return False
+        if match_load is None:
+            if not matches_future.done():
+                return False
+            matches = matches_future.result()
+            match = select_match(matches)
+            if match is None:
+                loading['matches'] = None
+                show_loading_error("No match available.")
+                return False
+            loading['match'] = prefetcher.load(match['match_id'], prefetcher.match_meta(match))
+            prefetcher.prefetch(matches, match['match_id'])
+            return False
+
+        if not match_load.done():
+            return False
+        loading['matches'] = None
+        try:
+            match_frames, match_events, match_path = match_load.result()
+        except Exception as e:
+            show_loading_error(f"Could not load match: {e}")
+            return False
+        if match_frames is None:
+            show_loading_error("No 360 data for this match.")
+            return False
+        start_match(match_frames, match_events, match_path)
+        return True
 
     # --- Screen Switching Logic ---
     def update_screen_visibility():
+        nonlocal redraw
+        start = time.perf_counter()
         curr = screen_manager.current_screen
         
-        # 1. Dashboard
-        if curr == 'DASHBOARD':
-            ax_match.set_visible(False)
-            dashboard_screen.show()
-            tactics_screen.hide()
-        
-        # 2. Tactics
-        elif curr == 'TACTICS':
+        match_widgets = (*timeline_bar.axes, ax_minute)
+        for ax in match_widgets:
+            ax.set_visible(curr == 'MATCH')
+        minute_box.set_active(curr == 'MATCH')
+        for key, screen in screens.items():
+            if key != curr:
+                screen.hide()
+
+        # 1. Dashboard / Tactics
+        if curr in ('DASHBOARD', 'TACTICS'):
             ax_match.set_visible(False)
-            dashboard_screen.hide()
-            tactics_screen.show()
+            get_screen(curr).show()
+            if curr == 'TACTICS':
+                # Formation of the window the match has been played up to
+                screens[curr].show_frame(current_frame)
             
-        # 3. Match
+        # 2. Match
         elif curr == 'MATCH':
-            dashboard_screen.hide()
-            tactics_screen.hide()
             ax_match.set_visible(True)
+            # The cached screen has no overlays; draw them even if paused
+            redraw = True
             
-        fig.canvas.draw_idle()
+        # Cached bitmap of the screen if nothing changed, else a full redraw
+        screen_manager.present()
+        profiler.record('switch', start, time.perf_counter())
 
     # Initial State
     update_screen_visibility()
 
     # --- Interaction Handlers ---
+    def seek(seconds):
+        """Jumps the playback to a playback time (seconds); resumes if it had stopped at the end."""
+        global is_paused, at_end
+        nonlocal redraw
+        if scheduler is None or seconds is None:
+            return
+        if at_end and seconds < playback.duration:
+            is_paused = at_end = False
+        scheduler.seek(seconds)
+        # The rolling heatmap window no longer matches the frames around the new position
+        analytics_viz.reset_heatmap()
+        redraw = True
+
+    def on_minute_submit(text):
+        """'79' or '79:30' -> seek to that match clock time."""
+        if seek_index is None or not text.strip():
+            return
+        try:
+            parts = [float(p) for p in text.strip().split(':')]
+        except ValueError:
+            print(f"Not a match time: {text!r} (use MM or MM:SS)")
+            return
+        seconds = parts[0] * 60 + (parts[1] if len(parts) > 1 else 0)
+        seek(seek_index.time_at_match_clock(seconds))
+
+    minute_box.on_submit(on_minute_submit)
+
     def on_click_global(event):
         # 1. Check Sidebar
         new_screen = screen_manager.handle_click(event)
@@ -105,79 +313,133 @@ def main():
             update_screen_visibility()
             return
 
-        # 2. If Match Screen Active -> Player Click
+        # 2. Scrub bar
+        if screen_manager.current_screen == 'MATCH' and event.inaxes == timeline_bar.ax:
+            timeline_bar.dragging = True
+            seek(timeline_bar.time_at(event))
+            return
+
+        # 3. If Match Screen Active -> Player Click
         if screen_manager.current_screen == 'MATCH' and event.inaxes == ax_match:
             # Handle player selection (Copied from previous logic)
             click_x, click_y = event.xdata, event.ydata
-            if current_frame < len(grouped_frames):
-                frame_data = grouped_frames[current_frame]
+            if current_positions is not None:
+                home_xy, away_xy = current_positions
                 min_dist = 5.0 
                 selected = None
-                idx_counter = 1
-                for _, row in frame_data.iterrows():
-                    px, py = row['location']
-                    dist = ((px - click_x)**2 + (py - click_y)**2)**0.5
-                    if dist < min_dist:
-                        min_dist = dist
-                        team = "Home" if row['teammate'] else "Away"
-                        selected = (team, idx_counter, (px, py))
-                    idx_counter += 1
+                for team, xy in (("Home", home_xy), ("Away", away_xy)):
+                    if not len(xy): continue
+                    dists = np.hypot(xy[:, 0] - click_x, xy[:, 1] - click_y)
+                    idx = int(np.argmin(dists))
+                    if dists[idx] < min_dist:
+                        min_dist = dists[idx]
+                        selected = (team, idx + 1, tuple(xy[idx]))
                 if selected:
                     print(f"Player {selected} clicked")
                     # In Stratos, we might show a popup or specific graphic. 
                     # For now, print to console.
 
+    def on_drag(event):
+        if timeline_bar.dragging:
+            seek(timeline_bar.time_at(event))
+
+    def on_release(event):
+        timeline_bar.dragging = False
+
     def on_key_global(event):
-        global is_paused
-        if event.key == ' ':
+        global is_paused, at_end
+        nonlocal redraw
+        if minute_box.capturekeystrokes:
+            return # Typing into the minute box
+        if screen_manager.current_screen in screens and screens[screen_manager.current_screen].handle_key(event.key):
+            screen_manager.present()
+        elif event.key == ' ':
             is_paused = not is_paused
+            at_end = False
+        elif event.key == 'e':
+            profiler.export(args.profile or PROFILER_TRACE_FILE, args.profile_format)
+        elif analytics_viz is None:
+            return
+        elif event.key == 'i':
+            stats = scheduler.stats()
+            print(f"Playback: {stats['fps']:.1f} fps, {stats['render_ms']:.1f} ms/frame, "
+                  f"{stats['rendered']} rendered, {stats['dropped']} dropped, quality level {stats['quality']}")
+            return
+        elif event.key == 'd':
+            hud.toggle()
+            profiler.enabled = hud.visible or bool(args.profile)
+            redraw = True
         elif event.key == 't':
             analytics_viz.toggle()
+        elif event.key == 'w':
+            analytics_viz.toggle_heatmap_window()
+        elif event.key in SEEK_KEYS:
+            seek(scheduler.play_time + SEEK_KEYS[event.key])
+        elif event.key in EVENT_KEYS:
+            event_type, direction = EVENT_KEYS[event.key]
+            seek(seek_index.step_event(event_type, scheduler.play_time, direction))
 
     fig.canvas.mpl_connect('button_press_event', on_click_global)
     fig.canvas.mpl_connect('key_press_event', on_key_global)
+    fig.canvas.mpl_connect('motion_notify_event', on_drag)
+    fig.canvas.mpl_connect('button_release_event', on_release)
 
     # --- Animation Loop ---
-    def update(frame_idx):
-        global current_frame
+    def update(playback_frame):
+        """Updates all match overlays for a playback frame and returns the dynamic artists."""
+        global current_frame, current_positions
+        with profiler.stage('positions'):
+            frame_idx, home_xy, away_xy = playback.positions(playback_frame)
+            blend = playback.blend(playback_frame)
+        current_frame = frame_idx
+        current_positions = (home_xy, away_xy)
+        artists = scene.update(frame_idx, current_positions, blend)
+        with profiler.stage('timeline'):
+            play_time = scheduler.play_time
+            artists = artists + timeline_bar.update(play_time, seek_index.match_clock_at(play_time))
+        return artists + hud.update()
+
+    def tick():
+        global is_paused, at_end
+        nonlocal redraw
+        if not poll_loading():
+            return
+        poll_formations()
         
         # Only update animation if on MATCH screen
         if screen_manager.current_screen != 'MATCH':
-            return [] # Do nothing
-            
-        if is_paused: return []
-        
-        current_frame = frame_idx
-        frame_data = grouped_frames[frame_idx]
-        
-        # 1. Update Players
-        home_xy = []
-        away_xy = []
-        for _, row in frame_data.iterrows():
-            loc = row['location']
-            if row['teammate']: home_xy.append(loc)
-            else: away_xy.append(loc)
-            
-        player_viz.update(home_xy, away_xy)
-        
-        # 2. Update Events
-        event_id = frame_data.iloc[0]['id']
-        if event_id in events_lookup.index:
-            event_row = events_lookup.loc[event_id]
-            if isinstance(event_row, pd.DataFrame): event_row = event_row.iloc[0]
-            event_viz.draw_event(event_row)
-        else:
-            event_viz.clear()
-
-        # 3. Analytics
-        analytics_viz.draw_defensive_line(home_xy, away_xy)
-        analytics_viz.draw_heatmap(home_xy, away_xy)
-        analytics_viz.draw_pass_network(home_xy, away_xy)
-
-        return player_viz.home_dots, player_viz.away_dots
-
-    anim = FuncAnimation(fig, update, frames=range(total_frames), 
-                         interval=1000/FPS, blit=False, repeat=False)
+            if scheduler is not None:
+                scheduler.pause()
+            return
+        if scene is None:
+            build_match_view()
+        if is_paused:
+            scheduler.pause()
+            if redraw:
+                redraw = False
+                blit_manager.update(update(playback.frame_at(scheduler.play_time)))
+            return
+        redraw = False
+
+        # The scheduler follows wall time: frames that fell due during a slow render are skipped
+        playback_frame = scheduler.next_frame()
+        if scheduler.finished:
+            # Hold the last frame; seeking back resumes
+            is_paused = at_end = True
+            scheduler.seek(playback.duration)
+            return
+        start = time.perf_counter()
+        artists = update(playback_frame)
+        with profiler.stage('blit'):
+            blit_manager.update(artists)
+        end = time.perf_counter()
+        profiler.record('frame', start, end)
+        scheduler.frame_done(end - start)
+
+    # The timer drives blitted frames; FuncAnimation(blit=False) forced a full redraw per tick
+    timer = fig.canvas.new_timer(interval=int(1000/FPS))
+    timer.add_callback(tick)
+    timer.start()
     
     print("Stratos Analytics Launched.")
     plt.show()
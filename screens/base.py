@@ -0,0 +1,34 @@
+class RetainedScreen:
+    """
+    Base for screens whose axes are built once, on the first show(), and
+    afterwards only toggled visible. Subclasses add their axes in build() and
+    call changed() whenever the data they display changes, which tells the
+    ScreenManager that its cached bitmap of the screen is stale.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.axes = []
+        self.version = 0 # Bumped by changed()
+        self._built = False
+
+    def build(self):
+        raise NotImplementedError
+
+    def show(self):
+        if not self._built:
+            self.build()
+            self._built = True
+        for ax in self.axes:
+            ax.set_visible(True)
+
+    def hide(self):
+        for ax in self.axes:
+            ax.set_visible(False)
+
+    def changed(self):
+        self.version += 1
+
+    def handle_key(self, key):
+        """Screen-specific keys; returns True if the key changed the screen."""
+        return False
@@ -1,22 +1,36 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import numpy as np
+from data.stats import StatsEngine
+from screens.base import RetainedScreen
 from utils.theme import Colors
 
-class DashboardScreen:
-    def __init__(self, fig):
-        self.fig = fig
-        self.axes = []
-        
-    def show(self):
-        """Renders the Analytics Dashboard with Bento-style containers."""
-        self.hide() 
-        
+class DashboardScreen(RetainedScreen):
+    """
+    Statistics of one player of the loaded match, from a StatsEngine.
+    The selected player and period filter are changed with next_player()
+    and next_period(); refresh() updates the artists in place.
+    """
+
+    # Key -> player step
+    PLAYER_KEYS = {'[': -1, ']': 1}
+
+    def __init__(self, fig, stats):
+        super().__init__(fig)
+        self.stats = stats
+        self.match = None
+        self.player_idx = 0
+        self.period_idx = 0
+        self.heatmap = None
+
+    def build(self):
+        """Builds the Analytics Dashboard with Bento-style containers (once, see RetainedScreen)."""
         # 1. Header (Top)
         ax_header = self.fig.add_axes([0.1, 0.9, 0.8, 0.08])
         ax_header.set_facecolor(Colors.BACKGROUND)
-        ax_header.text(0.0, 0.5, "Kevin De Bruyne", color='white', fontsize=28, fontweight='bold', va='center')
-        ax_header.text(0.35, 0.5, "#17 | Manchester City", color=Colors.PRIMARY, fontsize=14, va='center')
+        self.name_text = ax_header.text(0.0, 0.65, "Loading match...", color='white', fontsize=24,
+                                        fontweight='bold', va='center')
+        self.info_text = ax_header.text(0.0, 0.1, "", color=Colors.PRIMARY, fontsize=12, va='center')
+        ax_header.text(1.0, 0.1, "[ ]  player     p  period", color='grey', fontsize=9, ha='right', va='center')
         ax_header.axis('off')
         self.axes.append(ax_header)
         
@@ -49,36 +63,35 @@ class DashboardScreen:
             return ax
 
         # 2. Main Heatmap (Left Large Box) - Grid Location
-        ax_heat = draw_bento_panel([0.1, 0.35, 0.45, 0.5], "SEASONAL HEATMAP")
+        ax_heat = draw_bento_panel([0.1, 0.35, 0.45, 0.5], "EVENT HEATMAP")
         # Visual styling: Add pitch outline
         self._draw_mini_pitch(ax_heat)
-        # Heatmap blobs
-        x, y = np.random.normal(loc=60, scale=20, size=1000), np.random.normal(loc=40, scale=15, size=1000)
-        ax_heat.hist2d(x, y, bins=30, range=[[0, 120], [0, 80]], cmap='Greens', alpha=0.6, zorder=2)
+        # Heatmap mesh, filled by refresh()
+        _, _, _, self.heatmap = ax_heat.hist2d([], [], bins=StatsEngine.HEATMAP_BINS, range=StatsEngine.HEATMAP_RANGE,
+                                               cmap='Greens', alpha=0.6, zorder=2)
         self.axes.append(ax_heat)
         
         # 3. Pass Distribution (Right Top Box)
         ax_pass = draw_bento_panel([0.57, 0.55, 0.35, 0.3], "PASS DISTRIBUTION")
-        labels = ['Forward', 'Lateral', 'Backward']
-        vals = [85, 60, 30] # percents
         y_pos = [2.5, 1.5, 0.5]
+        self.pass_labels, self.pass_bars = [], []
         
         # Custom "Progress Bar" chart
-        for y, val, label in zip(y_pos, vals, labels):
+        for y, label in zip(y_pos, StatsEngine.PASS_DIRECTIONS):
             # Label
-            ax_pass.text(0.05, y/3 + 0.1, label, color='white', fontsize=10, transform=ax_pass.transAxes)
+            self.pass_labels.append(ax_pass.text(0.05, y/3 + 0.1, label, color='white', fontsize=10, transform=ax_pass.transAxes))
             # Background Track
             rect_bg = patches.Rectangle((0.3, y/3+0.08), 0.6, 0.08, facecolor='#1E3A5F', transform=ax_pass.transAxes)
             ax_pass.add_patch(rect_bg)
-            # Fill
-            width = 0.6 * (val/100)
-            rect_fill = patches.Rectangle((0.3, y/3+0.08), width, 0.08, facecolor=Colors.PRIMARY, transform=ax_pass.transAxes)
+            # Fill, width set by refresh()
+            rect_fill = patches.Rectangle((0.3, y/3+0.08), 0, 0.08, facecolor=Colors.PRIMARY, transform=ax_pass.transAxes)
             ax_pass.add_patch(rect_fill)
+            self.pass_bars.append(rect_fill)
         self.axes.append(ax_pass)
         
         # 4. Network Centrality (Right Middle Box)
         ax_net = draw_bento_panel([0.57, 0.35, 0.35, 0.18], "NETWORK CENTRALITY")
-        ax_net.text(0.5, 0.4, "0.84", color='white', fontsize=36, fontweight='bold', ha='center', va='center', transform=ax_net.transAxes)
+        self.centrality_text = ax_net.text(0.5, 0.4, "-", color='white', fontsize=36, fontweight='bold', ha='center', va='center', transform=ax_net.transAxes)
         # Radial Circles decoration
         c1 = patches.Circle((0.5, 0.45), 0.2, color=Colors.PRIMARY, fill=False, lw=3, alpha=0.3, transform=ax_net.transAxes)
         ax_net.add_patch(c1)
@@ -87,21 +100,24 @@ class DashboardScreen:
         # 5. Bottom Stats Matrix (Bottom Strip)
         ax_stats = draw_bento_panel([0.1, 0.1, 0.82, 0.22], "PLAYER PERFORMANCE MATRIX")
         
-        # Draw nicer bars
-        data = [30, 45, 20, 10, 15, 25, 35, 60, 65, 40]
-        n_bars = len(data)
-        bar_width = 0.6
-        for i, h in enumerate(data):
+        # One bar per metric, scaled to the best player of the match
+        n_bars = len(StatsEngine.MATRIX_METRICS)
+        self.matrix_bars, self.matrix_values = [], []
+        for i, (label, _) in enumerate(StatsEngine.MATRIX_METRICS):
             # Calculate position in 0-1 range
             x_center = (i + 0.5) / n_bars
-            h_norm = h / 100 * 0.7 
             
             # Rounded Top Bar
             # We simulate rounded top by drawing a rect + circle on top? Or just standard bars for now.
-            rect = patches.Rectangle((x_center - 0.03, 0.15), 0.06, h_norm, facecolor=Colors.PRIMARY, transform=ax_stats.transAxes)
+            rect = patches.Rectangle((x_center - 0.03, 0.15), 0.06, 0, facecolor=Colors.PRIMARY, transform=ax_stats.transAxes)
             ax_stats.add_patch(rect)
+            self.matrix_bars.append(rect)
+            self.matrix_values.append(ax_stats.text(x_center, 0.17, "", color='white', fontsize=8,
+                                                    ha='center', va='bottom', transform=ax_stats.transAxes))
+            ax_stats.text(x_center, 0.05, label, color='grey', fontsize=8, ha='center', transform=ax_stats.transAxes)
             
         self.axes.append(ax_stats)
+        self.refresh()
         
     def _draw_mini_pitch(self, ax):
         # Draw a faint pitch outline inside the axes (0-120, 0-80)
@@ -119,7 +135,68 @@ class DashboardScreen:
         c = patches.Circle((60, 40), 10, color=lc, fill=False)
         ax.add_patch(c)
         
-    def hide(self):
-        for ax in self.axes:
-            ax.remove()
-        self.axes = []
+    # --- Selection ---
+    def set_match(self, match):
+        """Shows a match registered with the StatsEngine, from its most involved player."""
+        self.match = match
+        self.player_idx = 0
+        self.period_idx = 0
+        self.refresh()
+
+    def next_player(self, step=1):
+        if self.match is not None:
+            self.player_idx = (self.player_idx + step) % max(len(self.stats.players(self.match)), 1)
+            self.refresh()
+
+    def next_period(self):
+        if self.match is not None:
+            self.period_idx = (self.period_idx + 1) % len(self.stats.periods(self.match))
+            self.refresh()
+
+    def handle_key(self, key):
+        if self.match is None:
+            return False
+        if key in self.PLAYER_KEYS:
+            self.next_player(self.PLAYER_KEYS[key])
+        elif key == 'p':
+            self.next_period()
+        else:
+            return False
+        return True
+
+    def refresh(self):
+        """Puts the selected player's statistics into the artists (memoised by the engine)."""
+        if self.heatmap is None or self.match is None:
+            return
+        players = self.stats.players(self.match)
+        if not players:
+            self.name_text.set_text("No player events")
+            self.changed()
+            return
+        period = self.stats.periods(self.match)[self.period_idx]
+        summary = self.stats.summary(self.match, players[self.player_idx], period)
+
+        self.name_text.set_text(summary['player'])
+        period_label = "Full match" if period is None else f"Period {period}"
+        self.info_text.set_text(f"{summary['team'] or '-'} | {period_label} | {summary['passes']} passes")
+
+        for label, text, bar, share in zip(StatsEngine.PASS_DIRECTIONS, self.pass_labels,
+                                           self.pass_bars, summary['pass_directions']):
+            text.set_text(f"{label} {share * 100:.0f}%")
+            bar.set_width(0.6 * share)
+
+        self.centrality_text.set_text(f"{summary['centrality']:.2f}")
+
+        for bar, text, value, scaled in zip(self.matrix_bars, self.matrix_values,
+                                            summary['matrix'], summary['matrix_scaled']):
+            bar.set_height(0.6 * scaled)
+            text.set_y(0.17 + 0.6 * scaled)
+            text.set_text(f"{value:.2f}" if value < 10 and value % 1 else f"{value:.0f}")
+
+        self.set_heatmap(summary['heatmap'])
+        self.changed()
+
+    def set_heatmap(self, counts):
+        """Replaces the heatmap counts (HEATMAP_BINS squared, x first) in place."""
+        self.heatmap.set_array(counts.T)
+        self.heatmap.set_clim(0, max(counts.max(), 1))
@@ -8,9 +8,11 @@ class ScreenManager:
     def __init__(self, fig):
         self.fig = fig
         self.current_screen = "DASHBOARD" # Default
-        self.screens = {}
+        self.screens = {} # Screen key -> RetainedScreen, registered as they are built
         self.sidebar_buttons = []
-        
+        # Screen key -> (screen version, bitmap of the whole figure), see present()
+        self._bitmaps = {}
+
     def setup_sidebar(self):
         """Creates the permanent sidebar navigation."""
         # Clean Sidebar Area
@@ -32,6 +34,9 @@ class ScreenManager:
         self._add_nav_button(ax, 0.6, "SQUAD", "TACTICS")
         
         self.nav_ax = ax
+        # Connected before any BlitManager, so the capture never includes animated overlays
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self.fig.canvas.mpl_connect('resize_event', lambda event: self._bitmaps.clear())
         # Initialize default state
         self.switch_to("DASHBOARD")
         
@@ -69,5 +74,37 @@ class ScreenManager:
             else:
                 text.set_color('grey')
                 text.set_fontweight('normal')
-        
+
+        # The caller sets axes visibility, then calls present()
+
+    # --- Bitmap cache ---
+    def _version(self, screen_key):
+        screen = self.screens.get(screen_key)
+        return screen.version if screen is not None else 0
+
+    def _on_draw(self, event):
+        """Every full draw refreshes the cached bitmap of the screen it showed."""
+        self._bitmaps[self.current_screen] = (self._version(self.current_screen),
+                                              self.fig.canvas.copy_from_bbox(self.fig.bbox))
+
+    def invalidate(self, screen_key=None):
+        """Drops the cached bitmap of a screen (all screens if None)."""
+        if screen_key is None:
+            self._bitmaps.clear()
+        else:
+            self._bitmaps.pop(screen_key, None)
+
+    def present(self):
+        """
+        Puts the current screen on the canvas once its axes visibility is set:
+        blits its cached bitmap if the screen is unchanged since it was
+        captured, otherwise does a full redraw (which captures it again).
+        Returns True if the bitmap was used.
+        """
+        cached = self._bitmaps.get(self.current_screen)
+        if cached is not None and cached[0] == self._version(self.current_screen):
+            self.fig.canvas.restore_region(cached[1])
+            self.fig.canvas.blit(self.fig.bbox)
+            return True
         self.fig.canvas.draw_idle()
+        return False
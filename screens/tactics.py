@@ -1,56 +1,118 @@
 import matplotlib.pyplot as plt
 from visualization.pitch import draw_pitch
+from screens.base import RetainedScreen
 from utils.theme import Colors
 
-class TacticsScreen:
+class TacticsScreen(RetainedScreen):
+    """
+    Inferred formation of one team in one possession phase, from a
+    FormationTimeline computed off the UI thread. Shows the window at the
+    current match frame; keys step through windows, phases and teams.
+    """
+
+    # Key -> window step
+    WINDOW_KEYS = {'[': -1, ']': 1}
+
     def __init__(self, fig):
-        self.fig = fig
-        self.axes = []
-        
-    def show(self):
-        self.hide()
-        
+        super().__init__(fig)
+        self.formations = None
+        self.team = 0
+        self.phase = 0
+        self.window = 0
+        self.players = []
+
+    def build(self):
         # Header
         ax_header = self.fig.add_axes([0.1, 0.9, 0.8, 0.08])
         ax_header.set_facecolor(Colors.BACKGROUND)
-        ax_header.text(0.0, 0.5, "Tactical Formation: 4-3-3", color='white', fontsize=24, fontweight='bold', va='center')
-        ax_header.text(0.35, 0.5, "Phase: Attacking Organization", color=Colors.PRIMARY, fontsize=14, va='center')
+        self.title_text = ax_header.text(0.0, 0.5, "Tactical Formation", color='white', fontsize=24,
+                                         fontweight='bold', va='center')
+        self.phase_text = ax_header.text(0.45, 0.5, "Computing formations...", color=Colors.PRIMARY,
+                                         fontsize=14, va='center')
+        ax_header.text(1.0, 0.1, "[ ]  window     p  phase     x  team", color='grey', fontsize=9,
+                       ha='right', va='center')
         ax_header.axis('off')
         self.axes.append(ax_header)
-        
+
         # Pitch
         ax_pitch = self.fig.add_axes([0.15, 0.1, 0.7, 0.8])
         ax_pitch.set_facecolor(Colors.PITCH_COLOR)
         draw_pitch(ax_pitch, line_color=Colors.LINE_COLOR, pitch_color=Colors.PITCH_COLOR)
         self.axes.append(ax_pitch)
-        
-        # Draw Players in 4-3-3
-        # GK
-        self._draw_player(ax_pitch, 5, 40, "GK", "1")
-        # Defense
-        self._draw_player(ax_pitch, 25, 10, "LB", "3")
-        self._draw_player(ax_pitch, 25, 30, "CB", "4")
-        self._draw_player(ax_pitch, 25, 50, "CB", "5")
-        self._draw_player(ax_pitch, 25, 70, "RB", "2")
-        # Midfield
-        self._draw_player(ax_pitch, 50, 40, "CDM", "6")
-        self._draw_player(ax_pitch, 70, 20, "CM", "8")
-        self._draw_player(ax_pitch, 70, 60, "CM", "10")
-        # Attack
-        self._draw_player(ax_pitch, 90, 15, "LW", "11")
-        self._draw_player(ax_pitch, 100, 40, "ST", "9")
-        self._draw_player(ax_pitch, 90, 65, "RW", "7")
-        
-    def _draw_player(self, ax, x, y, role, num):
+
+        # Keeper, then the 10 outfield players placed by refresh()
+        self._draw_player(ax_pitch, 5, 40, "GK")
+        for _ in range(10):
+            self._draw_player(ax_pitch, 60, 40, "")
+        self.refresh()
+
+    def _draw_player(self, ax, x, y, role):
         # Circle
         circle = plt.Circle((x, y), 3, color=Colors.PRIMARY, alpha=0.8, zorder=3)
         ax.add_patch(circle)
-        # Number
-        ax.text(x, y, num, color='black', ha='center', va='center', fontweight='bold', zorder=4)
         # Role Label
-        ax.text(x, y-5, role, color='white', ha='center', fontsize=8, zorder=4)
-        
-    def hide(self):
-        for ax in self.axes:
-            ax.remove()
-        self.axes = []
+        label = ax.text(x, y-5, role, color='white', ha='center', fontsize=8, zorder=4)
+        self.players.append((circle, label))
+
+    # --- Selection ---
+    def set_formations(self, formations, frame_idx=0):
+        self.formations = formations
+        self.team = 0
+        self.phase = 0
+        self.window = formations.window_at(self.team, self.phase, frame_idx)
+        self.refresh()
+
+    def show_frame(self, frame_idx):
+        """Selects the window at a match frame; only redraws if it changed."""
+        if self.formations is None:
+            return
+        window = self.formations.window_at(self.team, self.phase, frame_idx)
+        if window != self.window:
+            self.window = window
+            self.refresh()
+
+    def handle_key(self, key):
+        if self.formations is None:
+            return False
+        # Keep the time position when switching team or phase
+        frame = self.formations.formation(self.team, self.phase, self.window)['first'] if self._count() else 0
+        if key in self.WINDOW_KEYS:
+            self.window = min(max(self.window + self.WINDOW_KEYS[key], 0), max(self._count() - 1, 0))
+        elif key == 'p':
+            self.phase = 1 - self.phase
+            self.window = self.formations.window_at(self.team, self.phase, frame)
+        elif key == 'x' and len(self.formations.teams) > 1:
+            self.team = 1 - self.team
+            self.window = self.formations.window_at(self.team, self.phase, frame)
+        else:
+            return False
+        self.refresh()
+        return True
+
+    def _count(self):
+        return self.formations.count(self.team, self.phase)
+
+    def refresh(self):
+        """Moves the players to the selected window's formation."""
+        if not self.players or self.formations is None:
+            return
+        if not self._count():
+            self.title_text.set_text(f"{self.formations.teams[self.team]}: -")
+            self.phase_text.set_text(f"Phase: {('In', 'Out of')[self.phase]} possession | no snapshots")
+            self.changed()
+            return
+
+        formation = self.formations.formation(self.team, self.phase, self.window)
+        first, last = formation['minutes']
+        self.title_text.set_text(f"{formation['team']}: {formation['label'] or '-'}")
+        self.phase_text.set_text(f"Phase: {formation['phase']} | {first}'-{last}' | "
+                                 f"window {self.window + 1}/{self._count()}")
+        visible = formation['label'] is not None
+        for (circle, label), xy, role in zip(self.players[1:], formation['xy'],
+                                             formation['roles'] if visible else [''] * 10):
+            circle.set_center(xy)
+            label.set_position((xy[0], xy[1] - 5))
+            label.set_text(role)
+            circle.set_visible(visible)
+            label.set_visible(visible)
+        self.changed()
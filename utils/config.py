@@ -1,7 +1,79 @@
+import os
+
 # Pitch Dimensions (Standard StatsBomb)
 PITCH_LENGTH = 120
 PITCH_WIDTH = 80
 
 # Animation Settings
 FPS = 25
-SPEED_FACTOR = 1.0
+SPEED_FACTOR = 1.0 # Match seconds played per wall-clock second
+
+# Interpolated Playback (see data/playback.py)
+PLAYBACK_CHUNK_FRAMES = 250 # Interpolated frames computed per chunk
+PLAYBACK_CACHE_CHUNKS = 8 # Chunks kept in memory (least recently used dropped)
+PLAYBACK_MAX_STEP = 15.0 # Pitch units; farther apart snapshots are not the same player
+PERIOD_BREAK_SECONDS = 2.0 # Pause played between periods instead of half-time
+SEEK_STEP_SECONDS = 5 # Left / right arrow
+SEEK_JUMP_SECONDS = 60 # Down / up arrow
+
+# Playback Scheduler (see visualization/scheduler.py)
+DEGRADE_LOAD = 0.9 # Lower the quality level when render time exceeds this share of the frame budget
+RESTORE_LOAD = 0.5 # Raise it again after RESTORE_FRAMES frames below this share
+RESTORE_FRAMES = 50
+QUALITY_HEATMAP_DIVISOR = (1, 2, 4) # Heatmap bins divisor per quality level
+QUALITY_LINK_SCALE = (1.0, 0.6, 0.0) # Pass-network link radius factor per quality level
+QUALITY_LABELS = (True, True, False) # Player number labels per quality level
+
+# Frame Profiler (see visualization/profiler.py)
+PROFILER_WINDOW = 250 # Recent runs per stage behind the rolling percentiles
+PROFILER_TRACE_EVENTS = 200_000 # Stage runs kept for trace export (oldest dropped)
+PROFILER_TRACE_FILE = 'pitch-replay-trace.json' # Written by the 'e' key without --profile
+HUD_REFRESH_FRAMES = 10 # Frames between HUD text updates
+
+# Analytics Overlays
+HEATMAP_BINS = (60, 40) # Grid cells along pitch length / width
+HEATMAP_SIGMA = 8.0 # Gaussian smoothing radius in pitch units
+HEATMAP_WINDOW = 50 # Frames in the rolling heatmap window ('w' toggles it)
+PASS_LINK_RADIUS = 25 # Max teammate distance drawn as a pass-network link
+
+# Formation Inference (see data/formations.py)
+FORMATION_WINDOW = 60 # 360 snapshots of one team and phase per sliding window
+FORMATION_HOP = 30 # Snapshots between the starts of consecutive windows
+FORMATION_MIN_PLAYERS = 6 # Snapshots showing fewer outfield players of the team are skipped
+FORMATION_ITERATIONS = 10 # k-means iterations (each window starts from every template)
+FORMATION_TRACKING_STRIDE = 25 # Broadband tracking frames per frame used (one a second at 25 Hz)
+
+# Default Dataset (World Cup 2022)
+COMPETITION_ID = 43
+SEASON_ID = 106
+
+# Local Match Cache
+CACHE_DIR = os.environ.get('PITCH_REPLAY_CACHE', os.path.expanduser('~/.cache/pitch-replay'))
+CACHE_MAX_BYTES = 2 * 1024**3 # Evict least recently used entries past 2 GB
+OFFLINE_MODE = os.environ.get('PITCH_REPLAY_OFFLINE', '0') == '1' # Never touch the network
+
+# Data Backend: 'statsbombpy' (API / GitHub) or 'open-data' (local clone of
+# github.com/statsbomb/open-data, streamed from disk, see data/open_data.py)
+OPEN_DATA_DIR = os.environ.get('PITCH_REPLAY_OPEN_DATA')
+DATA_BACKEND = os.environ.get('PITCH_REPLAY_BACKEND', 'open-data' if OPEN_DATA_DIR else 'statsbombpy')
+
+# Background Loading (see data/prefetch.py)
+LOADER_WORKERS = 4 # Threads for network / cache reads
+PREFETCH_MATCHES = 2 # Following matches of the competition loaded in the background
+
+# Preprocessed Match Files (see data/match_file.py)
+MATCH_DIR = os.path.join(CACHE_DIR, 'matches')
+
+# Batch Ingestion (see ingest.py)
+INGEST_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+INGEST_MAX_MEMORY_MB = 4096 # Per-worker memory ceiling, 0 = unlimited
+
+# Broadband Tracking Ingestion (see data/tracking.py)
+TRACKING_CHUNK_FRAMES = 5000 # Frames parsed, converted and written per step
+PERIOD_START_MINUTES = (0, 45, 90, 105, 120) # Match clock at the start of each period
+
+# Headless Export (see export.py)
+EXPORT_SIZE = (12, 8) # Figure size in inches
+EXPORT_DPI = 100
+EXPORT_CHUNK_FRAMES = 250 # Frames per worker task (one video segment each)
+FFMPEG = os.environ.get('PITCH_REPLAY_FFMPEG', 'ffmpeg')
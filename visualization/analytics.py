@@ -1,111 +1,186 @@
 import numpy as np
-from scipy.stats import gaussian_kde
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import ListedColormap
+from visualization.heatmap import HeatmapEngine
+from visualization.network import find_links, link_segments
 from utils.theme import Colors
+from utils.config import (HEATMAP_BINS, HEATMAP_SIGMA, HEATMAP_WINDOW, PASS_LINK_RADIUS,
+                          QUALITY_HEATMAP_DIVISOR, QUALITY_LINK_SCALE)
 
 class AnalyticsVisualizer:
+    """
+    Defensive lines, heatmaps and pass networks of both teams. Every overlay
+    is one persistent artist per team, created here and only updated in
+    place (or hidden) afterwards; a quality change swaps each heatmap mesh
+    for one at the new grid size. The number of artists on the axes is
+    therefore the same on every frame, however long the replay runs.
+    """
+
+    # Team -> (line / link colour, heatmap colormap)
+    TEAM_STYLES = {'Home': (Colors.HOME_TEAM, 'Reds'), 'Away': (Colors.AWAY_TEAM, 'Blues')}
+
     def __init__(self, ax):
         self.ax = ax
-        self.defensive_lines = []
         self.show_analytics = False
-        
+        self.heatmap_window = 0
+        self.link_index = None
+        self.timeline = None
+        self.quality = 0
+        # Defensive line per team, moved with set_xdata
+        self.lines = {team: ax.axvline(x=0, color=color, linestyle='--', alpha=0.6, animated=True, visible=False)
+                      for team, (color, _) in self.TEAM_STYLES.items()}
+        # Heatmap engine + mesh per team
+        self.heatmaps = {team: (HeatmapEngine(self._heatmap_bins(), HEATMAP_SIGMA), None)
+                         for team in self.TEAM_STYLES}
+        self._build_heatmap_meshes()
+        # Pass links per team
+        self.networks = {}
+        for team, (color, _) in self.TEAM_STYLES.items():
+            links = LineCollection([], colors=color, alpha=0.15, linewidths=1, zorder=1,
+                                   animated=True, visible=False)
+            ax.add_collection(links, autolim=False)
+            self.networks[team] = links
+
     def toggle(self):
         self.show_analytics = not self.show_analytics
         if not self.show_analytics:
             self.clear()
-            
+
     def clear(self):
-        for artist in self.defensive_lines:
-            try: 
-                # Contours are collections
-                if hasattr(artist, 'collections'):
-                    for c in artist.collections:
-                        c.remove()
-                else:
-                    artist.remove()
-            except: pass
-        self.defensive_lines = []
-        
-    def draw_defensive_line(self, home_xy, away_xy, attacking_team="Home"):
+        """Hides every overlay (the artists stay on the axes for reuse)."""
+        for artist in self.get_artists():
+            artist.set_visible(False)
+
+    def get_artists(self):
+        """Dynamic artists to redraw each frame (see BlitManager)."""
+        return (list(self.lines.values()) + [mesh for _, mesh in self.heatmaps.values()]
+                + list(self.networks.values()))
+
+    def set_timeline(self, timeline):
+        """Reads defensive lines from a precomputed TacticalTimeline."""
+        self.timeline = timeline
+
+    def draw_defensive_line(self, home_xy, away_xy, attacking_team="Home", frame_idx=None, blend=None):
         """
         Draws a vertical line representing the last defender's position.
+        With a timeline, frame_idx (or blend, PlaybackTimeline.blend, for
+        interpolated positions) selects the precomputed line.
         """
         if not self.show_analytics: return
-        self.clear()
-        
-        # Calculate Home Defensive Line (Deepest player)
-        if home_xy:
-            hx = [p[0] for p in home_xy]
-            min_h = min(hx)
-            line1 = self.ax.axvline(x=min_h, color=Colors.HOME_TEAM, linestyle='--', alpha=0.6)
-            self.defensive_lines.append(line1)
-
-        if away_xy:
-            ax = [p[0] for p in away_xy]
-            max_a = max(ax)
-            line3 = self.ax.axvline(x=max_a, color=Colors.AWAY_TEAM, linestyle='--', alpha=0.6)
-            self.defensive_lines.append(line3)
+
+        # Home line = deepest home player, Away line = highest away player
+        for team, xy in (('Home', home_xy), ('Away', away_xy)):
+            line = self.lines[team]
+            if not len(xy):
+                line.set_visible(False)
+                continue
+            if self.timeline is not None and blend is not None:
+                x = self.timeline.line_between(team, blend)
+            elif self.timeline is not None and frame_idx is not None:
+                x = self.timeline.value('def_line_x', team, frame_idx)
+            else:
+                col = np.asarray(xy)[:, 0]
+                x = col.min() if team == 'Home' else col.max()
+            line.set_xdata([x, x])
+            line.set_visible(True)
+
+    def toggle_heatmap_window(self):
+        """Switches the heatmap between per-frame and rolling-window mode."""
+        self.set_heatmap_window(0 if self.heatmap_window else HEATMAP_WINDOW)
+
+    def set_heatmap_window(self, window):
+        """Frames in the rolling heatmap window (0 = current frame only)."""
+        self.heatmap_window = window
+        for engine, _ in self.heatmaps.values():
+            engine.set_window(window)
+
+    def set_quality(self, level):
+        """
+        Lower levels draw coarser heatmaps and fewer pass-network links
+        (QUALITY_* in config). A new heatmap grid size restarts any rolling
+        window.
+        """
+        if level == self.quality:
+            return
+        rebuild = QUALITY_HEATMAP_DIVISOR[level] != QUALITY_HEATMAP_DIVISOR[self.quality]
+        self.quality = level
+        if rebuild:
+            for engine, _ in self.heatmaps.values():
+                engine.set_resolution(self._heatmap_bins())
+            self._build_heatmap_meshes()
+
+    def reset_heatmap(self):
+        """Drops the rolling window history (e.g. after jumping in time)."""
+        for engine, _ in self.heatmaps.values():
+            engine.reset()
+
+    def _heatmap_bins(self):
+        divisor = QUALITY_HEATMAP_DIVISOR[self.quality]
+        return (max(HEATMAP_BINS[0] // divisor, 1), max(HEATMAP_BINS[1] // divisor, 1))
+
+    def _build_heatmap_meshes(self):
+        """(Re)creates each team's mesh at its engine's grid size, replacing the old one."""
+        for team, (engine, old) in self.heatmaps.items():
+            visible = old is not None and old.get_visible()
+            if old is not None:
+                old.remove()
+            # Near-zero density stays transparent so the pitch shows through.
+            # A QuadMesh is used rather than imshow: Agg resamples a full-pitch
+            # image on every draw, which costs several times more than the mesh.
+            # Alpha is baked into the colormap because an artist alpha would
+            # also override the transparent 'under' colour.
+            colors = plt.get_cmap(self.TEAM_STYLES[team][1])(np.linspace(0, 1, 256))
+            colors[:, 3] = 0.4
+            cmap = ListedColormap(colors).with_extremes(under=(0, 0, 0, 0))
+            x0, x1, y0, y1 = engine.extent
+            mesh = self.ax.pcolormesh(np.linspace(x0, x1, engine.nx + 1), np.linspace(y0, y1, engine.ny + 1),
+                                      np.zeros((engine.ny, engine.nx)), shading='flat',
+                                      cmap=cmap, vmin=0.05, vmax=1.0,
+                                      zorder=1, animated=True, visible=visible)
+            self.heatmaps[team] = (engine, mesh)
 
     def draw_heatmap(self, home_xy, away_xy):
-        """Draws a KDE heatmap for team positioning."""
+        """Updates the smoothed positional heatmap of each team in place."""
         if not self.show_analytics: return
-        
-        # Grid for KDE
-        x_grid, y_grid = np.mgrid[0:120:30j, 0:80:20j]
-        positions = np.vstack([x_grid.ravel(), y_grid.ravel()])
-        
-        # Home Heatmap
-        if len(home_xy) > 2:
-            try:
-                values = np.array(home_xy).T
-                kernel = gaussian_kde(values)
-                z = np.reshape(kernel(positions).T, x_grid.shape)
-                c1 = self.ax.contourf(x_grid, y_grid, z, levels=5, cmap='Reds', alpha=0.4, zorder=1)
-                self.defensive_lines.append(c1)
-            except: pass
-
-        # Away Heatmap
-        if len(away_xy) > 2:
-            try:
-                values = np.array(away_xy).T
-                kernel = gaussian_kde(values)
-                z = np.reshape(kernel(positions).T, x_grid.shape)
-                c2 = self.ax.contourf(x_grid, y_grid, z, levels=5, cmap='Blues', alpha=0.4, zorder=1)
-                self.defensive_lines.append(c2)
-            except: pass
+
+        for team, xy in (('Home', home_xy), ('Away', away_xy)):
+            engine, mesh = self.heatmaps[team]
+            if len(xy) > 2:
+                mesh.set_array(engine.update(xy))
+                mesh.set_visible(True)
+            else:
+                mesh.set_visible(False)
             
-    def draw_pass_network(self, home_xy, away_xy):
+    def set_link_index(self, link_index):
+        """Uses precomputed PassLinkIndex links instead of querying every frame."""
+        self.link_index = link_index
+
+    def draw_pass_network(self, home_xy, away_xy, frame_idx=None):
         """Draws a visual network connecting teammates (mocking pass links)."""
         if not self.show_analytics: return
-        
+
         # Home Network
-        self._draw_network_links(home_xy, Colors.HOME_TEAM)
+        self._draw_network_links('Home', home_xy, frame_idx)
         # Away Network
-        self._draw_network_links(away_xy, Colors.AWAY_TEAM)
-
-    def _draw_network_links(self, positions, color):
-        import matplotlib.patches as patches
-        if not positions: return
-        
-        pts = np.array(positions)
-        from scipy.spatial.distance import pdist, squareform
-        dists = squareform(pdist(pts))
-        
-        rows, cols = np.where((dists > 0) & (dists < 25))
-        seen = set()
-        
-        for r, c in zip(rows, cols):
-            if r >= c: continue
-            if (r, c) in seen: continue
-            seen.add((r, c))
-            
-            p1 = pts[r]
-            p2 = pts[c]
-            
-            # Bezier curve for visual flair
-            path = patches.Path(
-                [p1, (p1+p2)/2 + [2,2], p2], 
-                [patches.Path.MOVETO, patches.Path.CURVE3, patches.Path.CURVE3]
-            )
-            patch = patches.PathPatch(path, facecolor='none', edgecolor=color, alpha=0.15, linewidth=1, zorder=1)
-            self.ax.add_patch(patch)
-            self.defensive_lines.append(patch)
+        self._draw_network_links('Away', away_xy, frame_idx)
+
+    def _draw_network_links(self, team, positions, frame_idx):
+        links = self.networks[team]
+        scale = QUALITY_LINK_SCALE[self.quality]
+        if self.link_index is not None and frame_idx is not None:
+            pairs = self.link_index.links(frame_idx, team)
+            if scale < 1 and len(pairs):
+                xy = np.asarray(positions)
+                length = np.hypot(*(xy[pairs[:, 0]] - xy[pairs[:, 1]]).T)
+                pairs = pairs[length < PASS_LINK_RADIUS * scale]
+        elif scale > 0:
+            pairs = find_links(positions, PASS_LINK_RADIUS * scale)
+        else:
+            pairs = np.zeros((0, 2), dtype=np.int64)
+
+        if not len(pairs):
+            links.set_visible(False)
+            return
+        links.set_segments(link_segments(positions, pairs))
+        links.set_visible(True)
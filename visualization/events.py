@@ -1,94 +1,139 @@
 from utils.theme import Colors
 import matplotlib.patches as patches
+import numpy as np
 
 class EventVisualizer:
+    """
+    Pass and shot overlays. One pass arrow, one shot marker and one xG label
+    are created up front and repositioned / shown / hidden per event.
+    """
+
     def __init__(self, ax):
         self.ax = ax
-        self.current_overlays = []
+        self.events = None
+        self._pass_code = -1
+        self._shot_code = -1
+
+        self.pass_arrow = patches.FancyArrowPatch(
+            (0, 0), (0, 0),
+            arrowstyle='-|>',
+            mutation_scale=20,
+            color=Colors.HIGHLIGHT,
+            linewidth=2,
+            zorder=2,
+            alpha=0.8,
+            animated=True,
+            visible=False
+        )
+        self.ax.add_patch(self.pass_arrow)
+
+        # Using a star for shots
+        self.shot_marker = self.ax.scatter(
+            [], [],
+            s=300,
+            marker='*',
+            color=Colors.HIGHLIGHT,
+            edgecolors='white',
+            linewidth=2,
+            zorder=5, # On top of everything
+            animated=True,
+            visible=False
+        )
+
+        self.shot_label = self.ax.text(
+            0, 0, "",
+            color='white',
+            fontsize=10,
+            ha='center',
+            bbox=dict(facecolor='black', alpha=0.7, edgecolor=Colors.BORDER),
+            animated=True,
+            visible=False
+        )
+
+    def set_events(self, events):
+        """Binds an EventTable so show_event() can read typed columns by row."""
+        self.events = events
+        self._pass_code = events.code('type', 'Pass')
+        self._shot_code = events.code('type', 'Shot')
 
     def clear(self):
-        """Remove all current overlays."""
-        for artist in self.current_overlays:
-            try:
-                artist.remove()
-            except:
-                pass
-        self.current_overlays = []
+        """Hide all current overlays."""
+        self.pass_arrow.set_visible(False)
+        self.shot_marker.set_visible(False)
+        self.shot_label.set_visible(False)
+
+    def get_artists(self):
+        """Dynamic artists to redraw each frame (see BlitManager)."""
+        return [self.pass_arrow, self.shot_marker, self.shot_label]
+
+    def show_event(self, row):
+        """
+        Shows the overlay for row of the bound EventTable.
+        Reads only typed NumPy columns, no pandas indexing.
+        """
+        self.clear()
+        c = self.events.columns
+        event_type = c['type'][row]
+
+        if event_type == self._pass_code:
+            self._show_pass(c['x'][row], c['y'][row], c['end_x'][row], c['end_y'][row],
+                            failed=c['pass_outcome'][row] >= 0)
+        elif event_type == self._shot_code:
+            xg = c['xg'][row]
+            self._show_shot(c['x'][row], c['y'][row], 0.0 if np.isnan(xg) else xg)
 
     def draw_event(self, event_row):
         """
-        Draws the visualization for a specific event.
+        Draws the visualization for a specific event given as a row
+        (dict or Series with the processed events columns).
         """
         self.clear()
-        
+
         event_type = event_row['type']
-        
+
         if event_type == 'Pass':
             self._draw_pass(event_row)
         elif event_type == 'Shot':
             self._draw_shot(event_row)
-            
+
     def _draw_pass(self, event):
         """Draws a pass arrow."""
         start = event['location']
         end = event['pass_end_location']
-        
+
         if not isinstance(start, (list, tuple)) or not isinstance(end, (list, tuple)):
             return
 
-        # Determine color based on outcome (not strictly available in reduced columns yet, 
-        # but let's assume Teal for now or check if we have 'pass_outcome')
-        # Ideally we check event['pass_outcome'].NaN means complete.
-        
-        color = Colors.HIGHLIGHT # Cyan
-        if 'pass_outcome' in event and isinstance(event['pass_outcome'], str):
-             # Failures in Red
-             color = Colors.ACCENT_RED
-             
-        arrow = patches.FancyArrowPatch(
-            (start[0], start[1]), 
-            (end[0], end[1]),
-            arrowstyle='-|>',
-            mutation_scale=20,
-            color=color,
-            linewidth=2,
-            zorder=2,
-            alpha=0.8
-        )
-        
-        self.ax.add_patch(arrow)
-        self.current_overlays.append(arrow)
+        # A missing outcome (NaN/None) means the pass was completed
+        failed = 'pass_outcome' in event and isinstance(event['pass_outcome'], str)
+        self._show_pass(start[0], start[1], end[0], end[1], failed)
 
     def _draw_shot(self, event):
         """Draws a shot marker (Star or Circle)."""
         loc = event['location']
         if not isinstance(loc, (list, tuple)):
             return
-            
-        # Draw a "Goal" text or just a marker
-        # Using a star for shots
-        marker = self.ax.scatter(
-            loc[0], loc[1],
-            s=300,
-            marker='*',
-            color=Colors.HIGHLIGHT,
-            edgecolors='white',
-            linewidth=2,
-            zorder=5 # On top of everything
-        )
-        self.current_overlays.append(marker)
-        
-        # Add xG text if available (mock logic for now if column missing)
+
         xg = 0.0
         if 'shot_statsbomb_xg' in event:
              xg = event['shot_statsbomb_xg']
-             
-        text = self.ax.text(
-            loc[0], loc[1] + 2,
-            f"Shot\nxG: {xg:.2f}",
-            color='white',
-            fontsize=10,
-            ha='center',
-            bbox=dict(facecolor='black', alpha=0.7, edgecolor=Colors.BORDER)
-        )
-        self.current_overlays.append(text)
+        self._show_shot(loc[0], loc[1], xg)
+
+    def _show_pass(self, x, y, end_x, end_y, failed):
+        if np.isnan(x) or np.isnan(end_x):
+            return
+        # Failures in Red
+        color = Colors.ACCENT_RED if failed else Colors.HIGHLIGHT
+        self.pass_arrow.set_positions((x, y), (end_x, end_y))
+        self.pass_arrow.set_color(color)
+        self.pass_arrow.set_visible(True)
+
+    def _show_shot(self, x, y, xg):
+        if np.isnan(x):
+            return
+        self.shot_marker.set_offsets([[x, y]])
+        self.shot_marker.set_visible(True)
+
+        self.shot_label.set_position((x, y + 2))
+        self.shot_label.set_text(f"Shot\nxG: {xg:.2f}")
+        self.shot_label.set_visible(True)
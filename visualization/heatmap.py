@@ -0,0 +1,82 @@
+from collections import deque
+import numpy as np
+from utils.config import PITCH_LENGTH, PITCH_WIDTH
+
+class HeatmapEngine:
+    """
+    Positional density grid for one team.
+
+    Positions are binned onto a fixed pitch grid and smoothed with a
+    precomputed separable Gaussian (one small matrix per axis), which replaces
+    fitting a gaussian_kde every frame. In window mode the raw counts of the
+    last `window` frames are kept as a running sum: each new frame adds its
+    bins and the frame leaving the window subtracts its own, so the cost per
+    update does not depend on the window length.
+    """
+
+    def __init__(self, bins=(60, 40), sigma=8.0, window=0):
+        self.window = window
+        self._history = deque()
+        self.set_resolution(bins, sigma)
+
+    def set_resolution(self, bins, sigma=None):
+        """Rebuilds the grid and kernel; resets any window history."""
+        if sigma is not None:
+            self.sigma = sigma
+        self.nx, self.ny = bins
+        self.cell_x = PITCH_LENGTH / self.nx
+        self.cell_y = PITCH_WIDTH / self.ny
+        self._kx = self._kernel_matrix(self.nx, self.sigma / self.cell_x)
+        self._ky = self._kernel_matrix(self.ny, self.sigma / self.cell_y)
+        self.reset()
+
+    @staticmethod
+    def _kernel_matrix(n, sigma_cells):
+        """(n, n) matrix applying a 1D Gaussian blur along one grid axis."""
+        idx = np.arange(n)
+        dist = idx[:, None] - idx[None, :]
+        return np.exp(-0.5 * (dist / sigma_cells) ** 2).astype(np.float32)
+
+    @property
+    def extent(self):
+        return (0, PITCH_LENGTH, 0, PITCH_WIDTH)
+
+    def set_window(self, window):
+        """0 = per-frame density, n > 0 = rolling sum over the last n frames."""
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._counts = np.zeros(self.nx * self.ny, dtype=np.float32)
+        self._history.clear()
+
+    def _bin(self, xy):
+        """Flat grid index (row-major, y then x) of every position."""
+        xy = np.asarray(xy, dtype=np.float32)
+        ix = np.clip((xy[:, 0] / self.cell_x).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip((xy[:, 1] / self.cell_y).astype(np.int64), 0, self.ny - 1)
+        return iy * self.nx + ix
+
+    def update(self, xy):
+        """
+        Adds one frame of positions and returns the smoothed density as a
+        (ny, nx) array scaled to [0, 1].
+        """
+        size = self.nx * self.ny
+        idx = self._bin(xy) if len(xy) else np.zeros(0, dtype=np.int64)
+        frame_counts = np.bincount(idx, minlength=size).astype(np.float32)
+
+        if self.window > 0:
+            self._counts += frame_counts
+            self._history.append(idx)
+            while len(self._history) > self.window:
+                self._counts -= np.bincount(self._history.popleft(), minlength=size)
+            counts = self._counts
+        else:
+            counts = frame_counts
+
+        density = self._ky @ counts.reshape(self.ny, self.nx) @ self._kx.T
+        peak = density.max()
+        if peak > 0:
+            density /= peak
+        return density
@@ -0,0 +1,78 @@
+import numpy as np
+from utils.config import PASS_LINK_RADIUS
+
+# Quadratic Bezier sampled at fixed parameters; every link bends by the same offset
+_CURVE_T = np.linspace(0.0, 1.0, 8)
+_CURVE_BEND = np.array([2.0, 2.0])
+
+def find_links(xy, radius=PASS_LINK_RADIUS):
+    """(k, 2) index pairs i < j of players closer than radius (KD-tree query)."""
+    if len(xy) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    from scipy.spatial import cKDTree
+    return cKDTree(xy).query_pairs(radius, output_type='ndarray')
+
+def link_segments(xy, pairs):
+    """
+    Curved link polylines for a LineCollection: (k, len(_CURVE_T), 2).
+    Built for all pairs at once from the endpoints and their bent midpoint.
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    p1 = xy[pairs[:, 0]][:, None, :]
+    p2 = xy[pairs[:, 1]][:, None, :]
+    ctrl = (p1 + p2) / 2 + _CURVE_BEND
+    t = _CURVE_T[None, :, None]
+    return (1 - t)**2 * p1 + 2 * (1 - t) * t * ctrl + t**2 * p2
+
+class PassLinkIndex:
+    """
+    Links for every frame of a FrameStore, computed up front (batch mode).
+
+    Pairs are stored CSR-style per team: rows pairs[team][offsets[team][f]:offsets[team][f+1]]
+    are the (i, j) player indices within frame f's home or away slice.
+    """
+
+    CHUNK_FRAMES = 8192 # Bounds the (frames, k, k) distance tensor
+
+    def __init__(self, pairs, offsets):
+        self.pairs = pairs      # team -> (n_links, 2) int16
+        self.offsets = offsets  # team -> (n_frames + 1,) int64
+
+    @classmethod
+    def build(cls, store, radius=PASS_LINK_RADIUS):
+        pairs = {}
+        offsets = {}
+        for team in ('Home', 'Away'):
+            team_pairs, counts = [], []
+            for lo in range(0, len(store), cls.CHUNK_FRAMES):
+                pts, _, _ = store.padded_positions(team, lo, lo + cls.CHUNK_FRAMES)
+                p, c = cls._chunk_links(pts, radius)
+                team_pairs.append(p)
+                counts.append(c)
+
+            counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+            offsets[team] = np.zeros(len(store) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[team][1:])
+            pairs[team] = (np.concatenate(team_pairs) if team_pairs
+                           else np.zeros((0, 2), dtype=np.int16))
+        return cls(pairs, offsets)
+
+    @staticmethod
+    def _chunk_links(pts, radius):
+        """All links of a block of frames at once from padded (frames, k, 2) positions."""
+        n_frames, k = pts.shape[:2]
+        if k < 2:
+            return np.zeros((0, 2), dtype=np.int16), np.zeros(n_frames, dtype=np.int64)
+
+        diff = pts[:, :, None, :] - pts[:, None, :, :]
+        dist = np.sqrt((diff**2).sum(axis=-1))
+        # NaN padding compares False, so only real player pairs survive
+        close = (dist < radius) & np.triu(np.ones((k, k), dtype=bool), 1)
+
+        f, i, j = np.nonzero(close)
+        pairs = np.stack([i, j], axis=1).astype(np.int16)
+        return pairs, np.bincount(f, minlength=n_frames)
+
+    def links(self, frame_idx, team):
+        lo, hi = self.offsets[team][frame_idx], self.offsets[team][frame_idx + 1]
+        return self.pairs[team][lo:hi]
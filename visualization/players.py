@@ -1,6 +1,9 @@
 import matplotlib.pyplot as plt
 from matplotlib.patches import Polygon
-from scipy.spatial import ConvexHull
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
 import numpy as np
 from utils.theme import Colors
 
@@ -10,91 +13,145 @@ class PlayerVisualizer:
         self.home_dots = None
         self.away_dots = None
         self.ball_dot = None
-        self.home_text = []
-        self.away_text = []
+        self.home_labels = None
+        self.away_labels = None
+        self._label_paths = []
         self.home_hull = None
         self.away_hull = None
+        self.timeline = None
+        self.show_labels = True
         
     def init_players(self):
-        """Initializes the scatter plots and text annotations for players."""
+        """Initializes the scatter plots, hulls and pooled text labels for players."""
         # Home team (Cyan)
         self.home_dots = self.ax.scatter([], [], c=Colors.HOME_TEAM, edgecolors=Colors.HOME_TEAM, 
-                                       s=250, zorder=3, label='Home')
+                                       s=250, zorder=3, label='Home', animated=True)
         
         # Away team (White)
         self.away_dots = self.ax.scatter([], [], c=Colors.AWAY_TEAM, edgecolors=Colors.AWAY_TEAM, 
-                                       s=250, zorder=3, label='Away')
+                                       s=250, zorder=3, label='Away', animated=True)
         
         # Ball (White)
         self.ball_dot = self.ax.scatter([], [], c=Colors.BALL, edgecolors='black', 
-                                      s=100, zorder=4, label='Ball')
+                                      s=100, zorder=4, label='Ball', animated=True)
+
+        # Team shapes: one persistent polygon each, reshaped with set_xy
+        self.home_hull = self._create_hull(Colors.HOME_TEAM)
+        self.away_hull = self._create_hull(Colors.AWAY_TEAM)
+
+        # Label pools: one collection per team holding pre-built number glyphs,
+        # so all labels of a team draw in a single call and only move per frame
+        self.home_labels = self._create_labels(Colors.HOME_TEXT)
+        self.away_labels = self._create_labels(Colors.AWAY_TEXT)
         
         return self.home_dots, self.away_dots, self.ball_dot
 
-    def _update_hull(self, points, color, current_hull_patch):
+    def _create_hull(self, color):
+        poly = Polygon(np.zeros((3, 2)), closed=True, facecolor=color, alpha=0.1, edgecolor=color,
+                       linestyle='--', linewidth=1.5, zorder=1, animated=True, visible=False)
+        self.ax.add_patch(poly)
+        return poly
+
+    def _create_labels(self, color):
+        # Glyph paths are in points, scaled with the figure dpi; offsets are in data units
+        points_to_pixels = Affine2D().scale(1 / 72) + self.ax.figure.dpi_scale_trans
+        labels = PathCollection([], offsets=np.zeros((0, 2)), offset_transform=self.ax.transData,
+                                transform=points_to_pixels, facecolors=color, edgecolors='none',
+                                zorder=4, animated=True)
+        self.ax.add_collection(labels, autolim=False)
+        return labels
+
+    def _get_label_paths(self, count):
         """
-        Draws/Updates a convex hull around the provided points.
+        Centered glyph paths for labels 1..count, built once and reused.
+        360 frames carry no jersey numbers without a lineup join,
+        so each label shows its index within the team as a placeholder.
         """
-        if current_hull_patch:
-            try: current_hull_patch.remove()
-            except: pass
-            current_hull_patch = None
+        prop = FontProperties(size=8, weight='bold')
+        for i in range(len(self._label_paths), count):
+            path = TextPath((0, 0), str(i+1), prop=prop)
+            ext = path.get_extents()
+            center = Affine2D().translate(-(ext.x0 + ext.x1) / 2, -(ext.y0 + ext.y1) / 2)
+            self._label_paths.append(path.transformed(center))
+        return self._label_paths[:count]
 
-        if len(points) < 3: return None
+    def set_labels_visible(self, visible):
+        """Number labels are the first layer dropped when rendering falls behind."""
+        self.show_labels = visible
+        self.home_labels.set_visible(visible)
+        self.away_labels.set_visible(visible)
+
+    def set_timeline(self, timeline):
+        """Uses precomputed TacticalTimeline hulls instead of computing them per frame."""
+        self.timeline = timeline
+
+    def _update_hull(self, points, hull_patch, team=None, frame_idx=None, blend=None):
+        """
+        Reshapes the team's hull polygon around the provided points.
+        Hidden when there are too few points to form a hull.
+        """
+        if self.timeline is not None and (frame_idx is not None or blend is not None):
+            if blend is not None:
+                vertices = self.timeline.hull_between(team, blend)
+            else:
+                vertices = self.timeline.hull(frame_idx, team)
+            if len(vertices):
+                hull_patch.set_xy(vertices)
+            hull_patch.set_visible(len(vertices) > 0)
+            return hull_patch
 
+        if len(points) < 3:
+            hull_patch.set_visible(False)
+            return hull_patch
+
+        # Only needed without a timeline; scipy.spatial is slow to import
+        from scipy.spatial import ConvexHull
         try:
             hull = ConvexHull(points)
-            hull_points = points[hull.vertices]
-            poly = Polygon(hull_points, facecolor=color, alpha=0.1, edgecolor=color, linestyle='--', linewidth=1.5, zorder=1)
-            self.ax.add_patch(poly)
-            return poly
         except Exception:
-            return None
+            # Degenerate input (e.g. collinear players)
+            hull_patch.set_visible(False)
+            return hull_patch
+
+        hull_patch.set_xy(points[hull.vertices])
+        hull_patch.set_visible(True)
+        return hull_patch
 
-    def _update_text(self, points, text_list, color):
+    def _update_labels(self, points, labels):
         """
-        Updates text annotations (jersey numbers) for players.
-        points: list of [x, y]
-        text_list: list of existing text objects
-        color: text color
+        Moves a team's pooled number labels onto its players.
+        points: (n, 2) array or list of [x, y]
         """
-        # Clear old text
-        for txt in text_list:
-            try: txt.remove()
-            except: pass
-        text_list.clear()
-        
-        # Add new text
-        # For Phase 3, we don't have real jersey numbers yet in the 360 dataframe without joining
-        # with lineup data. For visual effect, we will use a placeholder or index.
-        # Ideally, we should merge with lineup, but for now let's just show a dot.
-        # Wait, the prompt asked for "Player Numbers". 
-        # Since 360 frames generally don't have jersey number directly, 
-        # I'll just skip adding text for now to avoid cluttering with wrong numbers,
-        # OR I can add a dummy number '?' or just keep the dot larger.
-        # Actually, let's try to put a small index to show distinctness.
-        
-        for i, point in enumerate(points):
-            # Just a visual placeholder logic for number
-            # In a real app, we join on player_id -> jersey_number
-            txt = self.ax.text(point[0], point[1], str(i+1), color=color, 
-                               fontsize=8, ha='center', va='center', fontweight='bold', zorder=4)
-            text_list.append(txt)
-            
-        return text_list
+        # Paths and offsets are paired one-to-one, so trim the glyphs to the player count
+        labels.set_paths(self._get_label_paths(len(points)))
+        labels.set_offsets(points)
+        return labels
 
-    def update(self, home_xy, away_xy):
+    def update(self, home_xy, away_xy, frame_idx=None, blend=None):
         """
         Updates player positions.
+        frame_idx selects precomputed hulls when a timeline is set; for
+        interpolated positions blend (PlaybackTimeline.blend) does instead.
         """
-        if home_xy:
+        if len(home_xy):
             self.home_dots.set_offsets(home_xy)
-            self.home_hull = self._update_hull(np.array(home_xy), Colors.HOME_TEAM, self.home_hull)
-            self.home_text = self._update_text(home_xy, self.home_text, Colors.HOME_TEXT)
+            self.home_hull = self._update_hull(np.asarray(home_xy), self.home_hull, 'Home', frame_idx, blend)
+            if self.show_labels:
+                self.home_labels = self._update_labels(home_xy, self.home_labels)
             
-        if away_xy:
+        if len(away_xy):
             self.away_dots.set_offsets(away_xy)
-            self.away_hull = self._update_hull(np.array(away_xy), Colors.AWAY_TEAM, self.away_hull)
-            self.away_text = self._update_text(away_xy, self.away_text, Colors.AWAY_TEXT)
+            self.away_hull = self._update_hull(np.asarray(away_xy), self.away_hull, 'Away', frame_idx, blend)
+            if self.show_labels:
+                self.away_labels = self._update_labels(away_xy, self.away_labels)
 
         return self.home_dots, self.away_dots
+
+    def set_ball(self, xy):
+        """Ball position, or None to hide it (360 frames have no ball)."""
+        self.ball_dot.set_offsets(np.zeros((0, 2)) if xy is None else np.reshape(xy, (1, 2)))
+
+    def get_artists(self):
+        """Dynamic artists to redraw each frame (see BlitManager)."""
+        return [self.home_hull, self.away_hull, self.home_dots, self.away_dots, self.ball_dot,
+                self.home_labels, self.away_labels]
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+from utils.theme import Colors
+from utils.config import PROFILER_WINDOW, PROFILER_TRACE_EVENTS, HUD_REFRESH_FRAMES
+
+class _NullStage:
+    """Stage of a disabled profiler: a shared no-op context manager."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+class FrameProfiler:
+    """
+    Timings of the named stages of a frame (players, events, each analytics
+    layer, blit, full canvas draws, screen switches, ...):
+
+        with profiler.stage('players'):
+            ...
+
+    Each stage keeps its last PROFILER_WINDOW durations in a ring buffer,
+    from which percentiles() gives rolling p50 / p95 / p99. Every timed
+    stage is also kept as a trace event (up to PROFILER_TRACE_EVENTS) for
+    export() as JSON or as a Chrome trace (chrome://tracing, Perfetto).
+
+    While disabled, stage() returns one shared no-op context manager and
+    nothing is recorded, so instrumented code costs a method call per stage.
+    """
+
+    def __init__(self, enabled=False, window=PROFILER_WINDOW, trace_events=PROFILER_TRACE_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self.origin = time.perf_counter() # Trace timestamps are relative to this
+        self._stages = {}   # name -> reusable _Stage
+        self._samples = {}  # name -> [ring buffer of seconds, samples recorded]
+        self._trace = deque(maxlen=trace_events) # (name, start, end)
+
+    def stage(self, name):
+        """Context manager timing one run of a stage."""
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+        return stage
+
+    def record(self, name, start, end):
+        """Adds a stage run measured elsewhere (perf_counter seconds)."""
+        if not self.enabled:
+            return
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = [np.zeros(self.window), 0]
+        samples[0][samples[1] % self.window] = end - start
+        samples[1] += 1
+        self._trace.append((name, start, end))
+
+    def attach(self, canvas):
+        """Times every full draw of a canvas as the 'draw' stage."""
+        draw = canvas.draw
+        def timed_draw(*args, **kwargs):
+            with self.stage('draw'):
+                return draw(*args, **kwargs)
+        canvas.draw = timed_draw
+
+    def reset(self):
+        self._samples.clear()
+        self._trace.clear()
+
+    # --- Statistics ---
+    def percentiles(self, quantiles=(50, 95, 99)):
+        """Stage name -> (milliseconds at each quantile..., samples in the window), in first-run order."""
+        out = {}
+        for name, (ring, count) in self._samples.items():
+            values = ring[:min(count, self.window)] * 1000
+            out[name] = tuple(np.percentile(values, quantiles)) + (len(values),)
+        return out
+
+    def summary(self):
+        return {name: {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'samples': n}
+                for name, (p50, p95, p99, n) in self.percentiles().items()}
+
+    # --- Export ---
+    def chrome_trace(self):
+        """The trace in Chrome's Trace Event Format (complete 'X' events, microseconds)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{'name': name, 'cat': 'frame', 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6}
+                  for name, start, end in self._trace]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path, fmt='chrome'):
+        """Writes the trace: fmt 'chrome' (Trace Event Format) or 'json' (stage percentiles + events)."""
+        if fmt == 'chrome':
+            data = self.chrome_trace()
+        elif fmt == 'json':
+            data = {'stages': self.summary(),
+                    'events': [{'name': name, 'start_ms': (start - self.origin) * 1000,
+                                'ms': (end - start) * 1000} for name, start, end in self._trace]}
+        else:
+            raise ValueError(f"Unknown trace format: {fmt}")
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        print(f"Wrote {len(self._trace)} trace events to {path}")
+
+class ProfilerHUD:
+    """
+    Overlay on the match axes with the rolling p50 / p95 / p99 of each
+    profiler stage (the profiler must be enabled for it to show anything).
+    The text is animated, blitted with the frame, and only re-formatted
+    every HUD_REFRESH_FRAMES frames.
+    """
+
+    def __init__(self, ax, profiler):
+        self.profiler = profiler
+        self.visible = False
+        self._frames = 0
+        self.text = ax.text(0.01, 0.99, "", transform=ax.transAxes, ha='left', va='top',
+                            family='monospace', fontsize=8, color=Colors.TEXT_COLOR, zorder=10,
+                            bbox={'facecolor': Colors.BACKGROUND, 'alpha': 0.75, 'edgecolor': Colors.BORDER},
+                            animated=True, visible=False)
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.text.set_visible(self.visible)
+        self._frames = 0
+
+    def update(self):
+        """Returns the HUD artists of this frame (none while hidden)."""
+        if not self.visible:
+            return []
+        if self._frames % HUD_REFRESH_FRAMES == 0:
+            lines = [f"{'stage':15s} {'p50':>6s} {'p95':>6s} {'p99':>6s} ms"]
+            for name, (p50, p95, p99, _) in self.profiler.percentiles().items():
+                lines.append(f"{name:15s} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+            self.text.set_text("\n".join(lines))
+        self._frames += 1
+        return [self.text]
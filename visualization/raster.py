@@ -0,0 +1,421 @@
+import numpy as np
+from matplotlib.colors import to_rgb
+from matplotlib.font_manager import FontProperties, findfont
+from PIL import Image, ImageDraw, ImageFont
+from utils.theme import Colors
+
+def _disc(radius):
+    """Anti-aliased disc coverage as (dy, dx, alpha) offsets around its center."""
+    r = int(np.ceil(radius))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    alpha = np.clip(radius + 0.5 - np.hypot(dx, dy), 0.0, 1.0)
+    keep = alpha > 0
+    return dy[keep], dx[keep], alpha[keep].astype(np.float32)
+
+def _fill_polygon(polygon, width, height):
+    """
+    Even-odd scanline fill of a pixel-space polygon.
+    Returns (x0, y0, mask) with mask covering the polygon's bounding box,
+    or None if the polygon is off-canvas.
+    """
+    x0 = max(int(np.floor(polygon[:, 0].min())), 0)
+    x1 = min(int(np.ceil(polygon[:, 0].max())) + 1, width)
+    y0 = max(int(np.floor(polygon[:, 1].min())), 0)
+    y1 = min(int(np.ceil(polygon[:, 1].max())) + 1, height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    # Crossing x of every edge with every pixel-center row
+    p, q = polygon, np.roll(polygon, -1, axis=0)
+    rows = np.arange(y0, y1, dtype=np.float32)[:, None] + 0.5
+    lo, hi = np.minimum(p[:, 1], q[:, 1]), np.maximum(p[:, 1], q[:, 1])
+    crosses = (rows >= lo) & (rows < hi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (rows - p[:, 1]) / (q[:, 1] - p[:, 1])
+    xs = np.where(crosses, p[:, 0] + t * (q[:, 0] - p[:, 0]), np.inf)
+    xs.sort(axis=1)
+
+    # Inside between crossings (0, 1), (2, 3), ...
+    cols = np.arange(x0, x1, dtype=np.float32)[None, :] + 0.5
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    for k in range(0, xs.shape[1] - 1, 2):
+        mask |= (cols >= xs[:, k:k + 1]) & (cols < xs[:, k + 1:k + 2])
+    return x0, y0, mask
+
+class RasterCanvas:
+    """
+    uint8 RGBA frame buffer composited with NumPy.
+
+    The static pitch is rasterised once by matplotlib (from_axes); every frame
+    starts from a copy of it and raster layers stamp their shapes on top in
+    zorder, like BlitManager does with matplotlib artists.
+    """
+
+    def __init__(self, background, scale, offset, dpi):
+        self.background = background    # (H, W, 4) uint8
+        self.buffer = background.copy()
+        self.height, self.width = background.shape[:2]
+        self.scale = scale              # data -> pixel (col, row)
+        self.offset = offset
+        self.dpi = dpi
+        self._luts = {}
+
+    @classmethod
+    def from_axes(cls, ax):
+        """Rasterises ax's figure (pitch only: animated artists are skipped)."""
+        canvas = ax.figure.canvas
+        canvas.draw()
+        background = np.array(canvas.buffer_rgba(), dtype=np.uint8)
+        height = background.shape[0]
+        # transData is affine on a linear axes; rows count downwards
+        (px0, py0), (px1, py1) = ax.transData.transform([(0.0, 0.0), (1.0, 1.0)])
+        scale = np.array([px1 - px0, -(py1 - py0)], dtype=np.float32)
+        offset = np.array([px0, height - py0], dtype=np.float32)
+        return cls(background, scale, offset, ax.figure.dpi)
+
+    def to_pixels(self, xy):
+        return np.asarray(xy, dtype=np.float32).reshape(-1, 2) * self.scale + self.offset
+
+    def points_to_pixels(self, points):
+        return points * self.dpi / 72.0
+
+    def render(self, artists):
+        """Composites one frame; returns the (H, W, 4) buffer (reused between frames)."""
+        np.copyto(self.buffer, self.background)
+        for artist in sorted(artists, key=lambda a: a.get_zorder()):
+            if artist.get_visible():
+                artist.draw(self)
+        return self.buffer
+
+    # --- Stamping ---
+    def stamp(self, centers, dy, dx, alpha, color, owner=None):
+        """
+        Blends a sprite (coverage offsets dy, dx, alpha) at every center.
+        With owner, sprite pixel k belongs to centers[owner[k]] instead.
+        """
+        centers = np.rint(centers).astype(np.int64)
+        if owner is None:
+            ys = (centers[:, 1, None] + dy).ravel()
+            xs = (centers[:, 0, None] + dx).ravel()
+            a = np.broadcast_to(alpha, (len(centers), len(alpha))).ravel()
+        else:
+            ys = centers[owner, 1] + dy
+            xs = centers[owner, 0] + dx
+            a = alpha
+        inside = (ys >= 0) & (ys < self.height) & (xs >= 0) & (xs < self.width)
+        ys, xs, a = ys[inside], xs[inside], a[inside][:, None]
+        pixels = self.buffer[ys, xs, :3].astype(np.float32)
+        self.buffer[ys, xs, :3] = (pixels + (color - pixels) * a).astype(np.uint8)
+
+    def _blend_lut(self, color, alpha):
+        """(3, 256) table: channel value -> value blended with color at alpha."""
+        key = (tuple(color), alpha)
+        if key not in self._luts:
+            v = np.arange(256, dtype=np.float32)[None, :]
+            self._luts[key] = (v + (np.asarray(color)[:, None] - v) * alpha).astype(np.uint8)
+        return self._luts[key]
+
+    def blend_mask(self, x0, y0, mask, color, alpha):
+        """
+        Blends color over the mask-covered pixels of the box at (x0, y0).
+        Boolean masks (polygon fills) use a per-channel lookup table, which
+        avoids float math over large areas.
+        """
+        h, w = mask.shape
+        region = self.buffer[y0:y0 + h, x0:x0 + w, :3]
+        if mask.dtype == bool:
+            lut = self._blend_lut(color, alpha)
+            for c in range(3):
+                channel = region[..., c]
+                np.copyto(channel, lut[c][channel], where=mask)
+        else:
+            a = (mask * alpha)[..., None]
+            region[:] = (region + (color - region) * a).astype(np.uint8)
+
+    def fill_polygon(self, polygon, color, alpha=1.0):
+        filled = _fill_polygon(polygon, self.width, self.height)
+        if filled is not None:
+            self.blend_mask(*filled, color, alpha)
+
+    def draw_line(self, p0, p1, width, color, alpha=1.0):
+        """Thick anti-aliased segment: distance-to-segment coverage over its bounding box."""
+        r = width / 2
+        x0 = max(int(np.floor(min(p0[0], p1[0]) - r)), 0)
+        x1 = min(int(np.ceil(max(p0[0], p1[0]) + r)) + 1, self.width)
+        y0 = max(int(np.floor(min(p0[1], p1[1]) - r)), 0)
+        y1 = min(int(np.ceil(max(p0[1], p1[1]) + r)) + 1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        ys, xs = np.mgrid[y0:y1, x0:x1].astype(np.float32)
+        d = p1 - p0
+        t = np.clip(((xs - p0[0]) * d[0] + (ys - p0[1]) * d[1]) / max(float(d @ d), 1e-6), 0.0, 1.0)
+        dist = np.hypot(xs - (p0[0] + t * d[0]), ys - (p0[1] + t * d[1]))
+        self.blend_mask(x0, y0, np.clip(r + 0.5 - dist, 0.0, 1.0), color, alpha)
+
+    def paste(self, sprite, x, y):
+        """Alpha-composites an RGBA uint8 sprite with its top-left corner at (x, y)."""
+        h, w = sprite.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        src = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+        a = src[..., 3:4].astype(np.float32) / 255.0
+        region = self.buffer[y0:y1, x0:x1, :3]
+        region[:] = (region + (src[..., :3] - region.astype(np.float32)) * a).astype(np.uint8)
+
+class RasterArtist:
+    """Minimal artist protocol used by RasterCanvas.render: zorder, visibility, draw."""
+
+    def __init__(self, zorder, draw):
+        self.zorder = zorder
+        self.visible = False
+        self._draw = draw
+
+    def get_zorder(self):
+        return self.zorder
+
+    def get_visible(self):
+        return self.visible
+
+    def set_visible(self, visible):
+        self.visible = visible
+
+    def draw(self, canvas):
+        self._draw(canvas)
+
+def _rgb(color):
+    return np.array(to_rgb(color), dtype=np.float32) * 255
+
+def _font(size_px, bold=True):
+    path = findfont(FontProperties(weight='bold' if bold else 'normal'))
+    return ImageFont.truetype(path, max(int(round(size_px)), 1))
+
+def _glyph(text, font):
+    """Centered coverage offsets (dy, dx, alpha) of a text string."""
+    left, top, right, bottom = (int(np.floor(v)) for v in font.getbbox(text))
+    image = Image.new('L', (right - left + 2, bottom - top + 2), 0)
+    ImageDraw.Draw(image).text((1 - left, 1 - top), text, fill=255, font=font)
+    mask = np.asarray(image, dtype=np.float32) / 255.0
+    dy, dx = np.nonzero(mask > 0)
+    return dy - mask.shape[0] // 2, dx - mask.shape[1] // 2, mask[dy, dx]
+
+class RasterPlayerVisualizer:
+    """
+    Raster counterpart of PlayerVisualizer (same init_players / set_timeline /
+    update / set_ball / get_artists interface) drawing into a RasterCanvas.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.timeline = None
+        self.show_labels = True
+        self._labels = {}
+
+    def init_players(self):
+        c = self.canvas
+        # Sizes follow PlayerVisualizer: scatter s is the marker area in points^2
+        self._dot = _disc(c.points_to_pixels(np.sqrt(250) / 2))
+        self._ball = _disc(c.points_to_pixels(np.sqrt(100) / 2))
+        self._font = _font(c.points_to_pixels(8))
+        self._glyphs = []
+
+        self.teams = {}
+        for team, color, text in (('Home', Colors.HOME_TEAM, Colors.HOME_TEXT),
+                                  ('Away', Colors.AWAY_TEAM, Colors.AWAY_TEXT)):
+            state = {'xy': np.zeros((0, 2), dtype=np.float32), 'hull': None,
+                     'color': _rgb(color), 'text': _rgb(text)}
+            state['hull_artist'] = RasterArtist(1, lambda canvas, s=state: self._draw_hull(canvas, s))
+            state['dots'] = RasterArtist(3, lambda canvas, s=state: self._draw_dots(canvas, s))
+            state['labels'] = RasterArtist(4, lambda canvas, s=state: self._draw_labels(canvas, s))
+            self.teams[team] = state
+        # Only tracking data has a ball position (see set_ball)
+        self._ball_xy = None
+        self._ball_color = _rgb(Colors.BALL)
+        self.ball = RasterArtist(4, lambda canvas: canvas.stamp(self._ball_xy, *self._ball, self._ball_color))
+
+    def set_labels_visible(self, visible):
+        self.show_labels = visible
+        for state in self.teams.values():
+            state['labels'].set_visible(visible)
+
+    def set_timeline(self, timeline):
+        """Uses precomputed TacticalTimeline hulls instead of computing them per frame."""
+        self.timeline = timeline
+
+    def _hull(self, xy, team, frame_idx, blend):
+        if self.timeline is not None and blend is not None:
+            vertices = self.timeline.hull_between(team, blend)
+            return vertices if len(vertices) else None
+        if self.timeline is not None and frame_idx is not None:
+            vertices = self.timeline.hull(frame_idx, team)
+            return vertices if len(vertices) else None
+        if len(xy) < 3:
+            return None
+        from scipy.spatial import ConvexHull
+        try:
+            return xy[ConvexHull(xy).vertices]
+        except Exception:
+            return None
+
+    def update(self, home_xy, away_xy, frame_idx=None, blend=None):
+        for team, xy in (('Home', home_xy), ('Away', away_xy)):
+            state = self.teams[team]
+            if not len(xy):
+                continue
+            xy = np.asarray(xy, dtype=np.float32)
+            state['xy'] = self.canvas.to_pixels(xy)
+            hull = self._hull(xy, team, frame_idx, blend)
+            state['hull'] = None if hull is None else self.canvas.to_pixels(hull)
+            state['hull_artist'].set_visible(hull is not None)
+            state['dots'].set_visible(True)
+            state['labels'].set_visible(self.show_labels)
+
+    def set_ball(self, xy):
+        """Ball position, or None to hide it."""
+        if xy is not None:
+            self._ball_xy = self.canvas.to_pixels(np.asarray(xy, dtype=np.float32).reshape(1, 2))
+        self.ball.set_visible(xy is not None)
+
+    def _draw_hull(self, canvas, state):
+        canvas.fill_polygon(state['hull'], state['color'], 0.1)
+
+    def _draw_dots(self, canvas, state):
+        canvas.stamp(state['xy'], *self._dot, state['color'])
+
+    def _label_sprites(self, count):
+        """Number glyphs 1..count concatenated, with the player each pixel belongs to."""
+        if count not in self._labels:
+            for i in range(len(self._glyphs), count):
+                self._glyphs.append(_glyph(str(i + 1), self._font))
+            parts = self._glyphs[:count]
+            owner = np.concatenate([np.full(len(p[0]), i) for i, p in enumerate(parts)])
+            self._labels[count] = tuple(np.concatenate([p[k] for p in parts]) for k in range(3)) + (owner,)
+        return self._labels[count]
+
+    def _draw_labels(self, canvas, state):
+        dy, dx, alpha, owner = self._label_sprites(len(state['xy']))
+        canvas.stamp(state['xy'], dy, dx, alpha, state['text'], owner=owner)
+
+    def get_artists(self):
+        return [self.teams['Home']['hull_artist'], self.teams['Away']['hull_artist'],
+                self.teams['Home']['dots'], self.teams['Away']['dots'], self.ball,
+                self.teams['Home']['labels'], self.teams['Away']['labels']]
+
+class RasterEventVisualizer:
+    """
+    Raster counterpart of EventVisualizer (set_events / show_event /
+    draw_event / clear / get_artists): pass arrow, shot star and xG label.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.events = None
+        self._pass_code = -1
+        self._shot_code = -1
+        self._labels = {}
+
+        self._pass = None
+        self._shot = None
+        self.pass_arrow = RasterArtist(2, self._draw_pass)
+        self.shot_marker = RasterArtist(5, self._draw_shot)
+        self.shot_label = RasterArtist(3, self._draw_label)
+
+        r_outer = canvas.points_to_pixels(np.sqrt(300) / 2)
+        angles = np.pi / 2 + np.arange(10) * np.pi / 5
+        radii = np.where(np.arange(10) % 2 == 0, r_outer, r_outer * 0.4)
+        self._star = np.column_stack([radii * np.cos(angles), -radii * np.sin(angles)]).astype(np.float32)
+        self._font = _font(canvas.points_to_pixels(10), bold=False)
+
+    def set_events(self, events):
+        """Binds an EventTable so show_event() can read typed columns by row."""
+        self.events = events
+        self._pass_code = events.code('type', 'Pass')
+        self._shot_code = events.code('type', 'Shot')
+
+    def clear(self):
+        self.pass_arrow.set_visible(False)
+        self.shot_marker.set_visible(False)
+        self.shot_label.set_visible(False)
+
+    def get_artists(self):
+        return [self.pass_arrow, self.shot_marker, self.shot_label]
+
+    def show_event(self, row):
+        self.clear()
+        c = self.events.columns
+        event_type = c['type'][row]
+        if event_type == self._pass_code:
+            self._show_pass(c['x'][row], c['y'][row], c['end_x'][row], c['end_y'][row],
+                            failed=c['pass_outcome'][row] >= 0)
+        elif event_type == self._shot_code:
+            xg = c['xg'][row]
+            self._show_shot(c['x'][row], c['y'][row], 0.0 if np.isnan(xg) else xg)
+
+    def draw_event(self, event_row):
+        """Same as EventVisualizer.draw_event for a dict / Series row."""
+        self.clear()
+        loc = event_row['location']
+        if not isinstance(loc, (list, tuple)):
+            return
+        if event_row['type'] == 'Pass':
+            end = event_row['pass_end_location']
+            if isinstance(end, (list, tuple)):
+                failed = isinstance(event_row.get('pass_outcome'), str)
+                self._show_pass(loc[0], loc[1], end[0], end[1], failed)
+        elif event_row['type'] == 'Shot':
+            self._show_shot(loc[0], loc[1], event_row.get('shot_statsbomb_xg', 0.0))
+
+    def _show_pass(self, x, y, end_x, end_y, failed):
+        if np.isnan(x) or np.isnan(end_x):
+            return
+        start, end = self.canvas.to_pixels([[x, y], [end_x, end_y]])
+        self._pass = (start, end, _rgb(Colors.ACCENT_RED if failed else Colors.HIGHLIGHT))
+        self.pass_arrow.set_visible(True)
+
+    def _show_shot(self, x, y, xg):
+        if np.isnan(x):
+            return
+        self._shot = (self.canvas.to_pixels([[x, y]])[0], self.canvas.to_pixels([[x, y + 2]])[0],
+                      f"Shot\nxG: {xg:.2f}")
+        self.shot_marker.set_visible(True)
+        self.shot_label.set_visible(True)
+
+    def _draw_pass(self, canvas):
+        start, end, color = self._pass
+        d = end - start
+        length = float(np.hypot(*d))
+        if length < 1:
+            return
+        u = d / length
+        n = np.array([-u[1], u[0]])
+        head = min(canvas.points_to_pixels(10), length)
+        base = end - u * head
+        canvas.draw_line(start, base, canvas.points_to_pixels(2), color, 0.8)
+        canvas.fill_polygon(np.array([end, base + n * head * 0.35, base - n * head * 0.35]), color, 0.8)
+
+    def _draw_shot(self, canvas):
+        center = self._shot[0]
+        # White edge, then the highlight star inset by the edge width
+        canvas.fill_polygon(self._star * 1.15 + center, _rgb('white'))
+        canvas.fill_polygon(self._star + center, _rgb(Colors.HIGHLIGHT))
+
+    def _label_sprite(self, text):
+        """White text on a translucent black box, rendered once per distinct label."""
+        if text not in self._labels:
+            bbox = ImageDraw.Draw(Image.new('L', (1, 1))).multiline_textbbox(
+                (0, 0), text, font=self._font, align='center')
+            left, top, right, bottom = (int(np.floor(v)) for v in bbox)
+            pad = 4
+            image = Image.new('RGBA', (right - left + 2 * pad, bottom - top + 2 * pad), (0, 0, 0, 178))
+            ImageDraw.Draw(image).multiline_text((pad - left, pad - top), text, fill=(255, 255, 255, 255),
+                                                 font=self._font, align='center')
+            self._labels[text] = np.asarray(image)
+        return self._labels[text]
+
+    def _draw_label(self, canvas):
+        _, anchor, text = self._shot
+        sprite = self._label_sprite(text)
+        h, w = sprite.shape[:2]
+        # Horizontally centered, bottom edge at the anchor (matplotlib ha='center', va='baseline')
+        canvas.paste(sprite, int(anchor[0]) - w // 2, int(anchor[1]) - h)
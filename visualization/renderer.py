@@ -0,0 +1,57 @@
+class BlitManager:
+    """
+    Blitting renderer for the match axes.
+
+    A normal full draw renders everything static (pitch lines, sidebar, ...)
+    while skipping artists marked animated; the result is captured as a cached
+    background. Each frame then only restores that bitmap and draws the
+    dynamic artists on top, instead of redrawing the whole figure.
+
+    Extra axes (e.g. the timeline bar) are cached and blitted along with the
+    main one; their dynamic artists are passed to update() like the others.
+    """
+
+    def __init__(self, ax, *extra_axes):
+        self.ax = ax
+        self.axes = (ax,) + extra_axes
+        self.canvas = ax.figure.canvas
+        self._background = None
+        self._artists = []
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('resize_event', self._on_resize)
+
+    def invalidate(self):
+        """Forces a full redraw (and a fresh background) on the next update."""
+        self._background = None
+
+    def _on_resize(self, event):
+        self.invalidate()
+
+    def _on_draw(self, event):
+        """Recaptures the background after every full draw."""
+        if not self.ax.get_visible():
+            # Another screen is shown; the match background stays valid
+            return
+        self._background = [(a.bbox, self.canvas.copy_from_bbox(a.bbox))
+                            for a in self.axes if a.get_visible()]
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in sorted(self._artists, key=lambda a: a.get_zorder()):
+            self.ax.draw_artist(artist)
+
+    def update(self, artists):
+        """Renders one frame with the given dynamic artists."""
+        self._artists = [a for a in artists if a is not None]
+
+        if self._background is None:
+            # Full draw; _on_draw captures the background and draws the artists
+            self.canvas.draw()
+        else:
+            for _, region in self._background:
+                self.canvas.restore_region(region)
+            self._draw_artists()
+
+        for bbox, _ in self._background or ():
+            self.canvas.blit(bbox)
+        self.canvas.flush_events()
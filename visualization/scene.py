@@ -0,0 +1,102 @@
+from visualization.players import PlayerVisualizer
+from visualization.events import EventVisualizer
+from visualization.analytics import AnalyticsVisualizer
+from visualization.network import PassLinkIndex
+from visualization.profiler import FrameProfiler
+from data.geometry import TacticalTimeline
+from utils.config import QUALITY_LABELS
+
+class MatchScene:
+    """
+    All per-frame overlays of one match on a pitch axes: players, the current
+    event and the analytics layers. Used by the live view (main.py) and by
+    headless export, which builds one scene per worker.
+
+    players / event_overlay default to the matplotlib visualizers on ax; any
+    object with the same interface (e.g. the raster ones in raster.py) can be
+    passed instead. Analytics overlays are matplotlib only (analytics=False
+    skips them). update() times each of its stages on profiler (a disabled
+    FrameProfiler by default).
+    """
+
+    def __init__(self, ax, frames, events, match_path=None, timeline=None,
+                 players=None, event_overlay=None, analytics=True, profiler=None):
+        self.ax = ax
+        self.frames = frames
+        self.events = events
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+
+        self.players = players if players is not None else PlayerVisualizer(ax)
+        self.players.init_players()
+        self.event_overlay = event_overlay if event_overlay is not None else EventVisualizer(ax)
+        self.event_overlay.set_events(events)
+        # Event row shown at each frame (-1 = none), resolved once up front
+        self.frame_events = events.rows_for_events(frames.event_ids)
+        self.analytics = None
+        if analytics:
+            self.analytics = AnalyticsVisualizer(ax)
+            self.analytics.set_link_index(PassLinkIndex.build(frames))
+
+        # Team shapes for the whole match, cached next to the match file
+        if timeline is None:
+            timeline = TacticalTimeline.load_or_build(frames, match_path)
+        self.timeline = timeline
+        self.players.set_timeline(timeline)
+        if self.analytics is not None:
+            self.analytics.set_timeline(timeline)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def update(self, frame_idx, positions=None, blend=None):
+        """
+        Updates all match overlays for a frame and returns the dynamic artists.
+        positions: optional (home_xy, away_xy) replacing the frame's own, e.g.
+        interpolated by PlaybackTimeline, with blend (PlaybackTimeline.blend)
+        moving the precomputed team shapes along with them.
+        """
+        stage = self.profiler.stage
+        # 1. Update Players
+        with stage('players'):
+            if positions is None:
+                home_xy, away_xy = self.frames.get_frame(frame_idx)
+                self.players.update(home_xy, away_xy, frame_idx)
+            else:
+                home_xy, away_xy = positions
+                self.players.update(home_xy, away_xy, blend=blend)
+            if self.frames.ball is not None:
+                self.players.set_ball(self.frames.ball_at(frame_idx))
+
+        # 2. Update Events
+        with stage('events'):
+            event_row = self.frame_events[frame_idx]
+            if event_row >= 0:
+                self.event_overlay.show_event(event_row)
+            else:
+                self.event_overlay.clear()
+
+        # 3. Analytics
+        if self.analytics is not None:
+            with stage('defensive_line'):
+                if positions is None:
+                    self.analytics.draw_defensive_line(home_xy, away_xy, frame_idx=frame_idx)
+                else:
+                    self.analytics.draw_defensive_line(home_xy, away_xy, blend=blend)
+            with stage('heatmap'):
+                self.analytics.draw_heatmap(home_xy, away_xy)
+            with stage('pass_network'):
+                self.analytics.draw_pass_network(home_xy, away_xy, frame_idx)
+
+        return self.get_artists()
+
+    def set_quality(self, level):
+        """Quality level of the optional layers: 0 = full (see PlaybackScheduler)."""
+        self.players.set_labels_visible(QUALITY_LABELS[level])
+        if self.analytics is not None:
+            self.analytics.set_quality(level)
+
+    def get_artists(self):
+        artists = self.players.get_artists() + self.event_overlay.get_artists()
+        if self.analytics is not None:
+            artists += self.analytics.get_artists()
+        return artists
@@ -0,0 +1,106 @@
+import time
+from collections import deque
+from utils.config import FPS, SPEED_FACTOR, DEGRADE_LOAD, RESTORE_LOAD, RESTORE_FRAMES, QUALITY_LABELS
+
+class PlaybackScheduler:
+    """
+    Wall-clock driven playback of a PlaybackTimeline.
+
+    Each timer tick has a deadline one frame budget (1 / fps) after the
+    previous one. The match clock always follows wall time, so when a render
+    overruns its budget the frames that fell due meanwhile are skipped (and
+    counted as dropped) instead of the replay drifting slower than real time.
+    Render times are smoothed; if they eat most of the budget the quality
+    level is lowered one step (see MatchScene.set_quality), and it is raised
+    again after a stretch of frames with clear headroom.
+    """
+
+    LEVELS = len(QUALITY_LABELS)
+    SMOOTHING = 0.2 # Weight of the newest render time in the moving average
+
+    def __init__(self, playback, fps=FPS, speed=SPEED_FACTOR, on_quality=None):
+        self.playback = playback
+        self.budget = 1.0 / fps
+        self.speed = speed
+        self.on_quality = on_quality # Called with the new level when it changes
+
+        self.play_time = 0.0 # Match clock, seconds
+        self.quality = 0 # 0 = full quality
+        self.rendered = 0
+        self.dropped = 0
+        self.render_time = 0.0 # Smoothed seconds per render
+        self._deadline = None
+        self._last = None
+        self._headroom = 0
+        self._shown = deque(maxlen=FPS * 2) # Recent render timestamps, for achieved fps
+
+    @property
+    def finished(self):
+        return self.play_time > self.playback.duration
+
+    def pause(self):
+        """Stops the clock; the next tick restarts it from the current time."""
+        self._deadline = None
+        self._last = None
+        self._shown.clear()
+
+    def seek(self, seconds):
+        """Moves the match clock; the jump is not counted as dropped frames."""
+        self.play_time = min(max(seconds, 0.0), self.playback.duration)
+        self.pause()
+
+    def next_frame(self, now=None):
+        """
+        Advances the match clock to now and returns the playback frame to
+        render, counting frame deadlines that passed without a render.
+        """
+        now = time.perf_counter() if now is None else now
+        if self._last is None:
+            self._last = now
+            self._deadline = now + self.budget
+            return self.playback.frame_at(self.play_time)
+
+        self.play_time += (now - self._last) * self.speed
+        self._last = now
+        if now > self._deadline:
+            missed = int((now - self._deadline) / self.budget)
+            self.dropped += missed
+            self._deadline += missed * self.budget
+        self._deadline += self.budget
+        return self.playback.frame_at(self.play_time)
+
+    def frame_done(self, seconds, now=None):
+        """Records how long a render took and adapts the quality level."""
+        now = time.perf_counter() if now is None else now
+        self.rendered += 1
+        self._shown.append(now)
+        self.render_time += self.SMOOTHING * (seconds - self.render_time)
+
+        load = self.render_time / self.budget
+        if load > DEGRADE_LOAD and self.quality < self.LEVELS - 1:
+            self._set_quality(self.quality + 1)
+        elif load < RESTORE_LOAD and self.quality > 0:
+            self._headroom += 1
+            if self._headroom >= RESTORE_FRAMES:
+                self._set_quality(self.quality - 1)
+        else:
+            self._headroom = 0
+
+    def _set_quality(self, level):
+        self.quality = level
+        self._headroom = 0
+        # The average measured the old level; start over
+        self.render_time = self.budget * (DEGRADE_LOAD + RESTORE_LOAD) / 2
+        if self.on_quality is not None:
+            self.on_quality(level)
+
+    @property
+    def fps(self):
+        """Frames actually rendered per second over the last couple of seconds."""
+        if len(self._shown) < 2 or self._shown[-1] == self._shown[0]:
+            return 0.0
+        return (len(self._shown) - 1) / (self._shown[-1] - self._shown[0])
+
+    def stats(self):
+        return {'rendered': self.rendered, 'dropped': self.dropped, 'fps': self.fps,
+                'render_ms': self.render_time * 1000, 'quality': self.quality}
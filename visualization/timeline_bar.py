@@ -0,0 +1,85 @@
+from matplotlib.widgets import TextBox
+from utils.theme import Colors
+
+class MinuteBox(TextBox):
+    """
+    TextBox that leaves the canvas alone on clicks elsewhere: the stock one
+    does a full figure draw on every click outside it, even when it is not
+    being typed in, which defeats blitting and the screen bitmap cache.
+    """
+
+    def stop_typing(self):
+        if self.capturekeystrokes:
+            super().stop_typing()
+
+class TimelineBar:
+    """
+    Scrub bar under the match view: the playback duration along x, a tick
+    per shot, and an animated progress bar, cursor and match clock that are
+    redrawn by the BlitManager. Clicking or dragging on it seeks.
+
+    The clock sits in a small axes of its own left of the bar, so that every
+    animated artist lies inside an axes the BlitManager restores and blits;
+    register all of `axes` with it.
+    """
+
+    CLOCK_WIDTH = 0.045 # Figure fraction left of the bar
+    CLOCK_GAP = 0.005
+
+    def __init__(self, fig, rect):
+        x, y, w, h = rect
+        self.ax = self._blank_axes(fig, rect)
+        self.ax.set_ylim(0, 1)
+        self.clock_ax = self._blank_axes(fig, [x - self.CLOCK_GAP - self.CLOCK_WIDTH, y, self.CLOCK_WIDTH, h])
+        self.axes = (self.ax, self.clock_ax)
+
+        self.track, = self.ax.plot([0, 1], [0.5, 0.5], color=Colors.BORDER, lw=4, solid_capstyle='round')
+        self.shots = None
+        self.progress, = self.ax.plot([0, 0], [0.5, 0.5], color=Colors.PRIMARY, lw=4,
+                                      solid_capstyle='round', animated=True)
+        self.cursor, = self.ax.plot([0], [0.5], 'o', color=Colors.TEXT_COLOR, markersize=7, animated=True)
+        self.clock = self.clock_ax.text(1.0, 0.5, "00:00", color=Colors.TEXT_COLOR, fontsize=10,
+                                        ha='right', va='center', transform=self.clock_ax.transAxes, animated=True)
+        self.duration = 1.0
+        self.dragging = False
+
+    @staticmethod
+    def _blank_axes(fig, rect):
+        ax = fig.add_axes(rect)
+        ax.set_facecolor(Colors.BACKGROUND)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        return ax
+
+    def set_match(self, duration, seek_index):
+        """Scales the bar to a match and marks its shots."""
+        self.duration = max(duration, 1e-6)
+        self.ax.set_xlim(0, self.duration)
+        self.track.set_xdata([0, self.duration])
+        if self.shots is not None:
+            self.shots.remove()
+        shot_times = seek_index.type_times.get('Shot', [])
+        self.shots = self.ax.vlines(shot_times, 0.15, 0.85, color=Colors.ACCENT_RED, lw=1.5)
+
+    def set_visible(self, visible):
+        for ax in self.axes:
+            ax.set_visible(visible)
+
+    def update(self, time, match_seconds):
+        """Moves the cursor; returns the dynamic artists."""
+        self.progress.set_xdata([0, time])
+        self.cursor.set_xdata([time])
+        minutes, seconds = divmod(int(match_seconds), 60)
+        self.clock.set_text(f"{minutes:02d}:{seconds:02d}")
+        return self.get_artists()
+
+    def get_artists(self):
+        return [self.progress, self.cursor, self.clock]
+
+    def time_at(self, event):
+        """Playback time under a mouse event, or None if it is not on the bar."""
+        if event.inaxes != self.ax or event.xdata is None:
+            return None
+        return min(max(event.xdata, 0.0), self.duration)